@@ -0,0 +1,154 @@
+"""
+Cold-start benchmark
+Runs one invocation per route in a fresh interpreter under `python -X importtime`
+and reports module import time, first-invocation time and which handler modules
+were loaded. A route that imports another domain's handler module is a failure.
+
+Without --dsn the handler points at an unreachable local port, so the database
+connect fails fast and only import / dispatch cost is measured.
+
+Usage:
+    python benchmark_cold_start.py
+    python benchmark_cold_start.py --route /production/shipments --top 15
+    python benchmark_cold_start.py --dsn "dbname=bananas_scale host=localhost user=postgres"
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Get the directory where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+lambda_dir = os.path.join(script_dir, 'lambda')
+
+# (method, path, handler module expected to be the only one loaded)
+COLD_ROUTES = [
+    ('GET', '/production/shipments', 'handlers.shipments'),
+    ('GET', '/production/planning', 'handlers.planning'),
+    ('GET', '/production/floor-inventory/sellables', 'handlers.floor_inventory'),
+    ('GET', '/products/catalog', 'handlers.catalog'),
+    ('GET', '/products/selection', 'handlers.selection'),
+    ('GET', '/products/formula', 'handlers.formula'),
+    ('GET', '/supply-chain/bottles/inventory', 'handlers.bottles'),
+    ('GET', '/supply-chain/labels/inventory', 'handlers.labels'),
+    ('GET', '/supply-chain/orders', 'handlers.orders'),
+    ('GET', '/supply-chain/boxes/cycle-counts', 'handlers.cycle_counts'),
+]
+
+# Unreachable local endpoint: connect is refused immediately
+UNREACHABLE_DB = {'host': '127.0.0.1', 'port': 1, 'database': 'postgres', 'user': 'postgres',
+                  'password': 'postgres', 'connect_timeout': 1}
+
+CHILD_SCRIPT = r'''
+import json, sys, time
+sys.path.insert(0, {lambda_dir!r})
+start = time.perf_counter()
+import lambda_function
+imported = time.perf_counter()
+lambda_function.DB_CONFIG = {db_config}
+response = lambda_function.lambda_handler({event!r}, None)
+done = time.perf_counter()
+print('COLD_START ' + json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'invoke_ms': (done - imported) * 1000,
+    'status': response.get('statusCode'),
+    'handler_modules': sorted(m for m in sys.modules if m.startswith('handlers.')),
+    'module_count': len(sys.modules)
+}}))
+'''
+
+
+def parse_importtime(stderr):
+    """[(module, self_us, cumulative_us)] from `-X importtime` output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            rows.append((name.strip(), int(self_us), int(cumulative_us)))
+        except ValueError:
+            continue
+    return rows
+
+
+def run_cold(method, path, db_config):
+    event = {'httpMethod': method, 'path': path, 'headers': {}, 'queryStringParameters': None,
+             'pathParameters': None, 'body': None}
+    code = CHILD_SCRIPT.format(lambda_dir=lambda_dir, db_config=repr(db_config), event=event)
+    env = dict(os.environ, METRICS_ENABLED='0', LOG_LEVEL='ERROR')
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, env=env)
+    result = None
+    for line in proc.stdout.splitlines():
+        if line.startswith('COLD_START '):
+            result = json.loads(line[len('COLD_START '):])
+    if result is None:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'no output')
+    result['imports'] = parse_importtime(proc.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start import benchmark for lambda_function')
+    parser.add_argument('--dsn', help='libpq connection string (default: unreachable, import cost only)')
+    parser.add_argument('--route', action='append', default=[],
+                        help='Only run routes whose path contains this substring (repeatable)')
+    parser.add_argument('--top', type=int, default=10, help='Heaviest imports to list per route')
+    args = parser.parse_args()
+
+    if args.dsn:
+        import psycopg2.extensions
+        db_config = psycopg2.extensions.parse_dsn(args.dsn)
+    else:
+        db_config = UNREACHABLE_DB
+
+    print("=" * 80)
+    print("COLD-START BENCHMARK (python -X importtime)")
+    print("=" * 80)
+
+    failures = 0
+    for method, path, expected in COLD_ROUTES:
+        if args.route and not any(r in path for r in args.route):
+            continue
+        print()
+        print(f"[*] {method} {path}")
+        try:
+            result = run_cold(method, path, db_config)
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            failures += 1
+            continue
+
+        imports = result['imports']
+        total_us = sum(self_us for _, self_us, _ in imports)
+        own_us = sum(self_us for name, self_us, _ in imports
+                     if name == 'lambda_function' or name == 'handlers' or name.startswith('handlers.'))
+        print(f"   import lambda_function: {result['import_ms']:.1f} ms | first invocation: {result['invoke_ms']:.1f} ms "
+              f"(status {result['status']})")
+        print(f"   modules imported: {len(imports)} ({total_us / 1000:.1f} ms self total, "
+              f"{own_us / 1000:.1f} ms in lambda_function + handlers)")
+        for name, self_us, cumulative_us in sorted(imports, key=lambda r: r[2], reverse=True)[:args.top]:
+            print(f"      {cumulative_us / 1000:>8.1f} ms  {name}")
+
+        unexpected = [m for m in result['handler_modules'] if m != expected]
+        if expected not in result['handler_modules']:
+            print(f"[FAIL] {expected} was not loaded")
+            failures += 1
+        elif unexpected:
+            print(f"[FAIL] also loaded {', '.join(unexpected)}")
+            failures += 1
+        else:
+            print(f"[OK] only {expected} loaded")
+
+    print()
+    print("=" * 80)
+    print("[OK] Cold-start checks passed" if not failures else f"[FAIL] {failures} cold-start check(s) failed")
+    print("=" * 80)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,565 @@
+"""
+Endpoint benchmark suite
+Replays API Gateway (v1 REST / v2 HTTP API) events for the routes in lambda_handler,
+invoking the handler in-process against a LOCAL Postgres and a local forecast stand-in.
+
+Per route it reports p50/p95/p99 latency, queries issued (via the handler's query
+tracer), rows and response bytes, and can save a baseline JSON file that later runs
+are compared against.
+
+Write routes only run with --include-writes, and they commit. Create routes add rows
+named BENCH-<run>-<n>; the update / complete / delete routes that follow them in ROUTES
+work on those rows (resolved again before every invocation). Writes to existing rows
+store the values they already hold, except shiners / unused formulas, which add a unit.
+
+Usage:
+    python benchmark_endpoints.py --dsn "dbname=bananas_scale host=localhost user=postgres"
+    python benchmark_endpoints.py --dsn "..." --iterations 50 --save-baseline benchmarks/baseline.json
+    python benchmark_endpoints.py --dsn "..." --compare benchmarks/baseline.json --threshold 0.2
+    python benchmark_endpoints.py --dsn "..." --route /supply-chain/labels --event-format both
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psycopg2
+import psycopg2.extensions
+
+# Get the directory where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, 'lambda'))
+
+import lambda_function
+
+DEFAULT_BASELINE = os.path.join(script_dir, 'benchmarks', 'baseline.json')
+
+# {seq} in a route body is unique per invocation (and per run), for names that must not repeat
+RUN_ID = time.strftime('%Y%m%d%H%M%S')
+EVENT_SEQUENCE = itertools.count(1)
+
+# Route table: (method, path template, query string params, body, writes)
+# {placeholders} are resolved from the benchmark database by FIXTURE_SQL. Routes that
+# create BENCH-* rows come before the routes that update, complete or delete them.
+ROUTES = [
+    # Products
+    ('GET', '/products/selection', None, None, False),
+    ('GET', '/products/development', None, None, False),
+    ('GET', '/products/catalog/children', None, None, False),
+    ('GET', '/products/catalog', None, None, False),
+    ('GET', '/products/catalog/{catalog_id}', None, None, False),
+    ('GET', '/products/catalog/{catalog_id}', {'tab': 'essentialInfo'}, None, False),
+    ('GET', '/products/formula', None, None, False),
+    ('GET', '/products/formula/{formula_id}', None, None, False),
+    ('PUT', '/products/catalog/{catalog_id}', None, {}, True),
+    ('PATCH', '/products/catalog/bulk', None,
+     {'updates': [{'id': '{catalog_id}', 'fields': {'marketplace': '{catalog_marketplace}'}}]}, True),
+    ('POST', '/products/selection', None,
+     {'product': 'BENCH-{seq}', 'status': 'benchmark', 'searchVol': 1000, 'brand': '{brand_name}'}, True),
+    ('PUT', '/products/selection/{bench_selection_id}', None,
+     {'product': 'BENCH-{seq}', 'status': 'benchmark', 'searchVol': 2000, 'brand': '{brand_name}'}, True),
+    ('PATCH', '/products/selection/{bench_selection_id}/launch', None, {}, True),
+    ('DELETE', '/products/selection/{bench_selection_id}', None, None, True),
+    ('POST', '/products/formula', None, {'formula': 'BENCH-{seq}', 'npk': '0-0-0'}, True),
+    ('PUT', '/products/formula/{bench_formula_id}', None, {'npk': '1-1-1'}, True),
+    ('DELETE', '/products/formula/{bench_formula_id}', None, None, True),
+
+    # Supply chain - open orders across all order types
+    ('GET', '/supply-chain/orders', None, None, False),
+    ('GET', '/supply-chain/orders', {'component_type': 'label', 'limit': '50'}, None, False),
+    ('GET', '/supply-chain/orders/inbound', None, None, False),
+    ('GET', '/supply-chain/reorder', None, None, False),
+
+    # Supply chain - bottles / closures / boxes
+    # Cycle counts re-count the current quantity, so completing them leaves inventory as it was
+    *[route
+      for family, prefix, item in (('bottle', 'bottles', 'bottle_name'), ('closure', 'closures', 'closure_name'),
+                                   ('box', 'boxes', 'box_type'))
+      for route in (
+          ('GET', f'/supply-chain/{prefix}/forecast-requirements', None, None, False),
+          ('GET', f'/supply-chain/{prefix}/inventory', None, None, False),
+          ('GET', f'/supply-chain/{prefix}/orders', None, None, False),
+          ('GET', f'/supply-chain/{prefix}/orders/{{{family}_order_id}}', None, None, False),
+          ('GET', f'/supply-chain/{prefix}/cycle-counts', None, None, False),
+          ('GET', f'/supply-chain/{prefix}/cycle-counts/{{{family}_count_id}}', None, None, False),
+          ('PUT', f'/supply-chain/{prefix}/inventory/{{{family}_inventory_id}}', None, {}, True),
+          ('POST', f'/supply-chain/{prefix}/orders', None,
+           {'order_number': 'BENCH-{seq}', item: f'{{{item}}}', 'supplier': 'benchmark',
+            'order_date': '2026-01-05', 'quantity_ordered': 1000, 'status': 'pending'}, True),
+          ('PUT', f'/supply-chain/{prefix}/orders/{{bench_{family}_order_id}}', None, {'status': 'pending'}, True),
+          ('POST', f'/supply-chain/{prefix}/cycle-counts', None,
+           {'count_date': '2026-01-05', 'counted_by': 'benchmark', 'notes': 'benchmark',
+            'lines': [{item: f'{{{item}}}', 'counted_quantity': f'{{{family}_quantity}}'}]}, True),
+          ('PUT', f'/supply-chain/{prefix}/cycle-counts/{{bench_{family}_count_id}}', None,
+           {'lines': [{item: f'{{{item}}}', 'counted_quantity': f'{{{family}_quantity}}'}]}, True),
+          ('POST', f'/supply-chain/{prefix}/cycle-counts/{{bench_{family}_count_id}}/complete', None, {}, True),
+      )],
+
+    # Supply chain - labels
+    ('GET', '/supply-chain/labels/forecast-requirements', None, None, False),
+    ('GET', '/supply-chain/labels/inventory', None, None, False),
+    ('GET', '/supply-chain/labels/inventory/{label_id}', None, None, False),
+    ('GET', '/supply-chain/labels/orders', None, None, False),
+    ('GET', '/supply-chain/labels/orders/{label_order_id}', None, None, False),
+    ('GET', '/supply-chain/labels/cycle-counts', None, None, False),
+    ('GET', '/supply-chain/labels/cycle-counts/{label_count_id}', None, None, False),
+    ('GET', '/supply-chain/labels/doi', None, None, False),
+    ('GET', '/supply-chain/labels/doi/{label_id}', None, None, False),
+    ('GET', '/supply-chain/labels/costs', None, None, False),
+    ('GET', '/supply-chain/labels/formulas', None, None, False),
+    ('GET', '/supply-chain/labels/formulas/by-location', {'label_location': '{label_location}'}, None, False),
+    ('GET', '/supply-chain/labels/formulas/{label_size}', None, None, False),
+    ('POST', '/supply-chain/labels/inventory/weigh-in', None,
+     {'entries': [{'label_location': '{label_location}', 'roll_weights': [812.5, 455]}], 'dry_run': True}, False),
+    ('POST', '/supply-chain/labels/costs/optimize', None,
+     {'labels': [{'brand_name': '{label_brand}', 'product_name': '{label_product}',
+                  'bottle_size': '{label_bottle_size}', 'quantity': 4200}]}, False),
+    ('PUT', '/supply-chain/labels/inventory/{label_id}', None, {}, True),
+    ('PUT', '/supply-chain/labels/inventory/by-location', None,
+     {'label_location': '{label_location}', 'warehouse_inventory': '{label_location_quantity}'}, True),
+    ('POST', '/supply-chain/labels/orders', None,
+     {'order_number': 'BENCH-{seq}', 'supplier': 'benchmark', 'order_date': '2026-01-05', 'status': 'pending',
+      'lines': [{'brand_name': '{label_brand}', 'product_name': '{label_product}',
+                 'bottle_size': '{label_bottle_size}', 'quantity_ordered': 5000}]}, True),
+    ('PUT', '/supply-chain/labels/orders/{bench_label_order_id}', None, {'notes': 'benchmark'}, True),
+    ('POST', '/supply-chain/labels/cycle-counts', None,
+     {'count_date': '2026-01-05', 'counted_by': 'benchmark', 'notes': 'benchmark',
+      'lines': [{'brand_name': '{label_brand}', 'product_name': '{label_product}',
+                 'bottle_size': '{label_bottle_size}', 'counted_quantity': '{label_quantity}'}]}, True),
+    ('PUT', '/supply-chain/labels/cycle-counts/{bench_label_count_id}', None,
+     {'lines': [{'brand_name': '{label_brand}', 'product_name': '{label_product}',
+                 'bottle_size': '{label_bottle_size}', 'counted_quantity': '{label_quantity}'}]}, True),
+    ('POST', '/supply-chain/labels/cycle-counts/{bench_label_count_id}/complete', None, {}, True),
+    ('POST', '/supply-chain/labels/formulas', None,
+     {'label_size': 'BENCH-{seq}', 'core_weight_grams': 71, 'grams_per_label': 3.35}, True),
+    ('PUT', '/supply-chain/labels/formulas/{bench_label_formula_id}', None, {'notes': 'benchmark'}, True),
+
+    # Production
+    ('GET', '/production/planning', None, None, False),
+    ('GET', '/production/calculate-time', {'product': '{product_name}', 'units': '1000'}, None, False),
+    ('GET', '/production/products/inventory', None, None, False),
+    ('GET', '/production/products-inventory', None, None, False),
+    ('GET', '/production/floor-inventory/sellables', None, None, False),
+    ('GET', '/production/floor-inventory/shiners', None, None, False),
+    ('GET', '/production/floor-inventory/unused-formulas', None, None, False),
+    ('GET', '/production/labels/availability', None, None, False),
+    ('GET', '/production/labels-availability', None, None, False),
+    ('GET', '/production/shipments', None, None, False),
+    ('GET', '/production/shipments/{shipment_id}', None, None, False),
+    ('GET', '/production/shipments/{shipment_id}/products', None, None, False),
+    ('GET', '/production/shipments/{shipment_id}/formula-check', None, None, False),
+    ('GET', '/production/warehouse-capacity', None, None, False),
+    ('POST', '/production/floor-inventory/shiners', None,
+     {'catalog_id': '{catalog_id}', 'quantity': 1, 'issue_type': 'benchmark', 'notes': 'benchmark'}, True),
+    ('POST', '/production/floor-inventory/unused-formulas', None, {'formula_name': '{formula_name}', 'gallons': 1}, True),
+    ('POST', '/production/shipments', None,
+     {'shipment_number': 'BENCH-{seq}', 'shipment_date': '2026-01-05', 'shipment_type': 'AWD',
+      'account': 'benchmark', 'created_by': 'benchmark'}, True),
+    ('PUT', '/production/shipments/{bench_shipment_id}', None, {'notes': 'benchmark'}, True),
+    ('POST', '/production/shipments/{bench_shipment_id}/products', None,
+     {'products': [{'catalog_id': '{catalog_id}', 'quantity': 10}]}, True),
+    ('PUT', '/production/shipments/{bench_shipment_id}/formula-check', None,
+     {'checked_formula_ids': [], 'uncheck_formula_ids': []}, True),
+    ('PUT', '/production/shipments/{bench_shipment_id}/products/{bench_shipment_product_id}/label-check', None,
+     {'status': None}, True),
+    ('DELETE', '/production/shipments/{bench_shipment_id}', None, None, True),
+]
+
+# Fixture lookups: placeholder -> query returning a single value
+FIXTURE_SQL = {
+    'catalog_id': "SELECT id FROM catalog ORDER BY id LIMIT 1",
+    'catalog_marketplace': "SELECT marketplace FROM catalog ORDER BY id LIMIT 1",
+    'product_name': "SELECT product_name FROM catalog WHERE product_name IS NOT NULL ORDER BY id LIMIT 1",
+    'formula_id': "SELECT id FROM formula ORDER BY id LIMIT 1",
+    'bottle_order_id': "SELECT id FROM bottle_orders ORDER BY id DESC LIMIT 1",
+    'closure_order_id': "SELECT id FROM closure_orders ORDER BY id DESC LIMIT 1",
+    'box_order_id': "SELECT id FROM box_orders ORDER BY id DESC LIMIT 1",
+    'label_order_id': "SELECT id FROM label_orders ORDER BY id DESC LIMIT 1",
+    'bottle_count_id': "SELECT id FROM bottle_cycle_counts ORDER BY id DESC LIMIT 1",
+    'closure_count_id': "SELECT id FROM closure_cycle_counts ORDER BY id DESC LIMIT 1",
+    'box_count_id': "SELECT id FROM box_cycle_counts ORDER BY id DESC LIMIT 1",
+    'label_count_id': "SELECT id FROM label_cycle_counts ORDER BY id DESC LIMIT 1",
+    'bottle_inventory_id': "SELECT id FROM bottle_inventory ORDER BY id LIMIT 1",
+    'closure_inventory_id': "SELECT id FROM closure_inventory ORDER BY id LIMIT 1",
+    'box_inventory_id': "SELECT id FROM box_inventory ORDER BY id LIMIT 1",
+    'label_id': "SELECT id FROM label_inventory ORDER BY id LIMIT 1",
+    'label_location': "SELECT label_location FROM label_inventory WHERE label_location IS NOT NULL ORDER BY id LIMIT 1",
+    'label_size': "SELECT label_size FROM label_inventory WHERE label_size IS NOT NULL ORDER BY id LIMIT 1",
+    'shipment_id': "SELECT id FROM shipments ORDER BY id DESC LIMIT 1",
+    'formula_name': "SELECT formula FROM formula ORDER BY id LIMIT 1",
+    'brand_name': "SELECT brand_name FROM brand ORDER BY brand_name LIMIT 1",
+    'bottle_name': "SELECT bottle_name FROM bottle_inventory ORDER BY id LIMIT 1",
+    'bottle_quantity': "SELECT COALESCE(warehouse_quantity, 0) FROM bottle_inventory ORDER BY id LIMIT 1",
+    'closure_name': "SELECT closure_name FROM closure_inventory ORDER BY id LIMIT 1",
+    'closure_quantity': "SELECT COALESCE(warehouse_quantity, 0) FROM closure_inventory ORDER BY id LIMIT 1",
+    'box_type': "SELECT box_type FROM box_inventory ORDER BY id LIMIT 1",
+    'box_quantity': "SELECT COALESCE(warehouse_quantity, 0) FROM box_inventory ORDER BY id LIMIT 1",
+    'label_brand': "SELECT brand_name FROM label_inventory ORDER BY id LIMIT 1",
+    'label_product': "SELECT product_name FROM label_inventory ORDER BY id LIMIT 1",
+    'label_bottle_size': "SELECT bottle_size FROM label_inventory ORDER BY id LIMIT 1",
+    'label_quantity': "SELECT COALESCE(warehouse_inventory, 0) FROM label_inventory ORDER BY id LIMIT 1",
+    'label_location_quantity': """
+        SELECT COALESCE(warehouse_inventory, 0) FROM label_inventory
+        WHERE label_location IS NOT NULL ORDER BY id LIMIT 1
+    """,
+    # Rows created by the write routes (latest first, so deletes consume them in turn)
+    'bench_selection_id': "SELECT id FROM catalog WHERE product_name LIKE 'BENCH-%' ORDER BY id DESC LIMIT 1",
+    'bench_formula_id': "SELECT id FROM formula WHERE formula LIKE 'BENCH-%' ORDER BY id DESC LIMIT 1",
+    **{f'bench_{family}_order_id':
+       f"SELECT id FROM {family}_orders WHERE order_number LIKE 'BENCH-%' ORDER BY id DESC LIMIT 1"
+       for family in ('bottle', 'closure', 'box', 'label')},
+    **{f'bench_{family}_count_id': f"""
+        SELECT id FROM {family}_cycle_counts
+        WHERE notes = 'benchmark' AND status IS DISTINCT FROM 'completed'
+        ORDER BY id DESC LIMIT 1
+    """ for family in ('bottle', 'closure', 'box', 'label')},
+    'bench_label_formula_id': "SELECT id FROM label_formulas WHERE label_size LIKE 'BENCH-%' ORDER BY id DESC LIMIT 1",
+    'bench_shipment_id': "SELECT id FROM shipments WHERE shipment_number LIKE 'BENCH-%' ORDER BY id DESC LIMIT 1",
+    'bench_shipment_product_id': """
+        SELECT id FROM shipment_products
+        WHERE shipment_id = (SELECT MAX(id) FROM shipments WHERE shipment_number LIKE 'BENCH-%')
+        ORDER BY id LIMIT 1
+    """,
+}
+
+
+# ============================================
+# FORECAST API STAND-IN
+# ============================================
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    """Answers GET /forecast/{asin} with deterministic per-ASIN numbers"""
+
+    def do_GET(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) != 2 or parts[0] != 'forecast':
+            self.send_response(404)
+            self.end_headers()
+            return
+        seed = zlib.crc32(parts[1].encode())
+        daily = round(1 + (seed % 4000) / 100.0, 2)
+        body = json.dumps({
+            'asin': parts[1],
+            'avg_daily_sales': daily,
+            'daily_forecast_avg': round(daily * 1.05, 2),
+            'weekly_forecast_avg': round(daily * 7.35, 2)
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_forecast_stand_in():
+    """Start the forecast stand-in on an ephemeral port; returns (server, base_url)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ForecastHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ============================================
+# EVENTS
+# ============================================
+
+def fill(value, fixtures):
+    """Substitute {placeholders} in strings / nested dicts / lists"""
+    if isinstance(value, str):
+        if value.startswith('{') and value.endswith('}') and value[1:-1] in fixtures:
+            return fixtures[value[1:-1]]
+        return value.format(**fixtures)
+    if isinstance(value, dict):
+        return {k: fill(v, fixtures) for k, v in value.items()}
+    if isinstance(value, list):
+        return [fill(v, fixtures) for v in value]
+    return value
+
+
+def path_parameters(template, fixtures):
+    """API Gateway pathParameters for a templated route"""
+    params = {}
+    for name in re.findall(r'\{(\w+)\}', template):
+        if name == 'label_size':
+            params['label_size'] = fixtures['label_size']
+        elif name == 'bench_shipment_product_id':
+            params['product_id'] = str(fixtures[name])
+        elif name.endswith('_id'):
+            params['id'] = str(fixtures[name])
+    return params or None
+
+
+def build_event(method, template, query, body, fixtures, event_format):
+    """Build an API Gateway v1 (REST) or v2 (HTTP API) proxy event"""
+    fixtures = dict(fixtures, seq=f"{RUN_ID}-{next(EVENT_SEQUENCE)}")
+    path = fill(template, fixtures)
+    query = fill(query, fixtures) if query else None
+    body = json.dumps(fill(body, fixtures), default=str) if body is not None else None
+    params = path_parameters(template, fixtures)
+    raw_query = '&'.join(f"{k}={v}" for k, v in (query or {}).items())
+
+    if event_format == 'v1':
+        return {
+            'resource': path,
+            'path': path,
+            'httpMethod': method,
+            'headers': {'Content-Type': 'application/json'},
+            'queryStringParameters': query,
+            'pathParameters': params,
+            'body': body,
+            'isBase64Encoded': False,
+            'requestContext': {'httpMethod': method, 'path': path, 'stage': 'benchmark'}
+        }
+
+    return {
+        'version': '2.0',
+        'routeKey': f"{method} {path}",
+        'rawPath': path,
+        'rawQueryString': raw_query,
+        'headers': {'content-type': 'application/json'},
+        'queryStringParameters': query,
+        'pathParameters': params,
+        'body': body,
+        'isBase64Encoded': False,
+        'requestContext': {
+            'http': {'method': method, 'path': path, 'protocol': 'HTTP/1.1', 'sourceIp': '127.0.0.1'},
+            'stage': '$default'
+        }
+    }
+
+
+def route_key(method, template, query):
+    key = f"{method} {template}"
+    if query:
+        key += '?' + '&'.join(f"{k}={v}" for k, v in sorted(query.items()))
+    return key
+
+
+# ============================================
+# BENCHMARK
+# ============================================
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def load_fixtures(conn, names=None):
+    """Resolve FIXTURE_SQL placeholders (all, or just `names`) on an autocommit connection"""
+    fixtures = {}
+    with conn.cursor() as cursor:
+        for name in names if names is not None else FIXTURE_SQL:
+            try:
+                cursor.execute(FIXTURE_SQL[name])
+                row = cursor.fetchone()
+                if row and row[0] is not None:
+                    fixtures[name] = row[0]
+            except psycopg2.Error:
+                pass
+    return fixtures
+
+
+def invoke(event, verbose):
+    """Run lambda_handler once under the query tracer; returns (elapsed_ms, status_code, response_bytes, trace)"""
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with sink, lambda_function.trace_queries() as trace:
+        start = time.perf_counter()
+        response = lambda_function.route_request(event, None)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    body = response.get('body') or ''
+    return elapsed_ms, response.get('statusCode'), len(body.encode('utf-8')), trace
+
+
+def benchmark_route(make_event, iterations, warmup, verbose):
+    """Time a route; make_event() builds a fresh event (fixtures re-resolved) per invocation"""
+    for _ in range(warmup):
+        invoke(make_event(), verbose)
+
+    latencies = []
+    statuses = set()
+    queries = rows = response_bytes = 0
+    db_ms = 0.0
+    max_repeats = 0
+    for _ in range(iterations):
+        elapsed_ms, status, size, trace = invoke(make_event(), verbose)
+        latencies.append(elapsed_ms)
+        statuses.add(status)
+        queries += trace.queries
+        rows += trace.rows
+        db_ms += trace.db_ms
+        response_bytes += size
+        max_repeats = max([max_repeats] + [count for count, _ in trace.shapes.values()])
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'status': sorted(s for s in statuses if s is not None),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'db_ms': round(db_ms / iterations, 3),
+        'queries': round(queries / iterations, 2),
+        'max_repeats': max_repeats,
+        'rows': round(rows / iterations, 2),
+        'response_bytes': round(response_bytes / iterations)
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return list of (route, metric, baseline, current) regressions"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get('routes', {}).get(key)
+        if not previous:
+            continue
+        # Latency regresses by ratio; query count regressions are always reported
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'response_bytes'):
+            before, after = previous.get(metric) or 0, current.get(metric) or 0
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append((key, metric, before, after))
+        if (current.get('queries') or 0) > (previous.get('queries') or 0):
+            regressions.append((key, 'queries', previous.get('queries'), current.get('queries')))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print(f"{'ROUTE':<70} {'p50':>9} {'p95':>9} {'p99':>9} {'qry':>6} {'rows':>8} {'bytes':>10}")
+    print("-" * 125)
+    for key, r in results.items():
+        line = (f"{key[:70]:<70} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+                f"{r['queries']:>6g} {r['rows']:>8g} {r['response_bytes']:>10}")
+        previous = (baseline or {}).get('routes', {}).get(key)
+        if previous and previous.get('p50_ms'):
+            delta = (r['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100
+            line += f"  ({delta:+.1f}% p50)"
+        if any(s >= 400 for s in r['status']):
+            line += f"  [status {r['status']}]"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='In-process endpoint benchmark for lambda_function')
+    parser.add_argument('--dsn', required=True, help='libpq connection string for a LOCAL benchmark database')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed invocations per route')
+    parser.add_argument('--warmup', type=int, default=2, help='Untimed invocations per route')
+    parser.add_argument('--event-format', choices=['v1', 'v2', 'both'], default='v1',
+                        help='API Gateway payload format to replay')
+    parser.add_argument('--route', action='append', default=[],
+                        help='Only run routes whose path contains this substring (repeatable)')
+    parser.add_argument('--include-writes', action='store_true',
+                        help='Also run POST/PUT/PATCH/DELETE routes (they commit; created rows are named BENCH-*)')
+    parser.add_argument('--save-baseline', metavar='PATH', nargs='?', const=DEFAULT_BASELINE,
+                        help=f'Write results as a baseline (default {DEFAULT_BASELINE})')
+    parser.add_argument('--compare', metavar='PATH', nargs='?', const=DEFAULT_BASELINE,
+                        help='Compare against a saved baseline and exit 1 on regressions')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed latency / size growth before a regression is reported (0.2 = 20%%)')
+    parser.add_argument('--verbose', action='store_true', help='Show handler output')
+    args = parser.parse_args()
+
+    if 'rds.amazonaws.com' in args.dsn:
+        print("[ERROR] Refusing to benchmark against RDS - point --dsn at a local database")
+        sys.exit(1)
+
+    print("=" * 80)
+    print("ENDPOINT BENCHMARK")
+    print("=" * 80)
+
+    # Point the handler at the local database and the forecast stand-in
+    dsn_params = psycopg2.extensions.parse_dsn(args.dsn)
+    lambda_function.DB_CONFIG = dsn_params
+    server, forecast_url = start_forecast_stand_in()
+    lambda_function.FORECAST_API_URL = forecast_url
+    print(f"[OK] Database: {dsn_params.get('dbname') or dsn_params.get('database')} @ {dsn_params.get('host', 'local socket')}")
+    print(f"[OK] Forecast stand-in: {forecast_url}")
+
+    fixture_conn = psycopg2.connect(args.dsn)
+    fixture_conn.autocommit = True
+    fixtures = load_fixtures(fixture_conn)
+    print(f"[OK] Resolved {len(fixtures)}/{len(FIXTURE_SQL)} fixtures")
+
+    formats = ['v1', 'v2'] if args.event_format == 'both' else [args.event_format]
+    results = {}
+    skipped = []
+
+    for method, template, query, body, writes in ROUTES:
+        if writes and not args.include_writes:
+            continue
+        if args.route and not any(r in template for r in args.route):
+            continue
+        needed = [name for name in FIXTURE_SQL if '{' + name + '}' in json.dumps([template, query, body])]
+        # Resolved now rather than at start-up: BENCH-* rows come from earlier write routes
+        missing = [name for name in needed if name not in load_fixtures(fixture_conn, needed)]
+        key = route_key(method, template, query)
+        if missing:
+            skipped.append((key, missing))
+            continue
+
+        for event_format in formats:
+            def make_event():
+                return build_event(method, template, query, body, load_fixtures(fixture_conn, needed), event_format)
+            label = key if len(formats) == 1 else f"{key} [{event_format}]"
+            print(f"[*] {label}")
+            try:
+                results[label] = benchmark_route(make_event, args.iterations, args.warmup, args.verbose)
+            except Exception as e:
+                print(f"[FAIL] {label}: {e}")
+
+    server.shutdown()
+    fixture_conn.close()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print()
+    print_results(results, baseline)
+
+    for key, missing in skipped:
+        print(f"[*] Skipped {key} (no fixture for {', '.join(missing)})")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'iterations': args.iterations,
+                'event_format': args.event_format,
+                'routes': results
+            }, f, indent=2, sort_keys=True)
+        print(f"[OK] Baseline saved to {args.save_baseline}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        print()
+        print("=" * 80)
+        if regressions:
+            print(f"[FAIL] {len(regressions)} regression(s) vs {args.compare}")
+            for key, metric, before, after in regressions:
+                print(f"   {key}: {metric} {before} -> {after}")
+            print("=" * 80)
+            sys.exit(1)
+        print(f"[OK] No regressions vs {args.compare} (threshold {args.threshold:.0%})")
+        print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,53 +1,240 @@
 """
 Create Lambda deployment package with all dependencies
+
+The package is built for fast cold starts:
+  - bytecode is precompiled (unchecked-hash .pyc, since /var/task is read-only and
+    Lambda would otherwise recompile every module on every cold start)
+  - psycopg2 modules not reachable from the handler code are dropped
+  - dist-info metadata, tests, type stubs and stale __pycache__ are not shipped
+A size and import-time report is printed for every build.
+
+Usage:
+    python deploy_lambda.py
+    python deploy_lambda.py --python 3.11 --no-import-check
 """
-import zipfile
+import argparse
+import ast
 import os
+import py_compile
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+LAMBDA_DIR = 'lambda'
+ZIP_FILENAME = 'lambda/lambda_deploy.zip'
+
+# Application code (paths relative to LAMBDA_DIR)
+APP_SOURCES = ['lambda_function.py', 'handlers']
+
+# Vendored psycopg2 (binary wheel) - dist-info is metadata only and is not shipped
+PSYCOPG2_PACKAGE = 'psycopg2'
+PSYCOPG2_LIBS = 'psycopg2_binary.libs'
+
+# Never shipped
+EXCLUDED_DIRS = {'__pycache__', 'tests', 'test'}
+EXCLUDED_SUFFIXES = ('.pyi', '.pyc', '.pyo', '.typed', '.md', '.txt')
+
+
+def module_imports(file_path, package):
+    """Absolute names of `package` submodules imported anywhere in a source file"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), file_path)
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name.split('.')[0] == package:
+                    found.add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ''
+            if node.level:
+                base = f"{package}.{base}".rstrip('.')
+            if base.split('.')[0] != package:
+                continue
+            found.add(base)
+            # `from psycopg2 import extensions` imports a submodule
+            for alias in node.names:
+                found.add(f"{base}.{alias.name}")
+    return found
+
+
+def reachable_modules(package_dir, package, seeds):
+    """Transitive closure of `package` submodules imported from `seeds`"""
+    available = {
+        f"{package}.{name[:-3]}" if name != '__init__.py' else package: os.path.join(package_dir, name)
+        for name in os.listdir(package_dir) if name.endswith('.py')
+    }
+    keep = {package}
+    pending = [m for m in seeds | {package} if m in available]
+    while pending:
+        module = pending.pop()
+        keep.add(module)
+        for imported in module_imports(available[module], package):
+            if imported in available and imported not in keep:
+                pending.append(imported)
+    return keep, available
 
-def create_deployment_package():
+
+def app_psycopg2_imports():
+    """psycopg2 modules imported by lambda_function.py and handlers/"""
+    seeds = set()
+    for source in APP_SOURCES:
+        path = os.path.join(LAMBDA_DIR, source)
+        files = [path] if path.endswith('.py') else [
+            os.path.join(root, f) for root, _, names in os.walk(path) for f in names if f.endswith('.py')
+        ]
+        for file_path in files:
+            seeds |= module_imports(file_path, PSYCOPG2_PACKAGE)
+    return seeds
+
+
+def iter_files(path):
+    """Files under `path` (relative to LAMBDA_DIR), skipping excluded dirs / suffixes"""
+    full = os.path.join(LAMBDA_DIR, path)
+    if os.path.isfile(full):
+        yield full
+        return
+    for root, dirs, files in os.walk(full):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for name in sorted(files):
+            if not name.endswith(EXCLUDED_SUFFIXES):
+                yield os.path.join(root, name)
+
+
+def compile_pyc(file_path, arcname):
+    """(pyc_arcname, bytes) for a source file, unchecked-hash so zip mtimes don't matter"""
+    cache_tag = sys.implementation.cache_tag
+    directory, name = os.path.split(arcname)
+    pyc_arcname = os.path.join(directory, '__pycache__', f"{name[:-3]}.{cache_tag}.pyc").replace(os.sep, '/')
+    with tempfile.TemporaryDirectory() as tmp:
+        target = os.path.join(tmp, 'out.pyc')
+        py_compile.compile(file_path, cfile=target, dfile=arcname, doraise=True, optimize=0,
+                           invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        with open(target, 'rb') as f:
+            return pyc_arcname, f.read()
+
+
+def measure_import(zip_filename):
+    """Extract the package and time `import lambda_function` in a fresh interpreter"""
+    tmp = tempfile.mkdtemp(prefix='lambda_pkg_')
+    try:
+        with zipfile.ZipFile(zip_filename) as zipf:
+            zipf.extractall(tmp)
+        code = "import time; s = time.perf_counter(); import lambda_function; print((time.perf_counter() - s) * 1000)"
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=tmp,
+                              capture_output=True, text=True, env=dict(os.environ, METRICS_ENABLED='0'))
+        if proc.returncode != 0:
+            last = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'unknown error'
+            return None, last
+        modules = sum(1 for line in proc.stderr.splitlines()
+                      if line.startswith('import time:') and 'imported package' not in line)
+        return float(proc.stdout.strip().splitlines()[-1]), modules
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def create_deployment_package(target_python=None, bytecode=True, import_check=True):
     """Create lambda deployment zip with psycopg2"""
-    
+
     print("=" * 80)
     print("CREATING LAMBDA DEPLOYMENT PACKAGE")
     print("=" * 80)
     print()
-    
-    zip_filename = 'lambda/lambda_deploy.zip'
-    
-    with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Add main Lambda function
-        print("Adding lambda_function.py...")
-        zipf.write('lambda/lambda_function.py', 'lambda_function.py')
-        
-        # Add psycopg2 library
+
+    running = f"{sys.version_info.major}.{sys.version_info.minor}"
+    target_python = target_python or running
+    if bytecode and target_python != running:
+        print(f"[WARN] Target Python {target_python} != build Python {running} - shipping source only")
+        bytecode = False
+
+    # Work out which psycopg2 modules the handlers actually need
+    psycopg2_dir = os.path.join(LAMBDA_DIR, PSYCOPG2_PACKAGE)
+    keep, available = reachable_modules(psycopg2_dir, PSYCOPG2_PACKAGE, app_psycopg2_imports())
+    dropped = sorted(set(available) - keep)
+    keep_files = {os.path.basename(available[m]) for m in keep}
+
+    sizes = {}
+    pyc_count = 0
+
+    def add(zipf, arcname, data=None, file_path=None, group=None):
+        info = zipfile.ZipInfo(arcname.replace(os.sep, '/'), date_time=(2020, 1, 1, 0, 0, 0))
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        if data is None:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+        zipf.writestr(info, data, compresslevel=9)
+        sizes[group] = sizes.get(group, 0) + len(data)
+
+    with zipfile.ZipFile(ZIP_FILENAME, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        # Add Lambda function and lazily imported handler modules
+        print("Adding lambda_function.py and handlers/...")
+        for source in APP_SOURCES:
+            for file_path in iter_files(source):
+                arcname = os.path.relpath(file_path, LAMBDA_DIR)
+                add(zipf, arcname, file_path=file_path, group='app')
+                if bytecode and file_path.endswith('.py'):
+                    pyc_arcname, data = compile_pyc(file_path, arcname)
+                    add(zipf, pyc_arcname, data=data, group='app')
+                    pyc_count += 1
+
+        # Add psycopg2 library (reachable modules + compiled extension)
         print("Adding psycopg2 library...")
-        psycopg2_path = 'lambda/psycopg2'
-        for root, dirs, files in os.walk(psycopg2_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                arcname = os.path.relpath(file_path, 'lambda')
-                zipf.write(file_path, arcname)
-                
+        for file_path in iter_files(PSYCOPG2_PACKAGE):
+            name = os.path.basename(file_path)
+            if name.endswith('.py') and name not in keep_files:
+                continue
+            arcname = os.path.relpath(file_path, LAMBDA_DIR)
+            add(zipf, arcname, file_path=file_path, group='psycopg2')
+            if bytecode and name.endswith('.py'):
+                pyc_arcname, data = compile_pyc(file_path, arcname)
+                add(zipf, pyc_arcname, data=data, group='psycopg2')
+                pyc_count += 1
+
         # Add psycopg2 binary libs
         print("Adding psycopg2 binary files...")
-        binary_paths = [
-            'lambda/psycopg2_binary-2.9.11.dist-info',
-            'lambda/psycopg2_binary.libs'
-        ]
-        
-        for binary_path in binary_paths:
-            if os.path.exists(binary_path):
-                for root, dirs, files in os.walk(binary_path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, 'lambda')
-                        zipf.write(file_path, arcname)
-    
-    size_mb = os.path.getsize(zip_filename) / (1024 * 1024)
+        if os.path.exists(os.path.join(LAMBDA_DIR, PSYCOPG2_LIBS)):
+            for file_path in iter_files(PSYCOPG2_LIBS):
+                add(zipf, os.path.relpath(file_path, LAMBDA_DIR), file_path=file_path, group='libs')
+
+    # Compressed size per group
+    compressed = {}
+    with zipfile.ZipFile(ZIP_FILENAME) as zipf:
+        for info in zipf.infolist():
+            group = 'app' if not info.filename.startswith((PSYCOPG2_PACKAGE + '/', PSYCOPG2_LIBS + '/')) else (
+                'psycopg2' if info.filename.startswith(PSYCOPG2_PACKAGE + '/') else 'libs')
+            compressed[group] = compressed.get(group, 0) + info.compress_size
+
+    size_mb = os.path.getsize(ZIP_FILENAME) / (1024 * 1024)
     print()
-    print(f"✅ Deployment package created: {zip_filename}")
+    print(f"✅ Deployment package created: {ZIP_FILENAME}")
     print(f"   Size: {size_mb:.2f} MB")
     print()
+    print("SIZE REPORT")
+    print("-" * 80)
+    for group in ('app', 'psycopg2', 'libs'):
+        if group in sizes:
+            print(f"   {group:<10} {sizes[group] / 1024:>10.1f} KB raw  {compressed.get(group, 0) / 1024:>10.1f} KB zipped")
+    print(f"   bytecode   {pyc_count} modules precompiled for Python {target_python}" if bytecode
+          else "   bytecode   not precompiled")
+    print(f"   psycopg2   dropped unused: {', '.join(dropped) if dropped else 'none'}")
+
+    if import_check:
+        print()
+        print("IMPORT-TIME REPORT")
+        print("-" * 80)
+        if target_python != running:
+            print(f"   [*] Skipped - build Python {running} cannot load a {target_python} package")
+        else:
+            import_ms, detail = measure_import(ZIP_FILENAME)
+            if import_ms is None:
+                print(f"   [WARN] import lambda_function failed from the package: {detail}")
+                print("          (expected when the vendored psycopg2 wheel targets another platform)")
+            else:
+                print(f"   import lambda_function: {import_ms:.1f} ms ({detail} modules)")
+    print()
     print("=" * 80)
     print("READY TO DEPLOY")
     print("=" * 80)
@@ -65,15 +252,9 @@ def create_deployment_package():
     print("  5. Test endpoints!")
 
 if __name__ == '__main__':
-    create_deployment_package()
-
-
-
-
-
-
-
-
-
-
-
+    parser = argparse.ArgumentParser(description='Build the Lambda deployment zip')
+    parser.add_argument('--python', help='Target Lambda Python version, e.g. 3.11 (default: build interpreter)')
+    parser.add_argument('--no-bytecode', action='store_true', help='Ship source only')
+    parser.add_argument('--no-import-check', action='store_true', help='Skip the import-time report')
+    args = parser.parse_args()
+    create_deployment_package(args.python, bytecode=not args.no_bytecode, import_check=not args.no_import_check)
@@ -0,0 +1,407 @@
+"""
+Synthetic scale dataset generator for load testing
+Uses json_exports as templates to build catalogs, inventories, orders, cycle counts and
+shipments at 10x / 100x / 1000x the production snapshot, bulk-loaded into a LOCAL Postgres.
+
+Foreign keys stay consistent: every catalog row points at a loaded formula, bottle
+(packaging_name), closure and brand, and every label_location has a label_inventory row.
+
+Usage:
+    python generate_scale_dataset.py --scale 10 --dsn "dbname=bananas_scale host=localhost user=postgres"
+    python generate_scale_dataset.py --scale 100 --dsn "..." --init-schema --reset
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+import zlib
+
+import psycopg2
+
+from ingest_catalog import (
+    REFERENCE_TABLES, iter_catalog_json, iter_reference_rows,
+    merge_reference_table, stage_rows, table_columns, PROTECTED_COLUMNS
+)
+
+# Get the directory where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Tables rebuilt by --reset (reference tables are upserted, not truncated)
+GENERATED_TABLES = [
+    'shipment_formulas', 'shipment_products', 'shipments',
+    'label_cycle_count_lines', 'label_cycle_counts',
+    'bottle_cycle_count_lines', 'bottle_cycle_counts',
+    'closure_cycle_count_lines', 'closure_cycle_counts',
+    'box_cycle_count_lines', 'box_cycle_counts',
+    'label_order_lines', 'label_orders',
+    'bottle_orders', 'closure_orders', 'box_orders',
+    'label_inventory', 'bottle_inventory', 'closure_inventory', 'box_inventory',
+    'formula_inventory', 'sales_metrics', 'catalog'
+]
+
+# Migrations applied ahead of their number on a fresh database: formula_inventory
+# (017, including gallons_allocated) was added after 005 / 011 / 012 / 014 already
+# joined it in views. Everything else, e.g. 012_add_is_edited_to_orders relying on
+# 005's closure key, already runs after what it needs in filename order.
+EARLY_MIGRATIONS = ['017_create_formula_inventory.sql']
+
+# ============================================
+# SCHEMA / REFERENCE DATA
+# ============================================
+
+def init_schema(cursor):
+    """Create the base schema and apply every migration in filename order (EARLY_MIGRATIONS first)"""
+    migrations = sorted(glob.glob(os.path.join(script_dir, 'migrations', '*.sql')))
+    early = [path for path in migrations if os.path.basename(path) in EARLY_MIGRATIONS]
+    paths = [os.path.join(script_dir, 'database_schema_postgres.sql')]
+    paths += early + [path for path in migrations if path not in early]
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            cursor.execute(f.read())
+        print(f"   [OK] {os.path.basename(path)}")
+
+def load_reference_tables(cursor, exports_dir):
+    """Upsert formula / bottle / closure / brand / ... from the exports (reuses ingest_catalog)"""
+    sources = []
+    for spec in REFERENCE_TABLES:
+        path = os.path.join(exports_dir, spec['file'])
+        if os.path.exists(path):
+            sources.append((spec['table'], iter_reference_rows(path, spec['renames'])))
+    stats = stage_rows(cursor, sources)
+    for spec in REFERENCE_TABLES:
+        if spec['table'] in stats:
+            merge_reference_table(cursor, spec, stats[spec['table']]['keys'])
+    cursor.execute("TRUNCATE ingest_staging")
+
+def fetch_names(cursor, sql):
+    cursor.execute(sql)
+    return [row[0] for row in cursor.fetchall()]
+
+# ============================================
+# CATALOG GENERATION (streamed)
+# ============================================
+
+def remap(value, allowed, rng):
+    """Keep a template value if it exists in the reference table, else pick a loaded one"""
+    if value in allowed:
+        return value
+    return rng.choice(allowed.ordered) if allowed.ordered else None
+
+class NameSet(set):
+    """Set with a stable ordering for deterministic random choice"""
+
+    def __init__(self, names):
+        super().__init__(names)
+        self.ordered = sorted(self)
+
+def iter_synthetic_catalog(templates, scale, refs, seed):
+    """Yield scale x len(templates) catalog rows; copy k suffixes product names with ' {k}'"""
+    rng = random.Random(seed)
+    for k in range(scale):
+        suffix = f" {k}" if k else ''
+        for idx, template in enumerate(templates):
+            row = dict(template)
+            row['product_name'] = f"{template['product_name']}{suffix}"
+            row['brand_name'] = remap(template.get('brand_name'), refs['brand'], rng)
+            row['formula_name'] = remap(template.get('formula_name'), refs['formula'], rng)
+            row['packaging_name'] = remap(template.get('packaging_name'), refs['bottle'], rng)
+            row['closure_name'] = remap(template.get('closure_name'), refs['closure'], rng)
+            row['child_asin'] = f"S{k:04d}{idx:05d}"
+            row['parent_asin'] = f"P{k:04d}{zlib.crc32(template['product_name'].encode()) % 100000:05d}"
+            row['child_sku_final'] = f"{template.get('child_sku_final') or 'SKU'}-S{k}-{idx}"
+            row['label_location'] = f"{template.get('label_location') or 'LBL-SYN'}-{k}-{idx}"
+            row['label_size'] = template.get('label_size') or rng.choice(['5" x 8"', '5.375" x 4.5"', '3" x 5"'])
+            row['case_size'] = template.get('case_size') or rng.choice(refs['box_sizes'] or ['12x10x12'])
+            row['units_per_case'] = template.get('units_per_case') or rng.choice([6, 12, 24, 60])
+            row['upc'] = None
+            yield row
+
+# ============================================
+# SET-BASED FACT GENERATION
+# ============================================
+
+FACT_SQL = [
+    ('sales_metrics', """
+        INSERT INTO sales_metrics (catalog_id, child_asin, units_sold_30_days, sales_30_days,
+                                   sessions_30_days, conversion_rate_30_days, units_sold_7_days, units_sold_90_days)
+        SELECT id, child_asin, u, u * COALESCE(price, 19.99), u * 8, 12.5, u / 4, u * 3
+        FROM (SELECT id, child_asin, price, (random() * 600)::int as u FROM catalog WHERE child_asin IS NOT NULL) c
+        ON CONFLICT DO NOTHING
+    """),
+    ('formula_inventory', """
+        INSERT INTO formula_inventory (formula_name, gallons_available, gallons_in_production)
+        SELECT formula, round((random() * 2000)::numeric, 2), round((random() * 200)::numeric, 2) FROM formula
+        ON CONFLICT (formula_name) DO UPDATE SET gallons_available = EXCLUDED.gallons_available
+    """),
+    ('bottle_inventory', """
+        INSERT INTO bottle_inventory (bottle_name, warehouse_quantity, supplier_quantity, reorder_point)
+        SELECT bottle_name, (random() * 50000)::int, (random() * 100000)::int, 5000 FROM bottle
+        ON CONFLICT (bottle_name) DO UPDATE SET warehouse_quantity = EXCLUDED.warehouse_quantity
+    """),
+    ('closure_inventory', """
+        INSERT INTO closure_inventory (closure_name, warehouse_quantity, supplier_quantity, reorder_point)
+        SELECT closure_name, (random() * 50000)::int, (random() * 100000)::int, 5000 FROM closure
+        ON CONFLICT (closure_name) DO UPDATE SET warehouse_quantity = EXCLUDED.warehouse_quantity
+    """),
+    ('box', """
+        INSERT INTO box (box_size, warehouse_inventory, max_warehouse_inventory, supplier, moq, units_per_pallet, lead_time_weeks)
+        SELECT DISTINCT case_size, 0, 20000, 'Synthetic Box Co', 500, 250, 2 FROM catalog WHERE case_size IS NOT NULL
+        ON CONFLICT (box_size) DO NOTHING
+    """),
+    ('box_inventory', """
+        INSERT INTO box_inventory (box_type, warehouse_quantity, supplier_quantity, reorder_point)
+        SELECT box_size, (random() * 10000)::int, (random() * 20000)::int, 1000 FROM box
+        ON CONFLICT (box_type) DO UPDATE SET warehouse_quantity = EXCLUDED.warehouse_quantity
+    """),
+    ('label_inventory', """
+        INSERT INTO label_inventory (brand_name, product_name, bottle_size, label_size, label_location,
+                                     warehouse_inventory, inbound_quantity, moq, lead_time_weeks)
+        SELECT DISTINCT ON (COALESCE(brand_name, ''), product_name, COALESCE(size, ''))
+            COALESCE(brand_name, ''), product_name, COALESCE(size, ''), label_size, label_location,
+            (random() * 20000)::int, 0, 1000, 3
+        FROM catalog
+        ORDER BY COALESCE(brand_name, ''), product_name, COALESCE(size, ''), id
+        ON CONFLICT (brand_name, product_name, bottle_size) DO UPDATE SET
+            label_location = EXCLUDED.label_location,
+            warehouse_inventory = EXCLUDED.warehouse_inventory
+    """),
+    ('label_formulas', """
+        INSERT INTO label_formulas (label_size, core_weight_grams, grams_per_label)
+        SELECT DISTINCT label_size, 71, 3.35 FROM catalog WHERE label_size IS NOT NULL
+        ON CONFLICT (label_size) DO NOTHING
+    """),
+    ('bottle_orders', """
+        INSERT INTO bottle_orders (order_number, bottle_name, supplier, order_date, expected_delivery_date,
+                                   quantity_ordered, quantity_received, cost_per_unit, total_cost, status)
+        SELECT 'SYN-BO-' || b.bottle_name || '-' || g, b.bottle_name, COALESCE(b.supplier, 'Synthetic'),
+               d, d + 42, q, CASE WHEN s = 'received' THEN q WHEN s = 'partial' THEN q / 2 ELSE 0 END,
+               0.35, q * 0.35, s
+        FROM bottle b
+        CROSS JOIN generate_series(1, %(orders)s) g
+        CROSS JOIN LATERAL (SELECT current_date - (random() * 365)::int as d,
+                                   ((random() * 20 + 1)::int * 1000) as q,
+                                   (ARRAY['pending','ordered','in_transit','partial','received','archived'])[1 + (random() * 5)::int] as s) x
+    """),
+    ('closure_orders', """
+        INSERT INTO closure_orders (order_number, closure_name, supplier, order_date, expected_delivery_date,
+                                    quantity_ordered, quantity_received, cost_per_unit, total_cost, status)
+        SELECT 'SYN-CO-' || c.closure_name || '-' || g, c.closure_name, 'Synthetic',
+               d, d + 28, q, CASE WHEN s = 'received' THEN q WHEN s = 'partial' THEN q / 2 ELSE 0 END,
+               0.08, q * 0.08, s
+        FROM closure c
+        CROSS JOIN generate_series(1, %(orders)s) g
+        CROSS JOIN LATERAL (SELECT current_date - (random() * 365)::int as d,
+                                   ((random() * 20 + 1)::int * 1000) as q,
+                                   (ARRAY['pending','ordered','in_transit','partial','received','archived'])[1 + (random() * 5)::int] as s) x
+    """),
+    ('box_orders', """
+        INSERT INTO box_orders (order_number, box_type, box_size, supplier, order_date, expected_delivery_date,
+                                quantity_ordered, quantity_received, cost_per_unit, total_cost, status)
+        SELECT 'SYN-XO-' || b.box_size || '-' || g, b.box_size, b.box_size, 'Synthetic Box Co',
+               d, d + 14, q, CASE WHEN s = 'received' THEN q WHEN s = 'partial' THEN q / 2 ELSE 0 END,
+               1.10, q * 1.10, s
+        FROM box b
+        CROSS JOIN generate_series(1, %(orders)s) g
+        CROSS JOIN LATERAL (SELECT current_date - (random() * 365)::int as d,
+                                   ((random() * 10 + 1)::int * 250) as q,
+                                   (ARRAY['pending','ordered','in_transit','partial','received','archived'])[1 + (random() * 5)::int] as s) x
+    """),
+    ('label_orders', """
+        INSERT INTO label_orders (order_number, order_date, expected_delivery_date, status)
+        SELECT 'SYN-LO-' || g, d, d + 21,
+               (ARRAY['pending','partial','received','archived'])[1 + (random() * 3)::int]
+        FROM generate_series(1, %(label_orders)s) g
+        CROSS JOIN LATERAL (SELECT current_date - (random() * 365)::int + g * 0 as d) x
+    """),
+    ('label_order_lines', """
+        INSERT INTO label_order_lines (order_id, brand_name, product_name, bottle_size, label_size,
+                                       quantity_ordered, quantity_received, cost_per_label, line_total)
+        SELECT o.id, li.brand_name, li.product_name, li.bottle_size, li.label_size,
+               q, CASE WHEN o.status IN ('received', 'archived') THEN q WHEN o.status = 'partial' THEN q / 2 ELSE 0 END,
+               0.045, q * 0.045
+        FROM label_orders o
+        CROSS JOIN LATERAL (
+            SELECT * FROM label_inventory OFFSET (random() * GREATEST((SELECT count(*) FROM label_inventory) - 5, 0))::int
+            LIMIT 5
+        ) li
+        CROSS JOIN LATERAL (SELECT ((random() * 10 + 1)::int * 1000) + o.id * 0 as q) x
+        WHERE o.order_number LIKE 'SYN-LO-%%'
+    """),
+    ('label_orders totals', """
+        UPDATE label_orders o
+        SET total_quantity = t.qty, total_cost = t.cost
+        FROM (SELECT order_id, SUM(quantity_ordered) as qty, SUM(line_total) as cost
+              FROM label_order_lines GROUP BY order_id) t
+        WHERE o.id = t.order_id AND o.order_number LIKE 'SYN-LO-%%'
+    """),
+    ('cycle counts', """
+        WITH bc AS (
+            INSERT INTO bottle_cycle_counts (count_date, counted_by, status)
+            SELECT current_date - g * 7, 'synthetic', CASE WHEN g %% 2 = 0 THEN 'completed' ELSE 'draft' END
+            FROM generate_series(1, %(cycle_counts)s) g
+            RETURNING id
+        ), bl AS (
+            INSERT INTO bottle_cycle_count_lines (cycle_count_id, bottle_name, expected_quantity, counted_quantity, variance)
+            SELECT bc.id, bi.bottle_name, bi.warehouse_quantity, bi.warehouse_quantity + v, v
+            FROM bc CROSS JOIN bottle_inventory bi
+            CROSS JOIN LATERAL (SELECT (random() * 200 - 100)::int + bc.id * 0 as v) x
+        ), cc AS (
+            INSERT INTO closure_cycle_counts (count_date, counted_by, status)
+            SELECT current_date - g * 7, 'synthetic', CASE WHEN g %% 2 = 0 THEN 'completed' ELSE 'draft' END
+            FROM generate_series(1, %(cycle_counts)s) g
+            RETURNING id
+        ), cl AS (
+            INSERT INTO closure_cycle_count_lines (cycle_count_id, closure_name, expected_quantity, counted_quantity, variance)
+            SELECT cc.id, ci.closure_name, ci.warehouse_quantity, ci.warehouse_quantity + v, v
+            FROM cc CROSS JOIN closure_inventory ci
+            CROSS JOIN LATERAL (SELECT (random() * 200 - 100)::int + cc.id * 0 as v) x
+        ), xc AS (
+            INSERT INTO box_cycle_counts (count_date, counted_by, status)
+            SELECT current_date - g * 7, 'synthetic', CASE WHEN g %% 2 = 0 THEN 'completed' ELSE 'draft' END
+            FROM generate_series(1, %(cycle_counts)s) g
+            RETURNING id
+        ), xl AS (
+            INSERT INTO box_cycle_count_lines (cycle_count_id, box_type, expected_quantity, counted_quantity, variance)
+            SELECT xc.id, xi.box_type, xi.warehouse_quantity, xi.warehouse_quantity + v, v
+            FROM xc CROSS JOIN box_inventory xi
+            CROSS JOIN LATERAL (SELECT (random() * 50 - 25)::int + xc.id * 0 as v) x
+        ), lc AS (
+            INSERT INTO label_cycle_counts (count_date, counted_by, status)
+            SELECT current_date - g * 7, 'synthetic', CASE WHEN g %% 2 = 0 THEN 'completed' ELSE 'draft' END
+            FROM generate_series(1, %(cycle_counts)s) g
+            RETURNING id
+        )
+        INSERT INTO label_cycle_count_lines (cycle_count_id, brand_name, product_name, bottle_size,
+                                             expected_quantity, counted_quantity, variance)
+        SELECT lc.id, li.brand_name, li.product_name, li.bottle_size, li.warehouse_inventory, li.warehouse_inventory + v, v
+        FROM lc
+        CROSS JOIN LATERAL (SELECT * FROM label_inventory ORDER BY random() + lc.id * 0 LIMIT 200) li
+        CROSS JOIN LATERAL (SELECT (random() * 500 - 250)::int + lc.id * 0 as v) x
+    """),
+    ('shipments', """
+        INSERT INTO shipments (shipment_number, shipment_date, shipment_type, marketplace, account, status, created_by)
+        SELECT 'SYN-SH-' || g, current_date - (random() * 180)::int + g * 0,
+               (ARRAY['AWD','FBA'])[1 + (random())::int], 'Amazon', 'TPS Nutrients',
+               (ARRAY['planning','manufacturing','packaging','shipped'])[1 + (random() * 3)::int], 'synthetic'
+        FROM generate_series(1, %(shipments)s) g
+    """),
+    ('shipment_products', """
+        INSERT INTO shipment_products (shipment_id, catalog_id, product_name, brand_name, size, child_asin, child_sku,
+                                       quantity, units_per_case, boxes_needed, bottle_name, formula_name, closure_name,
+                                       label_location, box_type, formula_gallons_needed, bottles_needed, closures_needed, labels_needed)
+        SELECT s.id, c.id, c.product_name, c.brand_name, c.size, c.child_asin, c.child_sku_final,
+               q, c.units_per_case, CEIL(q / NULLIF(c.units_per_case, 0)), c.packaging_name, c.formula_name, c.closure_name,
+               c.label_location, c.case_size, q * COALESCE(sd.gallons_per_unit, 0.25), q, q, q
+        FROM shipments s
+        CROSS JOIN LATERAL (
+            SELECT * FROM catalog WHERE child_asin IS NOT NULL
+            OFFSET (random() * GREATEST((SELECT count(*) FROM catalog) - 20, 0))::int + s.id * 0
+            LIMIT 20
+        ) c
+        LEFT JOIN size_dim sd ON c.size = sd.size
+        CROSS JOIN LATERAL (SELECT ((random() * 20 + 1)::int * 12) + s.id * 0 as q) x
+        WHERE s.shipment_number LIKE 'SYN-SH-%%'
+    """),
+]
+
+# ============================================
+# MAIN
+# ============================================
+
+def generate(args):
+    print("=" * 80)
+    print(f"GENERATING SYNTHETIC DATASET ({args.scale}x)")
+    print("=" * 80)
+    print()
+
+    started = time.time()
+    conn = psycopg2.connect(args.dsn)
+    cursor = conn.cursor()
+
+    try:
+        print("[OK] Connected to database")
+
+        if args.init_schema:
+            print("[*] Initializing schema and migrations...")
+            init_schema(cursor)
+
+        if args.reset:
+            print("[*] Truncating generated tables...")
+            cursor.execute(f"TRUNCATE {', '.join(GENERATED_TABLES)} RESTART IDENTITY CASCADE")
+
+        print("[*] Loading reference tables from exports...")
+        load_reference_tables(cursor, args.exports)
+        refs = {
+            'brand': NameSet(fetch_names(cursor, "SELECT brand_name FROM brand")),
+            'formula': NameSet(fetch_names(cursor, "SELECT formula FROM formula")),
+            'bottle': NameSet(fetch_names(cursor, "SELECT bottle_name FROM bottle")),
+            'closure': NameSet(fetch_names(cursor, "SELECT closure_name FROM closure")),
+            'box_sizes': fetch_names(cursor, "SELECT DISTINCT box_size FROM bottle WHERE box_size IS NOT NULL ORDER BY 1"),
+        }
+        for name in ('brand', 'formula', 'bottle', 'closure'):
+            print(f"   [OK] {name}: {len(refs[name])} rows")
+
+        print(f"[*] Streaming {args.scale}x catalog into staging...")
+        templates = list(iter_catalog_json(os.path.join(args.exports, 'catalog_database_clean.json')))
+        stats = stage_rows(cursor, [('catalog', iter_synthetic_catalog(templates, args.scale, refs, args.seed))])
+        columns = sorted((stats['catalog']['keys'] & table_columns(cursor, 'catalog')) - PROTECTED_COLUMNS)
+        cursor.execute(f"""
+            INSERT INTO catalog ({', '.join(columns)})
+            SELECT {', '.join(f'r.{c}' for c in columns)}
+            FROM ingest_staging s
+            CROSS JOIN LATERAL jsonb_populate_record(NULL::catalog, s.data) r
+            WHERE s.target = 'catalog'
+            ORDER BY s.seq
+        """)
+        print(f"   [OK] catalog: {cursor.rowcount} rows")
+
+        params = {
+            'orders': 5 * args.scale,
+            'label_orders': 10 * args.scale,
+            'cycle_counts': 2 * args.scale,
+            'shipments': 5 * args.scale,
+        }
+        cursor.execute("SELECT setseed(%s)", (((args.seed % 1000) / 1000.0),))
+        print("[*] Generating facts (set-based)...")
+        for name, sql in FACT_SQL:
+            step = time.time()
+            cursor.execute(sql, params)
+            print(f"   [OK] {name}: {cursor.rowcount} rows ({time.time() - step:.2f}s)")
+
+        cursor.execute("ANALYZE")
+        conn.commit()
+
+        print()
+        print("=" * 80)
+        print(f"DATASET READY in {time.time() - started:.2f}s")
+        print("=" * 80)
+
+    except Exception as e:
+        conn.rollback()
+        print(f"\n[ERROR] {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic scale dataset in a local Postgres')
+    parser.add_argument('--scale', type=int, default=10, help='Multiplier over the json_exports snapshot (10, 100, 1000)')
+    parser.add_argument('--dsn', required=True, help='libpq connection string for the LOCAL database')
+    parser.add_argument('--exports', default=os.path.join(script_dir, 'json_exports'),
+                        help='Directory containing *_database_clean.json exports')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible datasets')
+    parser.add_argument('--init-schema', action='store_true', help='Create schema and run all migrations first')
+    parser.add_argument('--reset', action='store_true', help='Truncate generated tables before loading')
+    args = parser.parse_args()
+
+    if 'rds.amazonaws.com' in args.dsn:
+        print("[FAIL] Refusing to generate synthetic data against RDS - use a local database")
+        sys.exit(1)
+
+    generate(args)
@@ -0,0 +1,655 @@
+"""
+Streaming catalog ingestion
+Loads the catalog (json_exports, the CatalogDataBase CSV or the xlsx workbook) and the
+reference tables (formula, bottle, closure, brand, bag, kit, finished_goods) into RDS.
+
+Rows are streamed into a temp staging table with COPY FROM STDIN (one JSONB document per
+row) and merged with set-based upserts, so memory stays flat regardless of file size.
+
+Usage:
+    python ingest_catalog.py                                  # json_exports/*_clean.json
+    python ingest_catalog.py --catalog-csv "../1000 Bananas Database - CatalogDataBase.csv"
+    python ingest_catalog.py --catalog-xlsx "../1000 Bananas Database (1).xlsx"
+    python ingest_catalog.py --dsn "dbname=bananas host=localhost" --dry-run
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+import time
+
+import psycopg2
+
+# Get the directory where this script is located
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+DB_CONFIG = {
+    'host': 'bananas-db.cf6s2y8ae04j.ap-southeast-2.rds.amazonaws.com',
+    'port': 5432,
+    'database': 'postgres',
+    'user': 'postgres',
+    'password': 'postgres'
+}
+
+# ============================================
+# SOURCE -> COLUMN MAPPINGS
+# ============================================
+
+# Catalog sheet headers (normalized: lowercase, single spaces) -> catalog columns
+CATALOG_LABELS = {
+    # Product Images
+    'product images': 'product_image_url',
+    'basic wrap': 'basic_wrap_url',
+    'plant behind product': 'plant_behind_product_url',
+    'tri-bottle wrap': 'tri_bottle_wrap_url',
+
+    # Core Product Info
+    'date added': 'date_added',
+    'marketplace': 'marketplace',
+    'seller account': 'seller_account',
+    'country': 'country',
+    'brand name': 'brand_name',
+    'product name': 'product_name',
+    'size': 'size',
+    'type': 'type',
+
+    # Packaging
+    'packaging name': 'packaging_name',
+    'closure name': 'closure_name',
+    'label size': 'label_size',
+    'label location': 'label_location',
+    'case size': 'case_size',
+    'units per case': 'units_per_case',
+    'filter': 'filter',
+    'upc': 'upc',
+    'upc image file': 'upc_image_file',
+    'parent asin': 'parent_asin',
+    'child asin': 'child_asin',
+    'parent sku final': 'parent_sku_final',
+    'child sku final': 'child_sku_final',
+
+    # Formula
+    'formula': 'formula_name',
+    'formula name': 'formula_name',
+    'msds': 'msds',
+    'guaranteed analysis': 'guaranteed_analysis',
+    'npk': 'npk',
+    'derived from': 'derived_from',
+    'storage / warranty / precautionary / metals': 'storage_warranty_precautionary_metals',
+    'units sold 30 days': 'units_sold_30_days',
+    'vine notes': 'vine_notes',
+    'brand tailor discount': 'brand_tailor_discount',
+
+    # Marketing
+    'core competitor asins': 'core_competitor_asins',
+    'other competitor asins': 'other_competitor_asins',
+    'core keywords': 'core_keywords',
+    'other keywords': 'other_keywords',
+
+    # Label
+    'stock image': 'stock_image',
+    'label: ai file': 'label_ai_file',
+    'label: print ready pdf': 'label_print_ready_pdf',
+
+    # TPS Label Copy
+    'tps plant foods left side benefit graphic': 'tps_left_side_benefit_graphic',
+    'tps plant foods directions': 'tps_directions',
+    'tps plant foods growing recommendations': 'tps_growing_recommendations',
+    'qr code section': 'qr_code_section',
+    'website': 'website',
+    'product title': 'product_title',
+    'center benefit statement': 'center_benefit_statement',
+    'size copy for label': 'size_copy_for_label',
+    'right side benefit graphic': 'right_side_benefit_graphic',
+    'ingredient statement': 'ingredient_statement',
+    'tps guaranteed analysis': 'tps_guaranteed_analysis',
+    'tps npk': 'tps_npk',
+    'tps derived from': 'tps_derived_from',
+    'tps storage / warranty / precautionary / metals': 'tps_storage_warranty_precautionary_metals',
+    'tps address': 'tps_address',
+
+    # Slides / A+
+    **{f'amazon slide #{i}': f'amazon_slide_{i}' for i in range(1, 8)},
+    **{f'amazon a+ slide #{i}': f'amazon_a_plus_slide_{i}' for i in range(1, 7)},
+
+    # Website
+    'tbd': 'tbd',
+
+    # Listing Setup
+    'product dimensions length (in)': 'product_dimensions_length_in',
+    'product dimensions width (in)': 'product_dimensions_width_in',
+    'product dimensions height (in)': 'product_dimensions_height_in',
+    'product dimensions weight (lbs)': 'product_dimensions_weight_lbs',
+    '6 sided image front': 'six_sided_image_front',
+    '6 sided image left': 'six_sided_image_left',
+    '6 sided image back': 'six_sided_image_back',
+    '6 sided image right': 'six_sided_image_right',
+    '6 sided image top': 'six_sided_image_top',
+    '6 sided image bottom': 'six_sided_image_bottom',
+
+    # Price / Listing Copy
+    'price': 'price',
+    'title': 'title',
+    'bullets': 'bullets',
+    'description': 'description',
+
+    # Vine
+    'status': 'vine_status',
+    'vine launch date': 'vine_launch_date',
+    'units enrolled': 'units_enrolled',
+    'vine reviews': 'vine_reviews',
+    'star rating': 'star_rating',
+}
+
+# Vine section reuses generic labels ("Notes", "Status")
+CATALOG_VINE_LABELS = {
+    'notes': 'vine_program_notes',
+    'status': 'vine_status',
+}
+
+# catalog.notes holds the selection JSON document, so the sheet's free-text
+# NOTES column is not loaded (the second "Notes" column is the vine one)
+CATALOG_SKIPPED_LABELS = {'notes'}
+
+# Reference tables: export file, conflict key and key renames (per nested section)
+REFERENCE_TABLES = [
+    {
+        'table': 'brand',
+        'file': 'brand_database_clean.json',
+        'key': ['brand_name'],
+        'renames': {'entity': 'brand_name', 'address': 'brand_address',
+                    'website': 'brand_website', 'email': 'brand_email'},
+    },
+    {
+        'table': 'formula',
+        'file': 'formula_database_clean.json',
+        'key': ['formula'],
+        'renames': {},
+    },
+    {
+        'table': 'bottle',
+        'file': 'bottle_database_clean.json',
+        'key': ['bottle_name'],
+        'renames': {'finished_goods.units_per_case': 'finished_units_per_case'},
+    },
+    {
+        'table': 'closure',
+        'file': 'closure_database_clean.json',
+        'key': ['closure_name'],  # unique on its own since migration 005
+        'renames': {'supplier': 'closure_supplier', 'description': 'closure_description',
+                    'packaging_part_number': 'closure_part_number'},
+    },
+    {
+        'table': 'bag',
+        'file': 'bag_database_clean.json',
+        'key': ['packaging_name'],
+        'renames': {},
+    },
+    {
+        'table': 'kit',
+        'file': 'kit_database_clean.json',
+        'key': ['packaging_name'],
+        'renames': {},
+    },
+    {
+        'table': 'finished_goods',
+        'file': 'finished_goods_database_clean.json',
+        'key': ['finished_good_name'],
+        'renames': {'packaging_name': 'finished_good_name'},
+    },
+]
+
+# Catalog has no natural unique key; rows match on child ASIN, else product name + size
+CATALOG_MATCH_KEY = "COALESCE(NULLIF({a}.child_asin, ''), {a}.product_name || '|' || COALESCE({a}.size, ''))"
+
+# Catalog foreign keys (migration 005): catalog column -> (table, key). Staged values
+# with no spec row are loaded as NULL, as 005 did, instead of aborting the merge
+CATALOG_REFERENCES = {
+    'packaging_name': ('bottle', 'bottle_name'),
+    'closure_name': ('closure', 'closure_name'),
+    'formula_name': ('formula', 'formula'),
+    'brand_name': ('brand', 'brand_name'),
+}
+
+# Columns never written by the loader
+PROTECTED_COLUMNS = {'id', 'created_at', 'updated_at'}
+
+# Numeric column types coerced before staging ('25,000' -> 25000, '??' -> NULL)
+INTEGER_TYPES = {'smallint', 'integer', 'bigint'}
+DECIMAL_TYPES = {'numeric', 'real', 'double precision'}
+
+# ============================================
+# STREAMING READERS
+# ============================================
+
+def normalize_label(label):
+    """'Units per\\nCase ' -> 'units per case'"""
+    return re.sub(r'\s+', ' ', str(label)).strip().lower()
+
+def normalize_value(value):
+    """Empty strings become NULL; integral floats (UPC 850048592735.0) lose the .0"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+def iter_json_array(path, chunk_size=65536):
+    """Yield the elements of a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    started = False
+    eof = False
+
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            # Skip whitespace, the opening bracket and separators
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ',' or (not started and buffer[pos] == '[')):
+                if buffer[pos] == '[':
+                    started = True
+                pos += 1
+
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+
+            if pos < len(buffer):
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                    yield item
+                    pos = end
+                    continue
+                except ValueError:
+                    if eof:
+                        raise
+            elif eof:
+                return
+
+            # Need more data: drop consumed text and read the next chunk
+            buffer = buffer[pos:]
+            pos = 0
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+            buffer += chunk
+
+def flatten_sections(record, renames=None):
+    """Flatten {'section': {'key': value}} exports into one dict, applying key renames"""
+    renames = renames or {}
+    row = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            for sub_key, sub_value in value.items():
+                column = renames.get(f'{key}.{sub_key}') or renames.get(sub_key) or sub_key
+                row.setdefault(column, normalize_value(sub_value))
+        else:
+            row[renames.get(key) or key] = normalize_value(value)
+
+    # Export keys use "___" for " / " (tps_storage___warranty___...)
+    return {re.sub(r'_{2,}', '_', k): v for k, v in row.items()}
+
+def iter_reference_rows(path, renames):
+    """Flattened rows of one reference table export"""
+    for record in iter_json_array(path):
+        yield flatten_sections(record, renames)
+
+def coerce_numeric(value, integer=False):
+    """Sheet numbers to JSON numbers: thousands separators / $ stripped, anything else NULL"""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = value
+    else:
+        try:
+            number = float(re.sub(r'[\s,$]', '', str(value)))
+        except ValueError:
+            return None
+    if isinstance(number, float) and not math.isfinite(number):
+        return None
+    if integer:
+        return int(round(number))
+    return number
+
+def iter_catalog_json(path):
+    """Catalog rows from catalog_database_clean.json (sectioned records)"""
+    for record in iter_json_array(path):
+        row = {}
+        for section, values in record.items():
+            if not isinstance(values, dict):
+                continue
+            for label, value in values.items():
+                key = normalize_label(label)
+                if section == 'vine' and key in CATALOG_VINE_LABELS:
+                    column = CATALOG_VINE_LABELS[key]
+                elif key in CATALOG_SKIPPED_LABELS:
+                    continue
+                else:
+                    column = CATALOG_LABELS.get(key)
+                if column:
+                    row[column] = normalize_value(value)
+        if row.get('product_name'):
+            yield row
+
+def map_header(header):
+    """Map a sheet header row to catalog columns (None = ignored column)"""
+    columns = []
+    seen = set()
+    for label in header:
+        key = normalize_label(label) if label is not None else ''
+        if key in seen and key in CATALOG_VINE_LABELS:
+            column = CATALOG_VINE_LABELS[key]
+        elif key in CATALOG_SKIPPED_LABELS:
+            column = None
+        else:
+            column = CATALOG_LABELS.get(key)
+        if column in columns:
+            column = None
+        seen.add(key)
+        columns.append(column)
+    return columns
+
+def iter_catalog_rows(rows):
+    """Catalog rows from a tabular sheet (banner rows above the real header are skipped)"""
+    columns = None
+    for values in rows:
+        if columns is None:
+            if any(v is not None and normalize_label(v) == 'product name' for v in values):
+                columns = map_header(values)
+            continue
+        row = {}
+        for column, value in zip(columns, values):
+            if column:
+                row[column] = normalize_value(value)
+        if row.get('product_name'):
+            yield row
+
+def iter_catalog_csv(path):
+    """Catalog rows from the CatalogDataBase CSV export"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        yield from iter_catalog_rows(csv.reader(f))
+
+def iter_catalog_xlsx(path, sheet_name=None):
+    """Catalog rows from the workbook using openpyxl read-only mode"""
+    import openpyxl
+
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else next(
+            (s for s in wb.worksheets if 'catalog' in s.title.lower()), wb.worksheets[0]
+        )
+        yield from iter_catalog_rows(ws.iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+# ============================================
+# COPY STAGING
+# ============================================
+
+class IteratorFile:
+    """Minimal file-like wrapper so copy_expert can pull lines from a generator"""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = ''
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            try:
+                self._buffer += next(self._lines)
+            except StopIteration:
+                break
+        if size < 0:
+            data, self._buffer = self._buffer, ''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+def staging_lines(sources, stats, numeric=None):
+    """Encode (target, row) pairs as COPY text lines: target<TAB>json
+
+    `numeric` maps target -> {column: is_integer}; those values are coerced so
+    jsonb_populate_record never sees '25,000' or '??' for a number column.
+    """
+    numeric = numeric or {}
+    for target, rows in sources:
+        keys = stats.setdefault(target, {'rows': 0, 'keys': set()})
+        target_numeric = numeric.get(target, {})
+        for row in rows:
+            for column in target_numeric.keys() & row.keys():
+                row[column] = coerce_numeric(row[column], target_numeric[column])
+            keys['rows'] += 1
+            keys['keys'].update(k for k, v in row.items() if v is not None)
+            # COPY text format treats backslash as an escape character
+            payload = json.dumps(row, default=str).replace('\\', '\\\\')
+            yield f"{target}\t{payload}\n"
+
+def stage_rows(cursor, sources):
+    """COPY (target, row iterator) pairs into a temp ingest_staging table; returns per-target stats"""
+    sources = list(sources)
+    numeric = numeric_columns(cursor, [target for target, _ in sources])
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS ingest_staging (
+            seq BIGSERIAL,
+            target VARCHAR(50) NOT NULL,
+            data JSONB NOT NULL
+        ) ON COMMIT DROP
+    """)
+    stats = {}
+    cursor.copy_expert(
+        "COPY ingest_staging (target, data) FROM STDIN",
+        IteratorFile(staging_lines(sources, stats, numeric))
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS ingest_staging_target_idx ON ingest_staging (target)")
+    cursor.execute("ANALYZE ingest_staging")
+    return stats
+
+def table_columns(cursor, table):
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = %s AND table_schema = current_schema()
+    """, (table,))
+    return {row[0] for row in cursor.fetchall()}
+
+def numeric_columns(cursor, tables):
+    """{table: {column: is_integer}} for the numeric columns of `tables`"""
+    cursor.execute("""
+        SELECT table_name, column_name, data_type FROM information_schema.columns
+        WHERE table_name = ANY(%s) AND table_schema = current_schema()
+          AND data_type = ANY(%s)
+    """, (list(tables), sorted(INTEGER_TYPES | DECIMAL_TYPES)))
+    numeric = {}
+    for table, column, data_type in cursor.fetchall():
+        numeric.setdefault(table, {})[column] = data_type in INTEGER_TYPES
+    return numeric
+
+# ============================================
+# SET-BASED MERGES
+# ============================================
+
+def merge_reference_table(cursor, spec, staged_keys):
+    """INSERT ... ON CONFLICT DO UPDATE from staging for one reference table"""
+    table = spec['table']
+    key = spec['key']
+    columns = sorted((staged_keys & table_columns(cursor, table)) - PROTECTED_COLUMNS)
+    if not all(k in columns for k in key):
+        print(f"   [SKIP] {table}: staged rows have no {', '.join(key)}")
+        return 0
+
+    column_sql = ', '.join(columns)
+    select_sql = ', '.join(f"r.{c}" for c in columns)
+    key_sql = ', '.join(key)
+    update_sql = ', '.join(f"{c} = COALESCE(EXCLUDED.{c}, {table}.{c})" for c in columns if c not in key)
+
+    cursor.execute(f"""
+        INSERT INTO {table} ({column_sql})
+        SELECT DISTINCT ON ({', '.join(f'r.{k}' for k in key)}) {select_sql}
+        FROM ingest_staging s
+        CROSS JOIN LATERAL jsonb_populate_record(NULL::{table}, s.data) r
+        WHERE s.target = %s AND {' AND '.join(f'r.{k} IS NOT NULL' for k in key)}
+        ORDER BY {', '.join(f'r.{k}' for k in key)}, s.seq DESC
+        ON CONFLICT ({key_sql}) DO UPDATE SET
+            {update_sql + ',' if update_sql else ''}
+            updated_at = CURRENT_TIMESTAMP
+    """, (table,))
+    return cursor.rowcount
+
+def merge_catalog(cursor, staged_keys):
+    """UPDATE matched catalog rows, then INSERT the rest (no unique key to conflict on)
+
+    Returns (updated, inserted, {column: rows whose reference was unknown and left NULL}).
+    """
+    columns = sorted((staged_keys & table_columns(cursor, 'catalog')) - PROTECTED_COLUMNS)
+    select_sql = ', '.join(f"r.{c}" for c in columns)
+
+    # Latest staged row per match key
+    cursor.execute(f"""
+        CREATE TEMP TABLE ingest_catalog ON COMMIT DROP AS
+        SELECT DISTINCT ON (match_key) *
+        FROM (
+            SELECT {CATALOG_MATCH_KEY.format(a='r')} as match_key, s.seq, {select_sql}
+            FROM ingest_staging s
+            CROSS JOIN LATERAL jsonb_populate_record(NULL::catalog, s.data) r
+            WHERE s.target = 'catalog'
+        ) staged
+        ORDER BY match_key, seq DESC
+    """)
+    cursor.execute("CREATE INDEX ON ingest_catalog (match_key)")
+    cursor.execute("ANALYZE ingest_catalog")
+
+    unmatched = {}
+    for column, (table, key) in CATALOG_REFERENCES.items():
+        if column not in columns:
+            continue
+        cursor.execute(f"""
+            UPDATE ingest_catalog i
+            SET {column} = NULL
+            WHERE i.{column} IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM {table} t WHERE t.{key} = i.{column})
+        """)
+        if cursor.rowcount:
+            unmatched[column] = cursor.rowcount
+
+    # Sheet values win, but blanks never wipe data edited in the app
+    set_sql = ', '.join(f"{c} = COALESCE(i.{c}, c.{c})" for c in columns)
+    cursor.execute(f"""
+        UPDATE catalog c
+        SET {set_sql},
+            updated_at = CURRENT_TIMESTAMP
+        FROM ingest_catalog i
+        WHERE {CATALOG_MATCH_KEY.format(a='c')} = i.match_key
+    """)
+    updated = cursor.rowcount
+
+    column_sql = ', '.join(columns)
+    cursor.execute(f"""
+        INSERT INTO catalog ({column_sql})
+        SELECT {', '.join(f'i.{c}' for c in columns)}
+        FROM ingest_catalog i
+        WHERE NOT EXISTS (
+            SELECT 1 FROM catalog c
+            WHERE {CATALOG_MATCH_KEY.format(a='c')} = i.match_key
+        )
+    """)
+    inserted = cursor.rowcount
+    return updated, inserted, unmatched
+
+# ============================================
+# MAIN
+# ============================================
+
+def build_sources(args):
+    """(target, row iterator) pairs in load order: reference tables first, then catalog"""
+    sources = []
+    for spec in REFERENCE_TABLES:
+        path = os.path.join(args.exports, spec['file'])
+        if os.path.exists(path):
+            sources.append((spec['table'], iter_reference_rows(path, spec['renames'])))
+        else:
+            print(f"   [SKIP] {spec['file']} not found")
+
+    if args.catalog_xlsx:
+        sources.append(('catalog', iter_catalog_xlsx(args.catalog_xlsx, args.sheet)))
+    elif args.catalog_csv:
+        sources.append(('catalog', iter_catalog_csv(args.catalog_csv)))
+    else:
+        sources.append(('catalog', iter_catalog_json(os.path.join(args.exports, 'catalog_database_clean.json'))))
+    return sources
+
+def run_ingestion(args):
+    """Stream all sources into staging, then merge in one transaction"""
+    print("=" * 80)
+    print("CATALOG INGESTION")
+    print("=" * 80)
+    print()
+
+    started = time.time()
+    conn = psycopg2.connect(args.dsn) if args.dsn else psycopg2.connect(**DB_CONFIG)
+    cursor = conn.cursor()
+
+    try:
+        print("[OK] Connected to database")
+
+        print("[*] Streaming rows into staging (COPY FROM STDIN)...")
+        stats = stage_rows(cursor, build_sources(args))
+        for target, info in stats.items():
+            print(f"   [OK] {target}: {info['rows']} rows staged")
+        print(f"   Staging took {time.time() - started:.2f}s")
+        print()
+
+        print("[*] Merging reference tables...")
+        for spec in REFERENCE_TABLES:
+            if spec['table'] in stats:
+                count = merge_reference_table(cursor, spec, stats[spec['table']]['keys'])
+                print(f"   [OK] {spec['table']}: {count} rows upserted")
+
+        print("[*] Merging catalog...")
+        if 'catalog' in stats:
+            updated, inserted, unmatched = merge_catalog(cursor, stats['catalog']['keys'])
+            print(f"   [OK] catalog: {updated} updated, {inserted} inserted")
+            for column, count in unmatched.items():
+                table, key = CATALOG_REFERENCES[column]
+                print(f"   [WARN] catalog: {count} rows with a {column} not in {table}.{key} loaded as NULL")
+
+        if args.dry_run:
+            conn.rollback()
+            print("\n[*] Dry run - rolled back")
+        else:
+            conn.commit()
+
+        print()
+        print("=" * 80)
+        print(f"INGESTION COMPLETE in {time.time() - started:.2f}s")
+        print("=" * 80)
+
+    except Exception as e:
+        conn.rollback()
+        print(f"\n[ERROR] {str(e)}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stream catalog and reference data into Postgres')
+    parser.add_argument('--exports', default=os.path.join(script_dir, 'json_exports'),
+                        help='Directory containing *_database_clean.json exports')
+    parser.add_argument('--catalog-csv', help='Load catalog rows from the CatalogDataBase CSV instead')
+    parser.add_argument('--catalog-xlsx', help='Load catalog rows from the xlsx workbook instead')
+    parser.add_argument('--sheet', help='Worksheet name for --catalog-xlsx (default: first "catalog" sheet)')
+    parser.add_argument('--dsn', help='libpq connection string (default: RDS DB_CONFIG)')
+    parser.add_argument('--dry-run', action='store_true', help='Roll back instead of committing')
+    run_ingestion(parser.parse_args())
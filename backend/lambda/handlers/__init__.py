@@ -0,0 +1,3 @@
+"""
+Endpoint handlers grouped by domain, imported lazily by lambda_function.handler()
+"""
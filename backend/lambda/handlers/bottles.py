@@ -0,0 +1,323 @@
+"""
+Supply chain - bottle inventory, forecast requirements and orders
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response, get_forecast_data, insert_component_orders, join_reference, record_supplier_receipts
+
+# ============================================
+# SUPPLY CHAIN - BOTTLE ENDPOINTS
+# ============================================
+
+def get_bottle_inventory(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("SELECT * FROM bottle_inventory ORDER BY bottle_name")
+        # Bottle specs come from the reference cache instead of a join
+        inventory = join_reference(cursor.fetchall(), 'bottle', 'bottle_name', 'bottle_name', {
+            column: column for column in (
+                'bottles_per_minute', 'max_warehouse_inventory', 'units_per_pallet', 'units_per_case',
+                'cases_per_pallet', 'supplier', 'moq', 'lead_time_weeks'
+            )
+        }, cursor)
+        return cors_response(200, {'success': True, 'data': inventory})
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_bottle_forecast_requirements(event):
+    """GET /supply-chain/bottles/forecast-requirements - Calculate bottle requirements based on forecast API"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Get query params for forecast period (default 120 days DOI goal)
+        query_params = event.get('queryStringParameters') or {}
+        doi_goal = int(query_params.get('doi_goal', 120))
+        safety_buffer = float(query_params.get('safety_buffer', 0.85))  # Default 85% max capacity
+        
+        # Get all products grouped by bottle type
+        cursor.execute("""
+            SELECT 
+                c.packaging_name as bottle_name,
+                c.child_asin,
+                c.product_name,
+                c.size,
+                b.max_warehouse_inventory,
+                bi.warehouse_quantity as current_inventory
+            FROM catalog c
+            LEFT JOIN bottle b ON c.packaging_name = b.bottle_name
+            LEFT JOIN bottle_inventory bi ON c.packaging_name = bi.bottle_name
+            WHERE c.packaging_name IS NOT NULL
+            ORDER BY c.packaging_name
+        """)
+        
+        products = cursor.fetchall()
+        
+        # Fetch forecast data CONCURRENTLY for all ASINs
+        forecast_cache = {}
+        unique_asins = [p.get('child_asin') for p in products if p.get('child_asin')]
+        
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            future_to_asin = {executor.submit(get_forecast_data, asin): asin for asin in unique_asins}
+            for future in as_completed(future_to_asin):
+                asin = future_to_asin[future]
+                try:
+                    forecast_cache[asin] = future.result()
+                except Exception:
+                    forecast_cache[asin] = {'daily_forecast_avg': 0, 'weekly_forecast_avg': 0}
+        
+        # Group by bottle and calculate forecasts from cached data
+        bottle_data = {}
+        for product in products:
+            bottle_name = product['bottle_name']
+            asin = product['child_asin']
+            
+            if bottle_name not in bottle_data:
+                bottle_data[bottle_name] = {
+                    'bottle_name': bottle_name,
+                    'max_warehouse_inventory': product['max_warehouse_inventory'],
+                    'current_inventory': product['current_inventory'] or 0,
+                    'forecasted_units_needed': 0,
+                    'products': []
+                }
+            
+            # Get forecast from cache
+            if asin and asin in forecast_cache:
+                forecast = forecast_cache[asin]
+                daily_forecast = forecast.get('daily_forecast_avg', 0) or forecast.get('avg_daily_sales', 0)
+                units_needed = daily_forecast * doi_goal
+                
+                bottle_data[bottle_name]['forecasted_units_needed'] += units_needed
+                bottle_data[bottle_name]['products'].append({
+                    'product_name': product['product_name'],
+                    'size': product['size'],
+                    'daily_forecast_rate': round(daily_forecast, 2)
+                })
+        
+        # Calculate recommended order quantities
+        results = []
+        for bottle_name, data in bottle_data.items():
+            current_inv = data['current_inventory']
+            forecasted = data['forecasted_units_needed']
+            max_inventory = data['max_warehouse_inventory'] or 999999
+            
+            # Calculate available capacity
+            available_capacity = max(0, (max_inventory * safety_buffer) - current_inv) if max_inventory < 999999 else 999999
+            
+            # Calculate recommended order quantity (capped by available capacity)
+            recommended_qty = max(0, forecasted - current_inv)
+            if max_inventory < 999999:
+                recommended_qty = min(recommended_qty, available_capacity)
+            
+            results.append({
+                'bottle_name': bottle_name,
+                'max_warehouse_inventory': max_inventory,
+                'current_inventory': current_inv,
+                'forecasted_units_needed': round(forecasted, 2),
+                'available_capacity': available_capacity,
+                'recommended_order_qty': round(recommended_qty, 2),
+                'products_using_bottle': data['products']
+            })
+        
+        return cors_response(200, {
+            'success': True,
+            'data': results,
+            'doi_goal': doi_goal,
+            'safety_buffer': safety_buffer,
+            'safety_buffer_pct': int(safety_buffer * 100)
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_bottle_orders(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("SELECT * FROM bottle_orders ORDER BY order_date DESC")
+        orders = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in orders]})
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_bottle_order_by_id(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        order_id = event['pathParameters']['id']
+        
+        # First get the base order to find the order number
+        cursor.execute("SELECT order_number, supplier FROM bottle_orders WHERE id = %s", (order_id,))
+        base_order = cursor.fetchone()
+        
+        if not base_order:
+            return cors_response(404, {'success': False, 'error': 'Order not found'})
+        
+        order_number = base_order['order_number']
+        supplier = base_order['supplier']
+        
+        # Extract base order number (remove bottle suffix if present)
+        base_order_number = order_number.split('-')[0]
+        
+        # Fetch all orders with the same base order number
+        cursor.execute("""
+            SELECT bo.*, b.units_per_pallet, b.units_per_case, b.cases_per_pallet
+            FROM bottle_orders bo
+            LEFT JOIN bottle b ON bo.bottle_name = b.bottle_name
+            WHERE bo.order_number LIKE %s
+            ORDER BY bo.bottle_name
+        """, (f"{base_order_number}%",))
+        
+        order_lines = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'id': order_id,
+                'order_number': base_order_number,
+                'supplier': supplier,
+                'lines': [dict(line) for line in order_lines]
+            }
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_bottle_order(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        data = json.loads(event.get('body', '{}'))
+        
+        # Check if this is a batch order (multiple bottles) or single order
+        bottles = data.get('bottles')
+        
+        if bottles and isinstance(bottles, list) and len(bottles) > 0:
+            # Batch order creation - multiple bottles in one order, one INSERT for all lines
+            created_orders = insert_component_orders(cursor, 'bottle_orders', 'bottle_name', data, bottles)
+            
+            conn.commit()
+            return cors_response(201, {
+                'success': True, 
+                'data': created_orders,
+                'count': len(created_orders),
+                'base_order_number': data.get('order_number')
+            })
+        else:
+            # Single order creation (legacy support)
+            cursor.execute("""
+                INSERT INTO bottle_orders (order_number, bottle_name, supplier, order_date,
+                                           expected_delivery_date, quantity_ordered, cost_per_unit,
+                                           total_cost, status, notes)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING *
+            """, (data.get('order_number'), data.get('bottle_name'), data.get('supplier'),
+                  data.get('order_date'), data.get('expected_delivery_date'),
+                  data.get('quantity_ordered'), data.get('cost_per_unit'),
+                  data.get('total_cost'), data.get('status', 'pending'), data.get('notes')))
+            order = cursor.fetchone()
+            conn.commit()
+            return cors_response(201, {'success': True, 'data': dict(order)})
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_bottle_order(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        order_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        
+        # Get current order to check quantities
+        cursor.execute("SELECT quantity_ordered, quantity_received, status FROM bottle_orders WHERE id = %s", (order_id,))
+        current_order = cursor.fetchone()
+        
+        qty_received = data.get('quantity_received')
+        bottle_name = data.get('bottle_name')
+        new_status = data.get('status')
+        
+        # Determine if this is partial receive
+        if qty_received is not None and current_order:
+            qty_ordered = current_order['quantity_ordered']
+            
+            # Validate: cannot receive more than ordered
+            if qty_received > qty_ordered:
+                return cors_response(400, {
+                    'success': False,
+                    'error': f'Cannot receive {qty_received} units. Maximum is {qty_ordered} units ordered.'
+                })
+            
+            # If received quantity is less than ordered, it's partial
+            if qty_received < qty_ordered:
+                new_status = 'partial'
+            elif qty_received >= qty_ordered and new_status != 'archived':
+                new_status = 'received'
+        
+        # If receiving (received or partial), update inventory
+        if new_status in ['received', 'partial'] and qty_received is not None and qty_received > 0 and bottle_name:
+            # Get previous received quantity to calculate delta
+            prev_received = current_order['quantity_received'] if current_order else 0
+            qty_to_add = qty_received - prev_received
+            
+            # Only add positive delta to prevent duplicates or negative additions
+            if qty_to_add > 0:
+                cursor.execute("""
+                    UPDATE bottle_inventory 
+                    SET warehouse_quantity = warehouse_quantity + %s
+                    WHERE bottle_name = %s
+                """, (qty_to_add, bottle_name))
+        
+        cursor.execute("""
+            UPDATE bottle_orders 
+            SET status = COALESCE(%s, status),
+                actual_delivery_date = COALESCE(%s, actual_delivery_date),
+                quantity_received = COALESCE(%s, quantity_received),
+                is_edited = COALESCE(%s, is_edited)
+            WHERE id = %s RETURNING *
+        """, (new_status, data.get('actual_delivery_date'), 
+              qty_received, data.get('is_edited'), order_id))
+        
+        order = cursor.fetchone()
+        # First time this order is received: fold its lead time into supplier_performance
+        if order and order['status'] == 'received' and current_order and current_order['status'] != 'received':
+            record_supplier_receipts(cursor, [{**order, 'component_type': 'bottle', 'component_name': order['bottle_name']}])
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(order)}) if order else cors_response(404, {'success': False, 'error': 'Not found'})
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_bottle_inventory(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        inventory_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        cursor.execute("""
+            UPDATE bottle_inventory 
+            SET warehouse_quantity = COALESCE(%s, warehouse_quantity),
+                supplier_quantity = COALESCE(%s, supplier_quantity)
+            WHERE id = %s RETURNING *
+        """, (data.get('warehouse_quantity'), data.get('supplier_quantity'), inventory_id))
+        inventory = cursor.fetchone()
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(inventory)}) if inventory else cors_response(404, {'success': False, 'error': 'Not found'})
+    finally:
+        cursor.close()
+        conn.close()
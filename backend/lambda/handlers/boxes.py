@@ -0,0 +1,304 @@
+"""
+Supply chain - box inventory, forecast requirements and orders
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response, get_forecast_data, insert_component_orders, join_reference, record_supplier_receipts
+
+# ============================================
+# SUPPLY CHAIN - BOX ENDPOINTS
+# ============================================
+
+def get_box_inventory(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("SELECT * FROM box_inventory ORDER BY box_type")
+        # Box specs come from the reference cache instead of a join
+        inventory = join_reference(cursor.fetchall(), 'box', 'box_type', 'box_size', {
+            column: column for column in ('supplier', 'moq', 'lead_time_weeks', 'units_per_pallet')
+        }, cursor)
+        return cors_response(200, {'success': True, 'data': inventory})
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_box_forecast_requirements(event):
+    """GET /supply-chain/boxes/forecast-requirements - Calculate box requirements based on forecast API"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Get query params for forecast period (default 120 days DOI goal)
+        query_params = event.get('queryStringParameters') or {}
+        doi_goal = int(query_params.get('doi_goal', 120))
+        safety_buffer = float(query_params.get('safety_buffer', 0.85))  # Default 85% max capacity
+        
+        # Get all products and box inventory
+        cursor.execute("""
+            SELECT 
+                c.child_asin,
+                b.box_size as box_type,
+                b.moq,
+                b.lead_time_weeks,
+                bi.warehouse_quantity as current_inventory
+            FROM catalog c
+            CROSS JOIN box b
+            LEFT JOIN box_inventory bi ON b.box_size = bi.box_type
+            ORDER BY b.box_size
+        """)
+        
+        rows = cursor.fetchall()
+        
+        # Get all unique ASINs
+        cursor.execute("SELECT DISTINCT child_asin FROM catalog WHERE child_asin IS NOT NULL")
+        asins = [row['child_asin'] for row in cursor.fetchall()]
+        
+        # Fetch forecast data CONCURRENTLY for all ASINs
+        forecast_cache = {}
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            future_to_asin = {executor.submit(get_forecast_data, asin): asin for asin in asins}
+            for future in as_completed(future_to_asin):
+                asin = future_to_asin[future]
+                try:
+                    forecast_cache[asin] = future.result()
+                except Exception:
+                    forecast_cache[asin] = {'daily_forecast_avg': 0, 'weekly_forecast_avg': 0}
+        
+        # Calculate total forecasted units from cached data
+        total_forecasted_units = 0
+        for asin, forecast in forecast_cache.items():
+            daily_forecast = forecast.get('daily_forecast_avg', 0) or forecast.get('avg_daily_sales', 0)
+            total_forecasted_units += daily_forecast * doi_goal
+        
+        # Estimate cases needed (assuming 6 units per case on average)
+        forecasted_cases = total_forecasted_units / 6.0
+        
+        # Get unique box types and calculate requirements
+        cursor.execute("""
+            SELECT 
+                b.box_size as box_type,
+                b.moq,
+                b.lead_time_weeks,
+                bi.warehouse_quantity as current_inventory
+            FROM box b
+            LEFT JOIN box_inventory bi ON b.box_size = bi.box_type
+            ORDER BY b.box_size
+        """)
+        
+        boxes = cursor.fetchall()
+        results = []
+        
+        for box in boxes:
+            current_inv = box['current_inventory'] or 0
+            recommended_qty = max(0, round(forecasted_cases - current_inv))
+            
+            results.append({
+                'box_type': box['box_type'],
+                'moq': box['moq'],
+                'lead_time_weeks': box['lead_time_weeks'],
+                'current_inventory': current_inv,
+                'forecasted_cases_needed': round(forecasted_cases),
+                'recommended_order_qty': recommended_qty
+            })
+        
+        return cors_response(200, {
+            'success': True,
+            'data': results,
+            'doi_goal': doi_goal,
+            'safety_buffer': safety_buffer,
+            'safety_buffer_pct': int(safety_buffer * 100),
+            'note': 'Box forecasts are estimated based on total production needs (not product-specific)'
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_box_orders(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("SELECT * FROM box_orders ORDER BY order_date DESC")
+        orders = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in orders]})
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_box_order_by_id(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        order_id = event['pathParameters']['id']
+        
+        # First get the base order to find the order number
+        cursor.execute("SELECT order_number, supplier FROM box_orders WHERE id = %s", (order_id,))
+        base_order = cursor.fetchone()
+        
+        if not base_order:
+            return cors_response(404, {'success': False, 'error': 'Order not found'})
+        
+        order_number = base_order['order_number']
+        supplier = base_order['supplier']
+        
+        # Extract base order number (remove box suffix if present)
+        base_order_number = order_number.split('-')[0]
+        
+        # Fetch all orders with the same base order number
+        cursor.execute("""
+            SELECT bo.*, b.units_per_pallet
+            FROM box_orders bo
+            LEFT JOIN box b ON bo.box_type = b.box_size
+            WHERE bo.order_number LIKE %s
+            ORDER BY bo.box_type
+        """, (f"{base_order_number}%",))
+        
+        order_lines = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'id': order_id,
+                'order_number': base_order_number,
+                'supplier': supplier,
+                'lines': [dict(line) for line in order_lines]
+            }
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_box_order(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        data = json.loads(event.get('body', '{}'))
+        
+        # Batch order creation - multiple boxes in one PO, one INSERT for all lines
+        items = data.get('boxes')
+        if items and isinstance(items, list):
+            created_orders = insert_component_orders(cursor, 'box_orders', 'box_type', data, items)
+            conn.commit()
+            return cors_response(201, {
+                'success': True,
+                'data': created_orders,
+                'count': len(created_orders),
+                'base_order_number': data.get('order_number')
+            })
+        
+        cursor.execute("""
+            INSERT INTO box_orders (order_number, box_type, supplier, order_date,
+                                   expected_delivery_date, quantity_ordered, cost_per_unit,
+                                   total_cost, status, notes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING *
+        """, (data.get('order_number'), data.get('box_type'), 
+              data.get('supplier'), data.get('order_date'), data.get('expected_delivery_date'),
+              data.get('quantity_ordered'), data.get('cost_per_unit'),
+              data.get('total_cost'), data.get('status', 'pending'), data.get('notes')))
+        order = cursor.fetchone()
+        conn.commit()
+        return cors_response(201, {'success': True, 'data': dict(order)})
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_box_order(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        order_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        
+        # Get current order to check quantities
+        cursor.execute("SELECT quantity_ordered, quantity_received, status FROM box_orders WHERE id = %s", (order_id,))
+        current_order = cursor.fetchone()
+        
+        qty_received = data.get('quantity_received')
+        box_type = data.get('box_type')
+        new_status = data.get('status')
+        
+        # Determine if this is partial receive
+        if qty_received is not None and current_order:
+            qty_ordered = current_order['quantity_ordered']
+            
+            # Validate: cannot receive more than ordered
+            if qty_received > qty_ordered:
+                return cors_response(400, {
+                    'success': False,
+                    'error': f'Cannot receive {qty_received} units. Maximum is {qty_ordered} units ordered.'
+                })
+            
+            # If received quantity is less than ordered, it's partial
+            if qty_received < qty_ordered:
+                new_status = 'partial'
+            elif qty_received >= qty_ordered and new_status != 'archived':
+                new_status = 'received'
+        
+        # If receiving (received or partial), update inventory
+        if new_status in ['received', 'partial'] and qty_received is not None and qty_received > 0 and box_type:
+            # Get previous received quantity to calculate delta
+            prev_received = current_order['quantity_received'] if current_order else 0
+            qty_to_add = qty_received - prev_received
+            
+            # Only add positive delta to prevent duplicates or negative additions
+            if qty_to_add > 0:
+                cursor.execute("""
+                    UPDATE box_inventory 
+                    SET warehouse_quantity = warehouse_quantity + %s
+                    WHERE box_type = %s
+                """, (qty_to_add, box_type))
+        
+        cursor.execute("""
+            UPDATE box_orders 
+            SET status = COALESCE(%s, status),
+                actual_delivery_date = COALESCE(%s, actual_delivery_date),
+                quantity_received = COALESCE(%s, quantity_received)
+            WHERE id = %s RETURNING *
+        """, (new_status, data.get('actual_delivery_date'), 
+              qty_received, order_id))
+        
+        order = cursor.fetchone()
+        # First time this order is received: fold its lead time into supplier_performance
+        if order and order['status'] == 'received' and current_order and current_order['status'] != 'received':
+            record_supplier_receipts(cursor, [{**order, 'component_type': 'box', 'component_name': order['box_type']}])
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(order)}) if order else cors_response(404, {'success': False, 'error': 'Not found'})
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_box_inventory(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        inventory_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        # Only update supplier_quantity (warehouse is read-only)
+        cursor.execute("""
+            UPDATE box_inventory 
+            SET supplier_quantity = COALESCE(%s, supplier_quantity)
+            WHERE id = %s RETURNING *
+        """, (data.get('supplier_quantity'), inventory_id))
+        inventory = cursor.fetchone()
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(inventory)}) if inventory else cors_response(404, {'success': False, 'error': 'Not found'})
+    finally:
+        cursor.close()
+        conn.close()
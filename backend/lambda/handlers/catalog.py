@@ -0,0 +1,816 @@
+"""
+Catalog and development endpoints (/products/catalog, /products/development)
+"""
+
+import json
+from datetime import datetime
+
+from psycopg2.extras import RealDictCursor, execute_values
+
+from lambda_function import get_db_connection, cors_response, decimal_default
+
+def get_development(event):
+    """GET /products/development - List products for development view with section statuses"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        # Section statuses are maintained in catalog_progress by trigger (migration 019)
+        # Optional filters, e.g. ?design=pending&listing=inProgress
+        query_params = event.get('queryStringParameters') or {}
+        section_columns = {
+            'essentialInfo': 'essential_info_status',
+            'form': 'form_status',
+            'design': 'design_status',
+            'listing': 'listing_status',
+            'prod': 'prod_status',
+            'pack': 'pack_status',
+            'labels': 'labels_status',
+            'ads': 'ads_status'
+        }
+        
+        filters = [(column, query_params.get(key)) for key, column in section_columns.items()
+                   if query_params.get(key)]
+        params = [value for _, value in filters]
+        
+        # One row per product name (first variation by size); filters apply to that
+        # representative row so filtered and unfiltered lists show the same statuses.
+        # With filters, candidate products come from the indexed catalog_progress
+        # status columns (every catalog row has a progress row via the trigger and
+        # backfill), and only their variations are ranked for the representative.
+        # MATERIALIZED keeps the candidate lookup planned on its own, so the status
+        # index drives it instead of being folded into a scan of the whole catalog.
+        candidates_sql = ''
+        product_filter = 'c.product_name IS NOT NULL'
+        where_sql = ''
+        if filters:
+            candidates_sql = f"""
+            candidates AS MATERIALIZED (
+                SELECT DISTINCT c.product_name
+                FROM catalog_progress p
+                JOIN catalog c ON c.id = p.catalog_id
+                WHERE {' AND '.join(f"p.{column} = %s" for column, _ in filters)}
+                  AND c.product_name IS NOT NULL
+            ),"""
+            product_filter = 'c.product_name IN (SELECT product_name FROM candidates)'
+            where_sql = f"WHERE {' AND '.join(f'd.{column} = %s' for column, _ in filters)}"
+            params = params + params
+        
+        cursor.execute(f"""
+            WITH {candidates_sql}
+            representative AS (
+                SELECT DISTINCT ON (c.product_name)
+                    c.id,
+                    c.product_name,
+                    c.brand_name,
+                    c.seller_account,
+                    c.selection_status as status,
+                    COALESCE(p.essential_info_status, 'pending') as essential_info_status,
+                    COALESCE(p.form_status, 'pending') as form_status,
+                    COALESCE(p.design_status, 'pending') as design_status,
+                    COALESCE(p.listing_status, 'pending') as listing_status,
+                    COALESCE(p.prod_status, 'pending') as prod_status,
+                    COALESCE(p.pack_status, 'pending') as pack_status,
+                    COALESCE(p.labels_status, 'pending') as labels_status,
+                    COALESCE(p.ads_status, 'pending') as ads_status,
+                    c.created_at,
+                    c.updated_at
+                FROM catalog c
+                LEFT JOIN catalog_progress p ON c.id = p.catalog_id
+                WHERE {product_filter}
+                ORDER BY c.product_name, c.size, c.id
+            )
+            SELECT * FROM representative d
+            {where_sql}
+            ORDER BY d.product_name
+        """, params)
+        
+        products = cursor.fetchall()
+        
+        result = []
+        for product in products:
+            result.append({
+                'id': product.get('id'),
+                'status': product.get('status'),
+                'account': product.get('seller_account') or '',
+                'brand': product.get('brand_name') or '',
+                'product': product.get('product_name'),
+                'essentialInfo': product.get('essential_info_status'),
+                'form': product.get('form_status'),
+                'design': product.get('design_status'),
+                'listing': product.get('listing_status'),
+                'prod': product.get('prod_status'),
+                'pack': product.get('pack_status'),
+                'labels': product.get('labels_status'),
+                'ads': product.get('ads_status'),
+                'createdAt': product.get('created_at').isoformat() if product.get('created_at') else None,
+                'updatedAt': product.get('updated_at').isoformat() if product.get('updated_at') else None
+            })
+        
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': result,
+            'count': len(result)
+        })
+        
+    except Exception as e:
+        cursor.close()
+        conn.close()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+def get_catalog_parents(event):
+    """GET /products/catalog - Get all parent products (grouped by product name)"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        # Fetch unique products (parent view)
+        cursor.execute("""
+            SELECT DISTINCT ON (product_name)
+                id,
+                marketplace,
+                seller_account,
+                brand_name,
+                product_name,
+                parent_asin,
+                created_at,
+                updated_at
+            FROM catalog
+            WHERE product_name IS NOT NULL
+            ORDER BY product_name, created_at DESC
+        """)
+        
+        products = cursor.fetchall()
+        
+        result = []
+        for row in products:
+            product = dict(row)
+            result.append({
+                'id': product.get('id'),
+                'marketplace': product.get('marketplace') or 'Amazon',
+                'account': product.get('seller_account') or '',
+                'brand': product.get('brand_name') or '',
+                'product': product.get('product_name') or '',
+                'parentAsin': product.get('parent_asin') or '',
+                'createdAt': product.get('created_at').isoformat() if product.get('created_at') else None,
+                'updatedAt': product.get('updated_at').isoformat() if product.get('updated_at') else None
+            })
+        
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': result,
+            'count': len(result)
+        })
+        
+    except Exception as e:
+        cursor.close()
+        conn.close()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+def get_catalog_children(event):
+    """GET /products/catalog/children - Get all child products (all variations)"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        # Fetch all variations (child view)
+        cursor.execute("""
+            SELECT 
+                c.id,
+                c.marketplace,
+                c.seller_account,
+                c.brand_name,
+                c.product_name,
+                c.size,
+                c.child_asin,
+                c.child_sku_final,
+                c.created_at,
+                c.updated_at
+            FROM catalog c
+            LEFT JOIN size_dim sd ON c.size = sd.size
+            WHERE c.product_name IS NOT NULL
+            ORDER BY c.product_name, COALESCE(sd.sort_key, 7)
+        """)
+        
+        products = cursor.fetchall()
+        
+        result = []
+        for row in products:
+            product = dict(row)
+            product_display = product.get('product_name') or ''
+            size = product.get('size')
+            if size:
+                product_display = f"{product_display} - {size}"
+            
+            result.append({
+                'id': product.get('id'),
+                'marketplace': product.get('marketplace') or 'Amazon',
+                'account': product.get('seller_account') or '',
+                'brand': product.get('brand_name') or '',
+                'product': product_display,
+                'childAsin': product.get('child_asin') or '',
+                'childSku': product.get('child_sku_final') or '',
+                'createdAt': product.get('created_at').isoformat() if product.get('created_at') else None,
+                'updatedAt': product.get('updated_at').isoformat() if product.get('updated_at') else None
+            })
+        
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': result,
+            'count': len(result)
+        })
+        
+    except Exception as e:
+        cursor.close()
+        conn.close()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+# Tabs returned by get_catalog_detail (selectable via ?fields=)
+CATALOG_DETAIL_TABS = [
+    'essentialInfo', 'productImages', 'slides', 'aplus', 'finishedGoods', 'pdpSetup',
+    'stockImage', 'label', 'labelCopy', 'website', 'formula', 'vine', 'variations'
+]
+
+def get_catalog_detail(event):
+    """GET /products/catalog/{id} - Get detailed product info with all fields"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        product_id = event['pathParameters']['id']
+        
+        # Optional tab selector: ?fields=essentialInfo,variations (or ?tab=pdpSetup)
+        query_params = event.get('queryStringParameters') or {}
+        requested = query_params.get('fields') or query_params.get('tab')
+        requested_tabs = set(f.strip() for f in requested.split(',') if f.strip()) if requested else None
+        
+        if requested_tabs is not None:
+            unknown = requested_tabs - set(CATALOG_DETAIL_TABS)
+            if unknown:
+                cursor.close()
+                conn.close()
+                return cors_response(400, {
+                    'success': False,
+                    'error': f"Unknown fields: {', '.join(sorted(unknown))}",
+                    'validFields': CATALOG_DETAIL_TABS
+                })
+        
+        include_variations = requested_tabs is None or 'variations' in requested_tabs
+        
+        # Variations are aggregated in the same query with only the fields the detail page uses
+        variations_sql = """
+                (
+                    SELECT COALESCE(json_agg(json_build_object(
+                        'id', v.id,
+                        'product_name', v.product_name,
+                        'size', v.size,
+                        'parent_asin', v.parent_asin,
+                        'child_asin', v.child_asin,
+                        'parent_sku_final', v.parent_sku_final,
+                        'child_sku_final', v.child_sku_final,
+                        'upc', v.upc,
+                        'title', v.title,
+                        'notes', v.notes,
+                        'filter', v.filter,
+                        'msds', v.msds,
+                        'product_image_url', v.product_image_url,
+                        'basic_wrap_url', v.basic_wrap_url,
+                        'tri_bottle_wrap_url', v.tri_bottle_wrap_url,
+                        'packaging_name', v.packaging_name,
+                        'closure_name', v.closure_name,
+                        'label_size', v.label_size,
+                        'label_location', v.label_location,
+                        'case_size', v.case_size,
+                        'units_per_case', v.units_per_case,
+                        'units_sold_30_days', v.units_sold_30_days,
+                        'product_dimensions_length_in', v.product_dimensions_length_in,
+                        'product_dimensions_width_in', v.product_dimensions_width_in,
+                        'product_dimensions_height_in', v.product_dimensions_height_in,
+                        'product_dimensions_weight_lbs', v.product_dimensions_weight_lbs,
+                        'var_guaranteed_analysis', vf.guaranteed_analysis,
+                        'var_npk', vf.npk,
+                        'var_derived_from', vf.derived_from,
+                        'var_storage_warranty', vf.storage_warranty_precautionary_metals,
+                        'var_tps_guaranteed_analysis', vf.tps_guaranteed_analysis,
+                        'var_tps_npk', vf.tps_npk,
+                        'var_tps_derived_from', vf.tps_derived_from,
+                        'var_tps_storage_warranty', vf.tps_storage_warranty_precautionary_metals
+                    ) ORDER BY COALESCE(sd.sort_key, 7), v.size), '[]'::json)
+                    FROM catalog v
+                    LEFT JOIN formula vf ON v.formula_name = vf.formula
+                    LEFT JOIN size_dim sd ON v.size = sd.size
+                    WHERE v.product_name = c.product_name
+                ) as variations_json""" if include_variations else """
+                '[]'::json as variations_json"""
+        
+        # Fetch product, formula data and variations in a single round trip
+        cursor.execute(f"""
+            SELECT 
+                c.*,
+                f.guaranteed_analysis as formula_guaranteed_analysis,
+                f.npk as formula_npk,
+                f.derived_from as formula_derived_from,
+                f.storage_warranty_precautionary_metals as formula_storage_warranty,
+                f.tps_guaranteed_analysis as formula_tps_guaranteed_analysis,
+                f.tps_npk as formula_tps_npk,
+                f.tps_derived_from as formula_tps_derived_from,
+                f.tps_storage_warranty_precautionary_metals as formula_tps_storage_warranty,
+                {variations_sql}
+            FROM catalog c
+            LEFT JOIN formula f ON c.formula_name = f.formula
+            WHERE c.id = %s
+        """, (product_id,))
+        
+        result = cursor.fetchone()
+        
+        if not result:
+            cursor.close()
+            conn.close()
+            return cors_response(404, {
+                'success': False,
+                'error': 'Product not found'
+            })
+        
+        # Convert to dict
+        product = dict(result)
+        product['variations'] = product.pop('variations_json') or []
+        
+        # Structure the response for the listing detail tabs
+        response_data = {
+            'id': product.get('id'),
+            'productName': product.get('product_name'),
+            'brandName': product.get('brand_name'),
+            'sellerAccount': product.get('seller_account'),
+            
+            # Essential Info Tab
+            'essentialInfo': {
+                'marketplace': product.get('marketplace'),
+                'country': product.get('country'),
+                'brandName': product.get('brand_name'),
+                'productName': product.get('product_name'),
+                'size': product.get('size'),
+                'type': product.get('type'),
+                'formulaName': product.get('formula_name'),
+                'parentAsin': product.get('parent_asin'),
+                'childAsin': product.get('child_asin'),
+                'parentSku': product.get('parent_sku_final'),
+                'childSku': product.get('child_sku_final'),
+                'upc': product.get('upc')
+            },
+            
+            # Product Images Tab
+            'productImages': {
+                'productImageUrl': product.get('product_image_url'),
+                'basicWrapUrl': product.get('basic_wrap_url'),
+                'plantBehindProductUrl': product.get('plant_behind_product_url'),
+                'triBottleWrapUrl': product.get('tri_bottle_wrap_url')
+            },
+            
+            # Slides Tab (6-sided images + Amazon slides)
+            'slides': {
+                'productImage': product.get('product_image_url'),
+                'front': product.get('six_sided_image_front'),
+                'back': product.get('six_sided_image_back'),
+                'left': product.get('six_sided_image_left'),
+                'right': product.get('six_sided_image_right'),
+                'top': product.get('six_sided_image_top'),
+                'bottom': product.get('six_sided_image_bottom'),
+                'amazonSlide1': product.get('amazon_slide_1'),
+                'amazonSlide2': product.get('amazon_slide_2'),
+                'amazonSlide3': product.get('amazon_slide_3'),
+                'amazonSlide4': product.get('amazon_slide_4'),
+                'amazonSlide5': product.get('amazon_slide_5'),
+                'amazonSlide6': product.get('amazon_slide_6'),
+                'amazonSlide7': product.get('amazon_slide_7')
+            },
+            
+            # A+ Content Tab
+            'aplus': {
+                'module1': product.get('amazon_a_plus_slide_1'),
+                'module2': product.get('amazon_a_plus_slide_2'),
+                'module3': product.get('amazon_a_plus_slide_3'),
+                'module4': product.get('amazon_a_plus_slide_4'),
+                'module5': product.get('amazon_a_plus_slide_5'),
+                'module6': product.get('amazon_a_plus_slide_6')
+            },
+            
+            # Finished Goods Specs Tab
+            'finishedGoods': {
+                'packagingName': product.get('packaging_name'),
+                'closureName': product.get('closure_name'),
+                'labelSize': product.get('label_size'),
+                'labelLocation': product.get('label_location'),
+                'caseSize': product.get('case_size'),
+                'unitsPerCase': product.get('units_per_case'),
+                'productDimensions': {
+                    'length': product.get('product_dimensions_length_in'),
+                    'width': product.get('product_dimensions_width_in'),
+                    'height': product.get('product_dimensions_height_in'),
+                    'weight': product.get('product_dimensions_weight_lbs')
+                },
+                'unitsSold30Days': product.get('units_sold_30_days'),
+                'formula': {
+                    'guaranteedAnalysis': product.get('formula_tps_guaranteed_analysis') or product.get('formula_tps_nutrients_guaranteed_analysis') or product.get('formula_bloom_city_guaranteed_analysis'),
+                    'npk': product.get('formula_tps_npk') or product.get('formula_tps_nutrients_npk') or product.get('formula_bloom_city_npk'),
+                    'derivedFrom': product.get('formula_tps_derived_from') or product.get('formula_tps_nutrients_derived_from') or product.get('formula_bloom_city_derived_from'),
+                    'msds': product.get('msds'),
+                    'storageWarranty': product.get('formula_tps_storage_warranty') or product.get('formula_tps_nutrients_storage_warranty') or product.get('formula_bloom_city_storage')
+                }
+            },
+            
+            # PDP Setup Tab (Listing Copy)
+            'pdpSetup': {
+                'title': product.get('title'),
+                'bullets': product.get('bullets'),
+                'description': product.get('description'),
+                'searchTerms': product.get('search_terms'),
+                'coreKeywords': product.get('core_keywords'),
+                'otherKeywords': product.get('other_keywords'),
+                'coreCompetitorAsins': product.get('core_competitor_asins'),
+                'otherCompetitorAsins': product.get('other_competitor_asins')
+            },
+            
+            # Stock Image Tab
+            'stockImage': {
+                'stockImage': product.get('stock_image'),
+                'mainImage': product.get('product_image_url')
+            },
+            
+            # Label Tab
+            'label': {
+                'labelImage': product.get('stock_image'),
+                'labelAiFile': product.get('label_ai_file'),
+                'labelPrintReadyPdf': product.get('label_print_ready_pdf')
+            },
+            
+            # Label Copy Tab
+            'labelCopy': {
+                'leftSideBenefitGraphic': product.get('tps_left_side_benefit_graphic'),
+                'directions': product.get('tps_directions'),
+                'growingRecommendations': product.get('tps_growing_recommendations'),
+                'qrCodeSection': product.get('qr_code_section'),
+                'website': product.get('website'),
+                'productTitle': product.get('product_title'),
+                'centerBenefitStatement': product.get('center_benefit_statement'),
+                'sizeCopyForLabel': product.get('size_copy_for_label'),
+                'rightSideBenefitGraphic': product.get('right_side_benefit_graphic'),
+                'ingredientStatement': product.get('ingredient_statement'),
+                'tpsGuaranteedAnalysis': product.get('tps_guaranteed_analysis'),
+                'tpsNpk': product.get('tps_npk'),
+                'tpsDerivedFrom': product.get('tps_derived_from'),
+                'tpsStorageWarrantyPrecautionaryMetals': product.get('tps_storage_warranty_precautionary_metals'),
+                'tpsAddress': product.get('tps_address')
+            },
+            
+            # Website Tab
+            'website': {
+                'websiteUrl': product.get('website'),
+                'tbd': product.get('tbd')
+            },
+            
+            # Formula Tab - Complete formula data from relationship
+            'formula': {
+                'formulaId': product.get('formula_id'),
+                'formulaName': product.get('formula_name'),
+                'category': product.get('formula_category'),
+                'type': product.get('formula_type'),
+                'filter': product.get('formula_filter'),
+                'brands': {
+                    'brand1': product.get('formula_brand_1'),
+                    'brand2': product.get('formula_brand_2'),
+                    'brand3': product.get('formula_brand_3'),
+                    'brand4': product.get('formula_brand_4')
+                },
+                'tps': {
+                    'guaranteedAnalysis': product.get('formula_tps_guaranteed_analysis'),
+                    'npk': product.get('formula_tps_npk'),
+                    'derivedFrom': product.get('formula_tps_derived_from'),
+                    'storageWarranty': product.get('formula_tps_storage_warranty')
+                },
+                'tpsNutrients': {
+                    'guaranteedAnalysis': product.get('formula_tps_nutrients_guaranteed_analysis'),
+                    'npk': product.get('formula_tps_nutrients_npk'),
+                    'derivedFrom': product.get('formula_tps_nutrients_derived_from'),
+                    'storageWarranty': product.get('formula_tps_nutrients_storage_warranty')
+                },
+                'bloomCity': {
+                    'npk': product.get('formula_bloom_city_npk'),
+                    'ingredients': product.get('formula_bloom_city_ingredients'),
+                    'guaranteedAnalysis': product.get('formula_bloom_city_guaranteed_analysis'),
+                    'derivedFrom': product.get('formula_bloom_city_derived_from'),
+                    'storage': product.get('formula_bloom_city_storage'),
+                    'metals': product.get('formula_bloom_city_metals'),
+                    'precautionaryStatements': product.get('formula_bloom_city_precautionary_statements')
+                },
+                'msds': product.get('msds')
+            },
+            
+            # Vine Tab
+            'vine': {
+                'vineEnrolled': bool(product.get('vine_status')) if product.get('vine_status') else False,
+                'vineStatus': product.get('vine_status'),
+                'vineNotes': product.get('vine_program_notes'),
+                'vineDate': product.get('vine_launch_date').isoformat() if product.get('vine_launch_date') else None,
+                'unitsEnrolled': product.get('units_enrolled'),
+                'vineReviews': product.get('vine_reviews'),
+                'starRating': float(product.get('star_rating')) if product.get('star_rating') else None
+            },
+            
+            # Variations
+            'variations': product['variations'],
+            
+            'createdAt': product.get('created_at').isoformat() if product.get('created_at') else None,
+            'updatedAt': product.get('updated_at').isoformat() if product.get('updated_at') else None
+        }
+        
+        # Trim to the requested tabs (identity fields are always returned)
+        if requested_tabs is not None:
+            response_data = {
+                key: value for key, value in response_data.items()
+                if key in requested_tabs or key not in CATALOG_DETAIL_TABS
+            }
+        
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': response_data
+        })
+        
+    except Exception as e:
+        cursor.close()
+        conn.close()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+# Map frontend fields to database columns (shared by single and bulk catalog updates)
+CATALOG_FIELD_MAPPING = {
+    # Essential Info
+    'marketplace': 'marketplace',
+    'country': 'country',
+    'brandName': 'brand_name',
+    'productName': 'product_name',
+    'size': 'size',
+    'type': 'type',
+    'formulaName': 'formula_name',
+    'parentAsin': 'parent_asin',
+    'childAsin': 'child_asin',
+    'parentSku': 'parent_sku_final',
+    'childSku': 'child_sku_final',
+    'upc': 'upc',
+    
+    # Slides
+    'productImage': 'product_image_url',
+    'sixSidedFront': 'six_sided_image_front',
+    'sixSidedBack': 'six_sided_image_back',
+    'sixSidedLeft': 'six_sided_image_left',
+    'sixSidedRight': 'six_sided_image_right',
+    'sixSidedTop': 'six_sided_image_top',
+    'sixSidedBottom': 'six_sided_image_bottom',
+    
+    # A+ Content
+    'aplusModule1': 'aplus_module_1',
+    'aplusModule2': 'aplus_module_2',
+    'aplusModule3': 'aplus_module_3',
+    'aplusModule4': 'aplus_module_4',
+    
+    # Finished Goods
+    'packagingName': 'packaging_name',
+    'closureName': 'closure_name',
+    'labelSize': 'label_size',
+    'labelLocation': 'label_location',
+    'caseSize': 'case_size',
+    'unitsPerCase': 'units_per_case',
+    'productDimensionsLength': 'product_dimensions_length_in',
+    'productDimensionsWidth': 'product_dimensions_width_in',
+    'productDimensionsHeight': 'product_dimensions_height_in',
+    'productDimensionsWeight': 'product_dimensions_weight_lbs',
+    
+    # PDP Setup
+    'title': 'title',
+    'bullets': 'bullets',
+    'description': 'description',
+    'searchTerms': 'search_terms',
+    'coreKeywords': 'core_keywords',
+    'otherKeywords': 'other_keywords',
+    'coreCompetitorAsins': 'core_competitor_asins',
+    'otherCompetitorAsins': 'other_competitor_asins'
+}
+
+def update_catalog(event):
+    """PUT /products/catalog/{id} - Update catalog product details"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        product_id = event['pathParameters']['id']
+        body = json.loads(event.get('body', '{}'))
+        
+        # Build update query dynamically based on provided fields
+        update_fields = []
+        values = []
+        
+        for key, db_field in CATALOG_FIELD_MAPPING.items():
+            if key in body:
+                update_fields.append(f"{db_field} = %s")
+                values.append(body[key])
+        
+        # Handle vine data in notes field
+        if 'vineEnrolled' in body or 'vineDate' in body:
+            cursor.execute("SELECT notes FROM catalog WHERE id = %s", (product_id,))
+            result = cursor.fetchone()
+            notes = result['notes'] if result and isinstance(result['notes'], dict) else {}
+            
+            if 'vineEnrolled' in body:
+                notes['vineEnrolled'] = body['vineEnrolled']
+            if 'vineDate' in body:
+                notes['vineDate'] = body['vineDate']
+            
+            update_fields.append("notes = %s::jsonb")
+            values.append(json.dumps(notes))
+        
+        # Always update updated_at
+        update_fields.append("updated_at = %s")
+        values.append(datetime.now())
+        
+        # Add product_id to values
+        values.append(product_id)
+        
+        if not update_fields:
+            return cors_response(400, {
+                'success': False,
+                'error': 'No fields to update'
+            })
+        
+        # Execute update
+        query = f"""
+            UPDATE catalog
+            SET {', '.join(update_fields)}
+            WHERE id = %s
+            RETURNING id, product_name, brand_name, seller_account, updated_at
+        """
+        
+        cursor.execute(query, values)
+        result = cursor.fetchone()
+        
+        if not result:
+            conn.rollback()
+            cursor.close()
+            conn.close()
+            return cors_response(404, {
+                'success': False,
+                'error': 'Product not found'
+            })
+        
+        conn.commit()
+        
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'message': 'Product updated successfully',
+            'data': {
+            'id': result['id'],
+                'productName': result['product_name'],
+                'brandName': result['brand_name'],
+                'sellerAccount': result['seller_account'],
+            'updatedAt': result['updated_at'].isoformat() if result.get('updated_at') else None
+        }
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+def bulk_update_catalog(event):
+    """PATCH /products/catalog/bulk - Update many catalog products in one transaction
+    
+    Body: {"updates": [{"id": 1, "fields": {"title": "...", "caseSize": "..."}}, ...]}
+    Entries sharing the same set of fields are applied with one UPDATE ... FROM (VALUES ...).
+    Per-entry results are returned in request order; if an id repeats with the same
+    fields, the last entry's values win.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        body = json.loads(event.get('body') or '{}')
+        updates = body.get('updates') if isinstance(body, dict) else body
+        
+        if not isinstance(updates, list) or not updates:
+            return cors_response(400, {
+                'success': False,
+                'error': 'updates must be a non-empty list of {id, fields}'
+            })
+        
+        results = [None] * len(updates)
+        groups = {}  # columns -> {product_id: (row json, [entry indexes])}
+        for index, entry in enumerate(updates):
+            product_id = entry.get('id') if isinstance(entry, dict) else None
+            fields = entry.get('fields') if isinstance(entry, dict) else None
+            
+            if product_id is None:
+                results[index] = {'id': None, 'success': False, 'error': f'Entry {index} is missing id'}
+                continue
+            try:
+                catalog_id = int(product_id)
+            except (TypeError, ValueError):
+                results[index] = {'id': product_id, 'success': False, 'error': 'id must be an integer'}
+                continue
+            if fields is not None and not isinstance(fields, dict):
+                results[index] = {'id': product_id, 'success': False, 'error': 'fields must be an object'}
+                continue
+            
+            row = {}
+            for key, value in (fields or {}).items():
+                if key in CATALOG_FIELD_MAPPING:
+                    row[CATALOG_FIELD_MAPPING[key]] = value
+            
+            if not row:
+                results[index] = {'id': product_id, 'success': False, 'error': 'No fields to update'}
+                continue
+            
+            group = groups.setdefault(tuple(sorted(row.keys())), {})
+            indexes = group[catalog_id][1] if catalog_id in group else []
+            group[catalog_id] = (json.dumps(row, default=decimal_default), indexes + [index])
+        
+        for columns, group in groups.items():
+            rows = [(catalog_id, data) for catalog_id, (data, _) in group.items()]
+            # jsonb_populate_record casts each value to the catalog column type;
+            # page_size covers the whole group so it is a single UPDATE statement
+            set_sql = ', '.join(f"{col} = r.{col}" for col in columns)
+            updated = execute_values(cursor, f"""
+                UPDATE catalog c
+                SET {set_sql},
+                    updated_at = CURRENT_TIMESTAMP
+                FROM (VALUES %s) AS v(id, data)
+                CROSS JOIN LATERAL jsonb_populate_record(NULL::catalog, v.data::jsonb) r
+                WHERE c.id = v.id
+                RETURNING c.id, c.updated_at
+            """, rows, page_size=len(rows), fetch=True)
+            
+            updated_ids = {row['id'] for row in updated}
+            for catalog_id, (_, indexes) in group.items():
+                for index in indexes:
+                    if catalog_id in updated_ids:
+                        results[index] = {'id': catalog_id, 'success': True, 'fields': list(columns)}
+                    else:
+                        results[index] = {'id': catalog_id, 'success': False, 'error': 'Product not found'}
+        
+        conn.commit()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': results,
+            'updatedCount': sum(1 for r in results if r['success']),
+            'failedCount': sum(1 for r in results if not r['success'])
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
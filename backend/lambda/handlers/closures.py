@@ -0,0 +1,317 @@
+"""
+Supply chain - closure inventory, forecast requirements and orders
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response, get_forecast_data, insert_component_orders, join_reference, record_supplier_receipts
+
+# ============================================
+# SUPPLY CHAIN - CLOSURE ENDPOINTS
+# ============================================
+
+def get_closure_inventory(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("SELECT * FROM closure_inventory ORDER BY closure_name")
+        # Closure specs come from the reference cache instead of a join
+        inventory = join_reference(cursor.fetchall(), 'closure', 'closure_name', 'closure_name', {
+            'supplier': 'closure_supplier', 'moq': 'moq', 'lead_time_weeks': 'lead_time_weeks',
+            'units_per_pallet': 'units_per_pallet', 'units_per_case': 'units_per_case',
+            'cases_per_pallet': 'cases_per_pallet'
+        }, cursor)
+        return cors_response(200, {'success': True, 'data': inventory})
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_closure_forecast_requirements(event):
+    """GET /supply-chain/closures/forecast-requirements - Calculate closure requirements based on forecast API"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Get query params for forecast period (default 120 days DOI goal)
+        query_params = event.get('queryStringParameters') or {}
+        doi_goal = int(query_params.get('doi_goal', 120))
+        safety_buffer = float(query_params.get('safety_buffer', 0.85))  # Default 85% max capacity
+        
+        # Get all products grouped by closure type
+        cursor.execute("""
+            SELECT 
+                c.closure_name,
+                c.child_asin,
+                c.product_name,
+                c.size,
+                cl.moq,
+                cl.lead_time_weeks,
+                ci.warehouse_quantity as current_inventory
+            FROM catalog c
+            LEFT JOIN closure cl ON c.closure_name = cl.closure_name
+            LEFT JOIN closure_inventory ci ON c.closure_name = ci.closure_name
+            WHERE c.closure_name IS NOT NULL
+            ORDER BY c.closure_name
+        """)
+        
+        products = cursor.fetchall()
+        
+        # Fetch forecast data CONCURRENTLY for all ASINs
+        forecast_cache = {}
+        unique_asins = [p.get('child_asin') for p in products if p.get('child_asin')]
+        
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            future_to_asin = {executor.submit(get_forecast_data, asin): asin for asin in unique_asins}
+            for future in as_completed(future_to_asin):
+                asin = future_to_asin[future]
+                try:
+                    forecast_cache[asin] = future.result()
+                except Exception:
+                    forecast_cache[asin] = {'daily_forecast_avg': 0, 'weekly_forecast_avg': 0}
+        
+        # Group by closure and calculate forecasts from cached data
+        closure_data = {}
+        for product in products:
+            closure_name = product['closure_name']
+            asin = product['child_asin']
+            
+            if closure_name not in closure_data:
+                closure_data[closure_name] = {
+                    'closure_name': closure_name,
+                    'moq': product['moq'],
+                    'lead_time_weeks': product['lead_time_weeks'],
+                    'current_inventory': product['current_inventory'] or 0,
+                    'forecasted_units_needed': 0,
+                    'products': []
+                }
+            
+            # Get forecast from cache
+            if asin and asin in forecast_cache:
+                forecast = forecast_cache[asin]
+                daily_forecast = forecast.get('daily_forecast_avg', 0) or forecast.get('avg_daily_sales', 0)
+                weekly_forecast = forecast.get('weekly_forecast_avg', 0)
+                units_needed = daily_forecast * doi_goal
+                
+                closure_data[closure_name]['forecasted_units_needed'] += units_needed
+                closure_data[closure_name]['products'].append({
+                    'product_name': product['product_name'],
+                    'size': product['size'],
+                    'avg_weekly_forecast': round(weekly_forecast, 2),
+                    'daily_forecast_rate': round(daily_forecast, 2)
+                })
+        
+        # Calculate recommended order quantities
+        results = []
+        for closure_name, data in closure_data.items():
+            current_inv = data['current_inventory']
+            forecasted = data['forecasted_units_needed']
+            recommended_qty = max(0, forecasted - current_inv)
+            
+            results.append({
+                'closure_name': closure_name,
+                'moq': data['moq'],
+                'lead_time_weeks': data['lead_time_weeks'],
+                'current_inventory': current_inv,
+                'forecasted_units_needed': round(forecasted, 2),
+                'recommended_order_qty': round(recommended_qty, 2),
+                'products_using_closure': data['products']
+            })
+        
+        return cors_response(200, {
+            'success': True,
+            'data': results,
+            'doi_goal': doi_goal,
+            'safety_buffer': safety_buffer,
+            'safety_buffer_pct': int(safety_buffer * 100)
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_closure_orders(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("SELECT * FROM closure_orders ORDER BY order_date DESC")
+        orders = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in orders]})
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_closure_order_by_id(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        order_id = event['pathParameters']['id']
+        
+        # First get the base order to find the order number
+        cursor.execute("SELECT order_number, supplier FROM closure_orders WHERE id = %s", (order_id,))
+        base_order = cursor.fetchone()
+        
+        if not base_order:
+            return cors_response(404, {'success': False, 'error': 'Order not found'})
+        
+        order_number = base_order['order_number']
+        supplier = base_order['supplier']
+        
+        # Extract base order number (remove closure suffix if present)
+        base_order_number = order_number.split('-')[0]
+        
+        # Fetch all orders with the same base order number
+        cursor.execute("""
+            SELECT co.*, c.units_per_pallet, c.units_per_case, c.cases_per_pallet
+            FROM closure_orders co
+            LEFT JOIN closure c ON co.closure_name = c.closure_name
+            WHERE co.order_number LIKE %s
+            ORDER BY co.closure_name
+        """, (f"{base_order_number}%",))
+        
+        order_lines = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'id': order_id,
+                'order_number': base_order_number,
+                'supplier': supplier,
+                'lines': [dict(line) for line in order_lines]
+            }
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_closure_order(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        data = json.loads(event.get('body', '{}'))
+        
+        # Batch order creation - multiple closures in one PO, one INSERT for all lines
+        items = data.get('closures')
+        if items and isinstance(items, list):
+            created_orders = insert_component_orders(cursor, 'closure_orders', 'closure_name', data, items)
+            conn.commit()
+            return cors_response(201, {
+                'success': True,
+                'data': created_orders,
+                'count': len(created_orders),
+                'base_order_number': data.get('order_number')
+            })
+        
+        cursor.execute("""
+            INSERT INTO closure_orders (order_number, closure_name, supplier, order_date,
+                                       expected_delivery_date, quantity_ordered, cost_per_unit,
+                                       total_cost, status, notes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING *
+        """, (data.get('order_number'), data.get('closure_name'), data.get('supplier'),
+              data.get('order_date'), data.get('expected_delivery_date'),
+              data.get('quantity_ordered'), data.get('cost_per_unit'),
+              data.get('total_cost'), data.get('status', 'pending'), data.get('notes')))
+        order = cursor.fetchone()
+        conn.commit()
+        return cors_response(201, {'success': True, 'data': dict(order)})
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_closure_order(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        order_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        
+        # Get current order to check quantities
+        cursor.execute("SELECT quantity_ordered, quantity_received, status FROM closure_orders WHERE id = %s", (order_id,))
+        current_order = cursor.fetchone()
+        
+        qty_received = data.get('quantity_received')
+        closure_name = data.get('closure_name')
+        new_status = data.get('status')
+        
+        # Determine if this is partial receive
+        if qty_received is not None and current_order:
+            qty_ordered = current_order['quantity_ordered']
+            
+            # Validate: cannot receive more than ordered
+            if qty_received > qty_ordered:
+                return cors_response(400, {
+                    'success': False,
+                    'error': f'Cannot receive {qty_received} units. Maximum is {qty_ordered} units ordered.'
+                })
+            
+            # If received quantity is less than ordered, it's partial
+            if qty_received < qty_ordered:
+                new_status = 'partial'
+            elif qty_received >= qty_ordered and new_status != 'archived':
+                new_status = 'received'
+        
+        # If receiving (received or partial), update inventory
+        if new_status in ['received', 'partial'] and qty_received is not None and qty_received > 0 and closure_name:
+            # Get previous received quantity to calculate delta
+            prev_received = current_order['quantity_received'] if current_order else 0
+            qty_to_add = qty_received - prev_received
+            
+            # Only add positive delta to prevent duplicates or negative additions
+            if qty_to_add > 0:
+                cursor.execute("""
+                    UPDATE closure_inventory 
+                    SET warehouse_quantity = warehouse_quantity + %s
+                    WHERE closure_name = %s
+                """, (qty_to_add, closure_name))
+        
+        cursor.execute("""
+            UPDATE closure_orders 
+            SET status = COALESCE(%s, status),
+                actual_delivery_date = COALESCE(%s, actual_delivery_date),
+                quantity_received = COALESCE(%s, quantity_received)
+            WHERE id = %s RETURNING *
+        """, (new_status, data.get('actual_delivery_date'), 
+              qty_received, order_id))
+        
+        order = cursor.fetchone()
+        # First time this order is received: fold its lead time into supplier_performance
+        if order and order['status'] == 'received' and current_order and current_order['status'] != 'received':
+            record_supplier_receipts(cursor, [{**order, 'component_type': 'closure', 'component_name': order['closure_name']}])
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(order)}) if order else cors_response(404, {'success': False, 'error': 'Not found'})
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_closure_inventory(event):
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        inventory_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        cursor.execute("""
+            UPDATE closure_inventory 
+            SET warehouse_quantity = COALESCE(%s, warehouse_quantity),
+                supplier_quantity = COALESCE(%s, supplier_quantity)
+            WHERE id = %s RETURNING *
+        """, (data.get('warehouse_quantity'), data.get('supplier_quantity'), inventory_id))
+        inventory = cursor.fetchone()
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(inventory)}) if inventory else cors_response(404, {'success': False, 'error': 'Not found'})
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,887 @@
+"""
+Supply chain - label, bottle, closure and box cycle counts
+"""
+
+import json
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response
+
+# Cycle count line layout per component family: lines are matched to inventory on `keys`
+CYCLE_COUNT_FAMILIES = {
+    'label': {
+        'counts_table': 'label_cycle_counts',
+        'lines_table': 'label_cycle_count_lines',
+        'inventory_table': 'label_inventory',
+        'keys': ['brand_name', 'product_name', 'bottle_size'],
+        'quantity': 'warehouse_inventory',
+        'updated': 'updated_at',
+    },
+    'bottle': {
+        'counts_table': 'bottle_cycle_counts',
+        'lines_table': 'bottle_cycle_count_lines',
+        'inventory_table': 'bottle_inventory',
+        'keys': ['bottle_name'],
+        'quantity': 'warehouse_quantity',
+        'updated': 'last_updated',
+    },
+    'closure': {
+        'counts_table': 'closure_cycle_counts',
+        'lines_table': 'closure_cycle_count_lines',
+        'inventory_table': 'closure_inventory',
+        'keys': ['closure_name'],
+        'quantity': 'warehouse_quantity',
+        'updated': 'last_updated',
+    },
+    'box': {
+        'counts_table': 'box_cycle_counts',
+        'lines_table': 'box_cycle_count_lines',
+        'inventory_table': 'box_inventory',
+        'keys': ['box_type'],
+        'quantity': 'warehouse_quantity',
+        'updated': 'last_updated',
+    },
+}
+
+# counted_quantity is an INTEGER column
+MAX_COUNTED_QUANTITY = 2**31 - 1
+
+def counted_quantity(line):
+    """Whole, non-negative counted_quantity of a submitted line (missing = 0); ValueError otherwise"""
+    value = line.get('counted_quantity', 0)
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if (isinstance(value, bool) or not isinstance(value, (int, float))
+            or not 0 <= value <= MAX_COUNTED_QUANTITY or value != int(value)):
+        raise ValueError(f"counted_quantity must be a whole number from 0 to {MAX_COUNTED_QUANTITY}, got {value!r}")
+    return int(value)
+
+def cycle_count_lines_error(lines):
+    """400 message for submitted count lines that cannot be stored, else None"""
+    if not lines:
+        return None
+    if not isinstance(lines, list) or not all(isinstance(line, dict) for line in lines):
+        return 'lines must be a list of objects'
+    for line in lines:
+        try:
+            counted_quantity(line)
+        except (ValueError, OverflowError) as e:
+            return str(e)
+    return None
+
+def insert_cycle_count_lines(cursor, family, count_id, lines):
+    """Insert count lines in one statement; expected_quantity and variance come from inventory
+
+    Submitted lines are passed as parallel arrays and unnested server-side, so a
+    full warehouse count is a single round trip instead of two per line.
+    """
+    if not lines:
+        return 0
+    spec = CYCLE_COUNT_FAMILIES[family]
+    keys = spec['keys']
+    key_columns = ', '.join(keys)
+    arrays = [[line.get(key) for line in lines] for key in keys]
+    arrays.append([counted_quantity(line) for line in lines])
+
+    cursor.execute(f"""
+        INSERT INTO {spec['lines_table']} (
+            cycle_count_id, {key_columns},
+            expected_quantity, counted_quantity, variance
+        )
+        SELECT
+            %s, {', '.join(f'l.{key}' for key in keys)},
+            COALESCE(inv.quantity, 0),
+            l.counted_quantity,
+            l.counted_quantity - COALESCE(inv.quantity, 0)
+        FROM unnest({', '.join(['%s::text[]'] * len(keys))}, %s::integer[])
+            WITH ORDINALITY AS l({key_columns}, counted_quantity, line_no)
+        LEFT JOIN LATERAL (
+            SELECT i.{spec['quantity']} AS quantity
+            FROM {spec['inventory_table']} i
+            WHERE {' AND '.join(f'i.{key} = l.{key}' for key in keys)}
+            LIMIT 1
+        ) inv ON true
+        ORDER BY l.line_no
+    """, [count_id] + arrays)
+    return cursor.rowcount
+
+# Largest absolute discrepancies returned with a completed count
+VARIANCE_TOP_N = 10
+
+def apply_cycle_count_lines(cursor, family, count_id, count_date, top_n=VARIANCE_TOP_N):
+    """Apply counted quantities to inventory in one UPDATE ... FROM and summarize the variance
+
+    Variance is measured against the inventory quantity the update replaces (read
+    from the same statement snapshot), not the expected_quantity captured when the
+    line was entered. If an item was counted more than once, the latest line wins.
+    """
+    spec = CYCLE_COUNT_FAMILIES[family]
+    keys = spec['keys']
+    key_columns = ', '.join(keys)
+    quantity = spec['quantity']
+
+    cursor.execute(f"""
+        WITH counted AS (
+            SELECT DISTINCT ON ({key_columns}) {key_columns}, counted_quantity
+            FROM {spec['lines_table']}
+            WHERE cycle_count_id = %s AND counted_quantity IS NOT NULL
+            ORDER BY {key_columns}, id DESC
+        ),
+        applied AS (
+            UPDATE {spec['inventory_table']} i
+            SET {quantity} = c.counted_quantity,
+                last_count_date = %s,
+                {spec['updated']} = CURRENT_TIMESTAMP
+            FROM counted c
+            JOIN {spec['inventory_table']} prev
+              ON {' AND '.join(f'prev.{key} = c.{key}' for key in keys)}
+            WHERE {' AND '.join(f'i.{key} = c.{key}' for key in keys)}
+            RETURNING {', '.join(f'c.{key}' for key in keys)},
+                      COALESCE(prev.{quantity}, 0) AS previous_quantity,
+                      c.counted_quantity,
+                      c.counted_quantity - COALESCE(prev.{quantity}, 0) AS variance
+        ),
+        ranked AS (
+            SELECT applied.*,
+                   row_number() OVER (ORDER BY abs(variance) DESC, {key_columns}) AS rank,
+                   count(*) OVER () AS lines_applied,
+                   count(*) FILTER (WHERE variance <> 0) OVER () AS lines_with_variance,
+                   COALESCE(sum(abs(variance)) OVER (), 0) AS total_abs_variance,
+                   COALESCE(sum(variance) OVER (), 0) AS net_variance
+            FROM applied
+        )
+        SELECT (SELECT count(*) FROM counted) AS lines_counted, ranked.*
+        FROM (SELECT 1) one
+        LEFT JOIN ranked ON ranked.rank <= GREATEST(%s, 1)
+        ORDER BY ranked.rank
+    """, (count_id, count_date, top_n))
+    rows = cursor.fetchall()
+
+    first = rows[0]
+    applied = first['lines_applied'] or 0
+    return {
+        'lines_counted': first['lines_counted'],
+        'lines_applied': applied,
+        'lines_unmatched': first['lines_counted'] - applied,
+        'lines_with_variance': first['lines_with_variance'] or 0,
+        'total_abs_variance': int(first['total_abs_variance'] or 0),
+        'net_variance': int(first['net_variance'] or 0),
+        'top_discrepancies': [
+            {
+                **{key: row[key] for key in keys},
+                'previous_quantity': row['previous_quantity'],
+                'counted_quantity': row['counted_quantity'],
+                'variance': row['variance']
+            }
+            for row in rows[:top_n] if row['rank'] is not None and row['variance'] != 0
+        ]
+    }
+
+def complete_cycle_count(event, family):
+    """Flip a count to completed and apply its lines to inventory in one transaction"""
+    spec = CYCLE_COUNT_FAMILIES[family]
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            top_n = max(0, min(int(query_params.get('top', VARIANCE_TOP_N)), 100))
+        except (TypeError, ValueError):
+            return cors_response(400, {'success': False, 'error': 'top must be an integer'})
+
+        # Status flip first: the row lock serializes concurrent completes of the same count
+        cursor.execute(f"""
+            UPDATE {spec['counts_table']}
+            SET status = 'completed',
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s AND status IS DISTINCT FROM 'completed'
+            RETURNING *
+        """, (count_id,))
+        updated_count = cursor.fetchone()
+
+        if not updated_count:
+            cursor.execute(f"SELECT status FROM {spec['counts_table']} WHERE id = %s", (count_id,))
+            count = cursor.fetchone()
+            conn.rollback()
+            if not count:
+                return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+            return cors_response(400, {'success': False, 'error': 'Cycle count already completed'})
+
+        summary = apply_cycle_count_lines(cursor, family, count_id, updated_count['count_date'], top_n)
+        conn.commit()
+
+        return cors_response(200, {'success': True, 'data': dict(updated_count), 'variance_summary': summary})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+# ============================================
+# LABEL CYCLE COUNTS
+# ============================================
+
+def get_label_cycle_counts(event):
+    """GET /supply-chain/labels/cycle-counts - Get all cycle counts"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("""
+            SELECT * FROM label_cycle_counts 
+            ORDER BY count_date DESC, id DESC
+        """)
+        counts = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in counts]})
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_label_cycle_count_by_id(event):
+    """GET /supply-chain/labels/cycle-counts/{id} - Get cycle count with line items"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        
+        # Get count header
+        cursor.execute("SELECT * FROM label_cycle_counts WHERE id = %s", (count_id,))
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        # Get count lines
+        cursor.execute("""
+            SELECT * FROM label_cycle_count_lines 
+            WHERE cycle_count_id = %s 
+            ORDER BY brand_name, product_name, bottle_size
+        """, (count_id,))
+        lines = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'count': dict(count),
+                'lines': [dict(row) for row in lines]
+            }
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_label_cycle_count_by_id(event):
+    """GET /supply-chain/labels/cycle-counts/{id} - Get cycle count with lines"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        
+        # Get cycle count header
+        cursor.execute("SELECT * FROM label_cycle_counts WHERE id = %s", (count_id,))
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        # Get count lines
+        cursor.execute("""
+            SELECT * FROM label_cycle_count_lines 
+            WHERE cycle_count_id = %s 
+            ORDER BY id
+        """, (count_id,))
+        lines = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                **dict(count),
+                'lines': [dict(line) for line in lines]
+            }
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_label_cycle_count(event):
+    """POST /supply-chain/labels/cycle-counts - Create new cycle count"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        data = json.loads(event.get('body', '{}'))
+        lines = data.get('lines', [])
+        error = cycle_count_lines_error(lines)
+        if error:
+            return cors_response(400, {'success': False, 'error': error})
+        
+        # Create cycle count header
+        cursor.execute("""
+            INSERT INTO label_cycle_counts (
+                count_date, counted_by, status, notes
+            )
+            VALUES (%s, %s, %s, %s) RETURNING *
+        """, (
+            data.get('count_date'),
+            data.get('counted_by'),
+            data.get('status', 'draft'),
+            data.get('notes')
+        ))
+        count = cursor.fetchone()
+        count_id = count['id']
+        
+        # Create count lines
+        insert_cycle_count_lines(cursor, 'label', count_id, lines)
+        
+        conn.commit()
+        return cors_response(201, {'success': True, 'data': dict(count)})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_label_cycle_count(event):
+    """PUT /supply-chain/labels/cycle-counts/{id} - Update cycle count"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        lines = data.get('lines', [])
+        error = cycle_count_lines_error(lines)
+        if error:
+            return cors_response(400, {'success': False, 'error': error})
+        
+        cursor.execute("""
+            UPDATE label_cycle_counts 
+            SET status = COALESCE(%s, status),
+                notes = COALESCE(%s, notes),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s RETURNING *
+        """, (data.get('status'), data.get('notes'), count_id))
+        
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        # If lines are provided, delete existing and insert new ones
+        if lines:
+            # Delete existing lines
+            cursor.execute("""
+                DELETE FROM label_cycle_count_lines WHERE cycle_count_id = %s
+            """, (count_id,))
+            
+            # Insert new lines
+            insert_cycle_count_lines(cursor, 'label', count_id, lines)
+        
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(count)})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def complete_label_cycle_count(event):
+    """POST /supply-chain/labels/cycle-counts/{id}/complete - Complete count and update inventory"""
+    return complete_cycle_count(event, 'label')
+
+# ============================================
+# BOTTLE CYCLE COUNTS
+# ============================================
+
+def get_bottle_cycle_counts(event):
+    """GET /supply-chain/bottles/cycle-counts - Get all cycle counts"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("""
+            SELECT * FROM bottle_cycle_counts 
+            ORDER BY count_date DESC, id DESC
+        """)
+        counts = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in counts]})
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_bottle_cycle_count_by_id(event):
+    """GET /supply-chain/bottles/cycle-counts/{id} - Get cycle count with line items"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        
+        cursor.execute("SELECT * FROM bottle_cycle_counts WHERE id = %s", (count_id,))
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        cursor.execute("""
+            SELECT * FROM bottle_cycle_count_lines 
+            WHERE cycle_count_id = %s 
+            ORDER BY bottle_name
+        """, (count_id,))
+        lines = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'count': dict(count),
+                'lines': [dict(row) for row in lines]
+            }
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_bottle_cycle_count(event):
+    """POST /supply-chain/bottles/cycle-counts - Create new cycle count"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        data = json.loads(event.get('body', '{}'))
+        lines = data.get('lines', [])
+        error = cycle_count_lines_error(lines)
+        if error:
+            return cors_response(400, {'success': False, 'error': error})
+        
+        cursor.execute("""
+            INSERT INTO bottle_cycle_counts (
+                count_date, counted_by, status, notes
+            )
+            VALUES (%s, %s, %s, %s) RETURNING *
+        """, (
+            data.get('count_date'),
+            data.get('counted_by'),
+            data.get('status', 'draft'),
+            data.get('notes')
+        ))
+        count = cursor.fetchone()
+        count_id = count['id']
+        
+        insert_cycle_count_lines(cursor, 'bottle', count_id, lines)
+        
+        conn.commit()
+        return cors_response(201, {'success': True, 'data': dict(count)})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_bottle_cycle_count(event):
+    """PUT /supply-chain/bottles/cycle-counts/{id} - Update cycle count"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        lines = data.get('lines', [])
+        error = cycle_count_lines_error(lines)
+        if error:
+            return cors_response(400, {'success': False, 'error': error})
+        
+        cursor.execute("""
+            UPDATE bottle_cycle_counts 
+            SET status = COALESCE(%s, status),
+                notes = COALESCE(%s, notes),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s RETURNING *
+        """, (data.get('status'), data.get('notes'), count_id))
+        
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        if lines:
+            cursor.execute("DELETE FROM bottle_cycle_count_lines WHERE cycle_count_id = %s", (count_id,))
+            
+            insert_cycle_count_lines(cursor, 'bottle', count_id, lines)
+        
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(count)})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def complete_bottle_cycle_count(event):
+    """POST /supply-chain/bottles/cycle-counts/{id}/complete - Complete count and update inventory"""
+    return complete_cycle_count(event, 'bottle')
+
+# ============================================
+# CLOSURE CYCLE COUNTS
+# ============================================
+
+def get_closure_cycle_counts(event):
+    """GET /supply-chain/closures/cycle-counts - Get all cycle counts"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("""
+            SELECT * FROM closure_cycle_counts 
+            ORDER BY count_date DESC, id DESC
+        """)
+        counts = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in counts]})
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_closure_cycle_count_by_id(event):
+    """GET /supply-chain/closures/cycle-counts/{id} - Get cycle count with line items"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        
+        cursor.execute("SELECT * FROM closure_cycle_counts WHERE id = %s", (count_id,))
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        cursor.execute("""
+            SELECT * FROM closure_cycle_count_lines 
+            WHERE cycle_count_id = %s 
+            ORDER BY closure_name
+        """, (count_id,))
+        lines = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'count': dict(count),
+                'lines': [dict(row) for row in lines]
+            }
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_closure_cycle_count(event):
+    """POST /supply-chain/closures/cycle-counts - Create new cycle count"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        data = json.loads(event.get('body', '{}'))
+        lines = data.get('lines', [])
+        error = cycle_count_lines_error(lines)
+        if error:
+            return cors_response(400, {'success': False, 'error': error})
+        
+        cursor.execute("""
+            INSERT INTO closure_cycle_counts (
+                count_date, counted_by, status, notes
+            )
+            VALUES (%s, %s, %s, %s) RETURNING *
+        """, (
+            data.get('count_date'),
+            data.get('counted_by'),
+            data.get('status', 'draft'),
+            data.get('notes')
+        ))
+        count = cursor.fetchone()
+        count_id = count['id']
+        
+        insert_cycle_count_lines(cursor, 'closure', count_id, lines)
+        
+        conn.commit()
+        return cors_response(201, {'success': True, 'data': dict(count)})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_closure_cycle_count(event):
+    """PUT /supply-chain/closures/cycle-counts/{id} - Update cycle count"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        lines = data.get('lines', [])
+        error = cycle_count_lines_error(lines)
+        if error:
+            return cors_response(400, {'success': False, 'error': error})
+        
+        cursor.execute("""
+            UPDATE closure_cycle_counts 
+            SET status = COALESCE(%s, status),
+                notes = COALESCE(%s, notes),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s RETURNING *
+        """, (data.get('status'), data.get('notes'), count_id))
+        
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        if lines:
+            cursor.execute("DELETE FROM closure_cycle_count_lines WHERE cycle_count_id = %s", (count_id,))
+            
+            insert_cycle_count_lines(cursor, 'closure', count_id, lines)
+        
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(count)})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def complete_closure_cycle_count(event):
+    """POST /supply-chain/closures/cycle-counts/{id}/complete - Complete count and update inventory"""
+    return complete_cycle_count(event, 'closure')
+
+# ============================================
+# BOX CYCLE COUNTS
+# ============================================
+
+def get_box_cycle_counts(event):
+    """GET /supply-chain/boxes/cycle-counts - Get all cycle counts"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("""
+            SELECT * FROM box_cycle_counts 
+            ORDER BY count_date DESC, id DESC
+        """)
+        counts = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in counts]})
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_box_cycle_count_by_id(event):
+    """GET /supply-chain/boxes/cycle-counts/{id} - Get cycle count with line items"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        
+        cursor.execute("SELECT * FROM box_cycle_counts WHERE id = %s", (count_id,))
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        cursor.execute("""
+            SELECT * FROM box_cycle_count_lines 
+            WHERE cycle_count_id = %s 
+            ORDER BY box_type
+        """, (count_id,))
+        lines = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'count': dict(count),
+                'lines': [dict(row) for row in lines]
+            }
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_box_cycle_count(event):
+    """POST /supply-chain/boxes/cycle-counts - Create new cycle count"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        data = json.loads(event.get('body', '{}'))
+        lines = data.get('lines', [])
+        error = cycle_count_lines_error(lines)
+        if error:
+            return cors_response(400, {'success': False, 'error': error})
+        
+        cursor.execute("""
+            INSERT INTO box_cycle_counts (
+                count_date, counted_by, status, notes
+            )
+            VALUES (%s, %s, %s, %s) RETURNING *
+        """, (
+            data.get('count_date'),
+            data.get('counted_by'),
+            data.get('status', 'draft'),
+            data.get('notes')
+        ))
+        count = cursor.fetchone()
+        count_id = count['id']
+        
+        insert_cycle_count_lines(cursor, 'box', count_id, lines)
+        
+        conn.commit()
+        return cors_response(201, {'success': True, 'data': dict(count)})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_box_cycle_count(event):
+    """PUT /supply-chain/boxes/cycle-counts/{id} - Update cycle count"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        count_id = event['pathParameters']['id']
+        data = json.loads(event.get('body', '{}'))
+        lines = data.get('lines', [])
+        error = cycle_count_lines_error(lines)
+        if error:
+            return cors_response(400, {'success': False, 'error': error})
+        
+        cursor.execute("""
+            UPDATE box_cycle_counts 
+            SET status = COALESCE(%s, status),
+                notes = COALESCE(%s, notes),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = %s RETURNING *
+        """, (data.get('status'), data.get('notes'), count_id))
+        
+        count = cursor.fetchone()
+        
+        if not count:
+            return cors_response(404, {'success': False, 'error': 'Cycle count not found'})
+        
+        if lines:
+            cursor.execute("DELETE FROM box_cycle_count_lines WHERE cycle_count_id = %s", (count_id,))
+            
+            insert_cycle_count_lines(cursor, 'box', count_id, lines)
+        
+        conn.commit()
+        return cors_response(200, {'success': True, 'data': dict(count)})
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def complete_box_cycle_count(event):
+    """POST /supply-chain/boxes/cycle-counts/{id}/complete - Complete count and update inventory"""
+    return complete_cycle_count(event, 'box')
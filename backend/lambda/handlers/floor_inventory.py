@@ -0,0 +1,322 @@
+"""
+Production floor inventory (sellables, shiners, unused formulas)
+"""
+
+import json
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response
+
+def get_sellables(event):
+    """GET /production/floor-inventory/sellables - Get products ready to manufacture/ship"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("""
+            SELECT * FROM v_sellables
+            ORDER BY max_sellable_units DESC, brand_name, product_name, size
+        """)
+        
+        sellables = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': sellables
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_shiners(event):
+    """GET /production/floor-inventory/shiners - Get damaged/cosmetic issue products"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Get shiners grouped by formula
+        cursor.execute("""
+            SELECT 
+                s.id,
+                s.catalog_id,
+                s.product_name,
+                s.brand_name,
+                s.size,
+                s.formula_name,
+                s.bottle_name,
+                s.closure_name,
+                s.quantity,
+                s.issue_type,
+                s.severity,
+                s.location,
+                s.notes,
+                s.can_rework,
+                s.created_at,
+                s.updated_at
+            FROM shiners s
+            WHERE s.quantity > 0
+            ORDER BY s.formula_name, s.severity DESC, s.quantity DESC
+        """)
+        
+        shiners = cursor.fetchall()
+        
+        # Group by formula for the view
+        formula_groups = {}
+        for shiner in shiners:
+            formula = shiner['formula_name'] or 'Unknown'
+            if formula not in formula_groups:
+                formula_groups[formula] = {
+                    'formula_name': formula,
+                    'total_units': 0,
+                    'products': []
+                }
+            formula_groups[formula]['total_units'] += shiner['quantity']
+            formula_groups[formula]['products'].append(shiner)
+        
+        return cors_response(200, {
+            'success': True,
+            'data': list(formula_groups.values())
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_unused_formulas(event):
+    """GET /production/floor-inventory/unused-formulas - Get formulas with excess inventory"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        cursor.execute("""
+            SELECT * FROM v_unused_formulas
+            ORDER BY unused_gallons DESC, formula_name
+        """)
+        
+        unused = cursor.fetchall()
+        
+        # For each formula, get products that use it
+        result = []
+        for formula_row in unused:
+            formula_name = formula_row['formula_name']
+            
+            # Get products using this formula (calculate gallons_per_unit from size)
+            cursor.execute("""
+                SELECT 
+                    c.id as catalog_id,
+                    c.product_name,
+                    c.brand_name,
+                    c.size,
+                    c.child_asin,
+                    COALESCE(sd.gallons_per_unit, 0.25) as gallons_per_unit,
+                    FLOOR(%s / COALESCE(sd.gallons_per_unit, 0.25)) as potential_units
+                FROM catalog c
+                LEFT JOIN size_dim sd ON c.size = sd.size
+                WHERE c.formula_name = %s
+                ORDER BY c.brand_name, c.product_name, c.size
+            """, (formula_row['unused_gallons'], formula_name))
+            
+            products = cursor.fetchall()
+            
+            result.append({
+                'formula_name': formula_name,
+                'total_gallons': float(formula_row['total_gallons']),
+                'allocated_gallons': float(formula_row['allocated_gallons']),
+                'unused_gallons': float(formula_row['unused_gallons']),
+                'gallons_in_production': float(formula_row.get('gallons_in_production') or 0),
+                'product_count': formula_row['product_count'],
+                'product_names': formula_row['product_names'],
+                'last_manufactured': str(formula_row['last_manufactured']) if formula_row.get('last_manufactured') else None,
+                'products': products
+            })
+        
+        return cors_response(200, {
+            'success': True,
+            'data': result
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def add_shiner(event):
+    """POST /production/floor-inventory/shiners - Add damaged product to shiners"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        body = json.loads(event.get('body', '{}'))
+        
+        catalog_id = body.get('catalog_id')
+        quantity = body.get('quantity')
+        issue_type = body.get('issue_type')
+        severity = body.get('severity', 'minor')
+        location = body.get('location')
+        notes = body.get('notes')
+        can_rework = body.get('can_rework', False)
+        
+        if not catalog_id or not quantity:
+            return cors_response(400, {
+                'success': False,
+                'error': 'catalog_id and quantity are required'
+            })
+        
+        # Get product details from catalog
+        cursor.execute("""
+            SELECT product_name, brand_name, size, formula_name, packaging_name, closure_name
+            FROM catalog
+            WHERE id = %s
+        """, (catalog_id,))
+        
+        catalog_item = cursor.fetchone()
+        
+        if not catalog_item:
+            return cors_response(404, {
+                'success': False,
+                'error': 'Product not found in catalog'
+            })
+        
+        # Insert shiner record
+        cursor.execute("""
+            INSERT INTO shiners (
+                catalog_id, product_name, brand_name, size, formula_name, 
+                bottle_name, closure_name, quantity, issue_type, severity, 
+                location, notes, can_rework
+            )
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            RETURNING id
+        """, (
+            catalog_id,
+            catalog_item['product_name'],
+            catalog_item['brand_name'],
+            catalog_item['size'],
+            catalog_item['formula_name'],
+            catalog_item['packaging_name'],
+            catalog_item['closure_name'],
+            quantity,
+            issue_type,
+            severity,
+            location,
+            notes,
+            can_rework
+        ))
+        
+        shiner_id = cursor.fetchone()['id']
+        conn.commit()
+        
+        return cors_response(201, {
+            'success': True,
+            'shiner_id': shiner_id,
+            'message': 'Shiner added successfully'
+        })
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def add_unused_formula(event):
+    """POST /production/floor-inventory/unused-formulas - Add unused formula to inventory"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        body = json.loads(event.get('body', '{}'))
+        
+        formula_name = body.get('formula_name')
+        gallons = body.get('gallons')
+        
+        if not formula_name or not gallons:
+            return cors_response(400, {
+                'success': False,
+                'error': 'formula_name and gallons are required'
+            })
+        
+        # Convert gallons to float
+        try:
+            gallons = float(gallons)
+        except (TypeError, ValueError):
+            return cors_response(400, {
+                'success': False,
+                'error': 'gallons must be a valid number'
+            })
+        
+        # Check if formula_inventory record exists for this formula
+        cursor.execute("""
+            SELECT formula_name, gallons_available 
+            FROM formula_inventory 
+            WHERE formula_name = %s
+        """, (formula_name,))
+        
+        existing = cursor.fetchone()
+        
+        if existing:
+            # Update existing record - add to available gallons
+            cursor.execute("""
+                UPDATE formula_inventory 
+                SET gallons_available = gallons_available + %s,
+                    last_manufactured = CURRENT_TIMESTAMP
+                WHERE formula_name = %s
+                RETURNING formula_name, gallons_available
+            """, (gallons, formula_name))
+            
+            result = cursor.fetchone()
+            message = f'Added {gallons} gallons to existing inventory for {formula_name}'
+        else:
+            # Insert new record
+            cursor.execute("""
+                INSERT INTO formula_inventory (
+                    formula_name, 
+                    gallons_available, 
+                    gallons_in_production,
+                    last_manufactured
+                )
+                VALUES (%s, %s, 0, CURRENT_TIMESTAMP)
+                RETURNING formula_name, gallons_available
+            """, (formula_name, gallons))
+            
+            result = cursor.fetchone()
+            message = f'Created new formula inventory record for {formula_name} with {gallons} gallons'
+        
+        conn.commit()
+        
+        return cors_response(201, {
+            'success': True,
+            'data': {
+                'formula_name': result['formula_name'],
+                'gallons_available': float(result['gallons_available'])
+            },
+            'message': message
+        })
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,262 @@
+"""
+Formula CRUD endpoints (/products/formula)
+"""
+
+import json
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response
+
+# ============================================
+# FORMULA CRUD ENDPOINTS
+# ============================================
+
+def get_all_formulas(event):
+    """GET /team-workspaces/formula - Get all formulas"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        cursor.execute("""
+            SELECT *
+            FROM formula
+            ORDER BY formula ASC
+        """)
+        
+        formulas = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': [dict(row) for row in formulas],
+            'count': len(formulas)
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_formula_by_id(event):
+    """GET /team-workspaces/formula/{id} - Get a specific formula by ID"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        # Extract formula ID from path
+        path = event.get('path') or event.get('rawPath', '')
+        formula_id = path.split('/')[-1]
+        
+        cursor.execute("""
+            SELECT *
+            FROM formula
+            WHERE id = %s
+        """, (formula_id,))
+        
+        formula = cursor.fetchone()
+        
+        if not formula:
+            return cors_response(404, {
+                'success': False,
+                'error': f'Formula with ID {formula_id} not found'
+            })
+        
+        return cors_response(200, {
+            'success': True,
+            'data': dict(formula)
+        })
+        
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_formula(event):
+    """POST /team-workspaces/formula - Create a new formula"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        # Parse request body
+        body = json.loads(event.get('body', '{}'))
+        
+        # Required fields
+        formula_name = body.get('formula')
+        if not formula_name:
+            return cors_response(400, {
+                'success': False,
+                'error': 'Formula name is required'
+            })
+        
+        # Build dynamic INSERT query
+        columns = []
+        values = []
+        placeholders = []
+        
+        for key, value in body.items():
+            if key not in ['id', 'created_at', 'updated_at']:  # Skip system fields
+                # Handle special column names with quotes
+                if "'" in key:
+                    columns.append(f'"{key}"')
+                else:
+                    columns.append(key)
+                values.append(value)
+                placeholders.append('%s')
+        
+        columns_str = ', '.join(columns)
+        placeholders_str = ', '.join(placeholders)
+        
+        # Insert new formula
+        cursor.execute(f"""
+            INSERT INTO formula ({columns_str})
+            VALUES ({placeholders_str})
+            RETURNING *
+        """, tuple(values))
+        
+        new_formula = cursor.fetchone()
+        conn.commit()
+        
+        return cors_response(201, {
+            'success': True,
+            'data': dict(new_formula),
+            'message': 'Formula created successfully'
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_formula(event):
+    """PUT /team-workspaces/formula/{id} - Update an existing formula"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        # Extract formula ID from path
+        path = event.get('path') or event.get('rawPath', '')
+        formula_id = path.split('/')[-1]
+        
+        # Parse request body
+        body = json.loads(event.get('body', '{}'))
+        
+        # Build dynamic UPDATE query based on provided fields
+        update_fields = []
+        values = []
+        
+        for key, value in body.items():
+            if key not in ['id', 'created_at', 'updated_at']:  # Skip system fields
+                # Handle special column names with quotes
+                if "'" in key:
+                    update_fields.append(f'"{key}" = %s')
+                else:
+                    update_fields.append(f"{key} = %s")
+                values.append(value)
+        
+        if not update_fields:
+            return cors_response(400, {
+                'success': False,
+                'error': 'No fields to update'
+            })
+        
+        # Add formula_id to values
+        values.append(formula_id)
+        
+        # Execute update
+        query = f"""
+            UPDATE formula
+            SET {', '.join(update_fields)}
+            WHERE id = %s
+            RETURNING *
+        """
+        
+        cursor.execute(query, values)
+        updated_formula = cursor.fetchone()
+        
+        if not updated_formula:
+            return cors_response(404, {
+                'success': False,
+                'error': f'Formula with ID {formula_id} not found'
+            })
+        
+        conn.commit()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': dict(updated_formula),
+            'message': 'Formula updated successfully'
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def delete_formula(event):
+    """DELETE /team-workspaces/formula/{id} - Delete a formula"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        # Extract formula ID from path
+        path = event.get('path') or event.get('rawPath', '')
+        formula_id = path.split('/')[-1]
+        
+        # Check if formula exists
+        cursor.execute("SELECT id, formula FROM formula WHERE id = %s", (formula_id,))
+        formula = cursor.fetchone()
+        
+        if not formula:
+            return cors_response(404, {
+                'success': False,
+                'error': f'Formula with ID {formula_id} not found'
+            })
+        
+        # Delete the formula
+        cursor.execute("DELETE FROM formula WHERE id = %s", (formula_id,))
+        conn.commit()
+        
+        return cors_response(200, {
+            'success': True,
+            'message': f'Formula "{formula["formula"]}" deleted successfully',
+            'deletedId': formula_id
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,228 @@
+"""
+Supply chain - open orders and inbound quantities across bottle, closure, box and label orders
+"""
+
+import base64
+import json
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response, decimal_default
+
+COMPONENT_TYPES = ('bottle', 'closure', 'box', 'label')
+OPEN_ORDERS_PAGE_SIZE = 100
+OPEN_ORDERS_MAX_PAGE_SIZE = 500
+
+def encode_cursor(row):
+    """Opaque keyset cursor for the last row of a page"""
+    key = [row['sort_date'], row['component_type'], row['order_id'], row['line_id']]
+    return base64.urlsafe_b64encode(json.dumps(key, default=decimal_default).encode()).decode()
+
+def decode_cursor(cursor_token):
+    sort_date, component_type, order_id, line_id = json.loads(base64.urlsafe_b64decode(cursor_token.encode()))
+    return sort_date, component_type, int(order_id), int(line_id)
+
+# Open rows of each order table, in the column layout of v_open_orders (migration 021).
+# get_open_orders reads the tables directly so each one is walked through its
+# idx_*_orders_open partial index in keyset order.
+OPEN_ORDER_TABLES = {
+    'bottle': ('bottle_orders', 'bottle_name'),
+    'closure': ('closure_orders', 'closure_name'),
+    'box': ('box_orders', 'box_type'),
+}
+OPEN_SORT_DATE = "COALESCE(o.order_date, DATE '1900-01-01')"
+
+def open_orders_branch(component_type, conditions, params, after, limit):
+    """Newest open rows of one order table after the keyset cursor, as (sql, params)
+
+    Rows sort on (sort_date, component_type, order_id, line_id) DESC. Within one
+    table component_type is fixed, so the cursor becomes a range on the index key
+    (sort_date, id): an older date when this type sorts after the cursor's, the same
+    date allowed when it sorts before it, and a tuple comparison for the same type.
+    """
+    conditions, params = list(conditions), list(params)
+    if after:
+        sort_date, after_type, order_id, line_id = after
+        if component_type < after_type:
+            conditions.append(f"{OPEN_SORT_DATE} <= %s::date")
+            params.append(sort_date)
+        elif component_type > after_type:
+            conditions.append(f"{OPEN_SORT_DATE} < %s::date")
+            params.append(sort_date)
+        elif component_type == 'label':
+            conditions.append(f"({OPEN_SORT_DATE}, o.id) <= (%s::date, %s)")
+            conditions.append(f"({OPEN_SORT_DATE}, o.id, l.id) < (%s::date, %s, %s)")
+            params.extend([sort_date, order_id, sort_date, order_id, line_id])
+        else:
+            conditions.append(f"({OPEN_SORT_DATE}, o.id) < (%s::date, %s)")
+            params.extend([sort_date, order_id])
+    where = ''.join(f" AND {condition}" for condition in conditions)
+
+    if component_type == 'label':
+        sql = f"""(
+            SELECT
+                'label'::TEXT AS component_type, o.id AS order_id, l.id AS line_id, o.order_number,
+                l.brand_name || ' - ' || l.product_name || ' - ' || l.bottle_size AS component_name,
+                l.brand_name::TEXT AS brand_name, l.product_name::TEXT AS product_name,
+                l.bottle_size::TEXT AS bottle_size,
+                o.supplier, o.order_date, o.expected_delivery_date, o.status,
+                COALESCE(l.quantity_ordered, 0) AS quantity_ordered,
+                COALESCE(l.quantity_received, 0) AS quantity_received,
+                GREATEST(COALESCE(l.quantity_ordered, 0) - COALESCE(l.quantity_received, 0), 0) AS quantity_inbound,
+                {OPEN_SORT_DATE} AS sort_date
+            FROM label_orders o
+            JOIN label_order_lines l ON l.order_id = o.id
+            WHERE o.status NOT IN ('received', 'archived'){where}
+            ORDER BY {OPEN_SORT_DATE} DESC, o.id DESC, l.id DESC
+            LIMIT %s
+        )"""
+    else:
+        table, name_column = OPEN_ORDER_TABLES[component_type]
+        sql = f"""(
+            SELECT
+                '{component_type}'::TEXT AS component_type, o.id AS order_id, 0 AS line_id, o.order_number,
+                o.{name_column}::TEXT AS component_name,
+                NULL::TEXT AS brand_name, NULL::TEXT AS product_name, NULL::TEXT AS bottle_size,
+                o.supplier, o.order_date, o.expected_delivery_date, o.status,
+                COALESCE(o.quantity_ordered, 0) AS quantity_ordered,
+                COALESCE(o.quantity_received, 0) AS quantity_received,
+                GREATEST(COALESCE(o.quantity_ordered, 0) - COALESCE(o.quantity_received, 0), 0) AS quantity_inbound,
+                {OPEN_SORT_DATE} AS sort_date
+            FROM {table} o
+            WHERE o.status NOT IN ('received', 'archived'){where}
+            ORDER BY {OPEN_SORT_DATE} DESC, o.id DESC
+            LIMIT %s
+        )"""
+    return sql, params + [limit]
+
+def requested_component_types(query_params):
+    """Types from ?component_type=bottle,label (all when absent); None if a type is unknown"""
+    types = [t.strip() for t in (query_params.get('component_type') or '').split(',') if t.strip()]
+    if any(t not in COMPONENT_TYPES for t in types):
+        return None
+    return [t for t in COMPONENT_TYPES if t in types] if types else list(COMPONENT_TYPES)
+
+def component_type_filter(query_params, conditions, params):
+    """Add ?component_type=bottle,label to a WHERE clause; False if a type is unknown"""
+    types = [t.strip() for t in (query_params.get('component_type') or '').split(',') if t.strip()]
+    if not types:
+        return True
+    if any(t not in COMPONENT_TYPES for t in types):
+        return False
+    conditions.append("component_type = ANY(%s)")
+    params.append(types)
+    return True
+
+# ============================================
+# SUPPLY CHAIN - OPEN ORDERS
+# ============================================
+
+def get_open_orders(event):
+    """GET /supply-chain/orders - Open order lines of every order type, newest first
+
+    Query params: component_type (comma separated), status, supplier, limit, cursor.
+    Keyset paginated on (order date, component type, order id, line id): pass the
+    returned next_cursor to get the following page.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            limit = max(1, min(int(query_params.get('limit', OPEN_ORDERS_PAGE_SIZE)), OPEN_ORDERS_MAX_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return cors_response(400, {'success': False, 'error': 'limit must be an integer'})
+
+        component_types = requested_component_types(query_params)
+        if component_types is None:
+            return cors_response(400, {
+                'success': False,
+                'error': f"component_type must be one of: {', '.join(COMPONENT_TYPES)}"
+            })
+        conditions, params = [], []
+        if query_params.get('status'):
+            conditions.append("o.status = %s")
+            params.append(query_params['status'])
+        if query_params.get('supplier'):
+            conditions.append("o.supplier = %s")
+            params.append(query_params['supplier'])
+        after = None
+        if query_params.get('cursor'):
+            try:
+                after = decode_cursor(query_params['cursor'])
+            except (ValueError, TypeError):
+                return cors_response(400, {'success': False, 'error': 'Invalid cursor'})
+
+        # Each table returns at most one page (plus one row telling us whether
+        # there is a next page) from its own index; the merge sorts those few rows
+        branches, branch_params = [], []
+        for component_type in component_types:
+            sql, values = open_orders_branch(component_type, conditions, params, after, limit + 1)
+            branches.append(sql)
+            branch_params.extend(values)
+        cursor.execute(f"""
+            SELECT * FROM (
+                {' UNION ALL '.join(branches)}
+            ) open_orders
+            ORDER BY sort_date DESC, component_type DESC, order_id DESC, line_id DESC
+            LIMIT %s
+        """, branch_params + [limit + 1])
+        rows = cursor.fetchall()
+
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1]) if len(rows) > limit else None
+        return cors_response(200, {
+            'success': True,
+            'data': [dict(row) for row in page],
+            'count': len(page),
+            'next_cursor': next_cursor
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_inbound_by_component(event):
+    """GET /supply-chain/orders/inbound - Outstanding quantity per component from open orders
+
+    Query params: component_type (comma separated), component_name.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        query_params = event.get('queryStringParameters') or {}
+
+        conditions, params = [], []
+        if not component_type_filter(query_params, conditions, params):
+            return cors_response(400, {
+                'success': False,
+                'error': f"component_type must be one of: {', '.join(COMPONENT_TYPES)}"
+            })
+        if query_params.get('component_name'):
+            conditions.append("component_name = %s")
+            params.append(query_params['component_name'])
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        cursor.execute(f"""
+            SELECT * FROM v_inbound_by_component
+            {where}
+            ORDER BY component_type, component_name
+        """, params)
+        inbound = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in inbound]})
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,246 @@
+"""
+Production planning, production time, product inventory and warehouse capacity
+"""
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response, get_reference_index
+
+# ============================================
+# PRODUCTION PLANNING ENDPOINTS
+# ============================================
+
+def get_production_planning(event):
+    """GET /production/planning - Get production planning data"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Use the v_production_planning view
+        # Priority: Items with sales activity first, then by higher sales, then by lower inventory
+        cursor.execute("""
+            SELECT * FROM v_production_planning
+            ORDER BY 
+                CASE WHEN COALESCE(units_sold_30_days, 0) > 0 THEN 0 ELSE 1 END ASC,
+                COALESCE(units_sold_30_days, 0) DESC,
+                COALESCE(bottle_current_inventory, 0) ASC,
+                product_name
+        """)
+        planning_data = cursor.fetchall()
+        return cors_response(200, {'success': True, 'data': [dict(row) for row in planning_data]})
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def calculate_production_time(event):
+    """GET /production/calculate-time?product={product}&units={units} - Calculate production time"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        query_params = event.get('queryStringParameters') or {}
+        product_name = query_params.get('product')
+        units = int(query_params.get('units', 0))
+        
+        if not product_name or units <= 0:
+            return cors_response(400, {
+                'success': False,
+                'error': 'Product name and units (positive integer) are required'
+            })
+        
+        # Get BPM from catalog/bottle relationship (bottle and finished goods specs are cached)
+        cursor.execute("""
+            SELECT packaging_name FROM catalog
+            WHERE product_name = %s
+            LIMIT 1
+        """, (product_name,))
+        
+        result = cursor.fetchone()
+        
+        if not result:
+            return cors_response(404, {
+                'success': False,
+                'error': f'Product "{product_name}" not found'
+            })
+        
+        bottle = (get_reference_index('bottle', 'bottle_name', cursor).get(result['packaging_name']) or [{}])[0]
+        finished_good = (get_reference_index('finished_goods', 'product_name', cursor).get(product_name) or [{}])[0]
+        bpm = bottle.get('packaging_bottles_per_minute') or finished_good.get('max_packaging_per_minute') or 1
+        minutes = units / bpm if bpm > 0 else 0
+        hours = minutes / 60
+        days = hours / 8  # Assuming 8-hour work days
+        
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'product': product_name,
+                'units': units,
+                'bpm': float(bpm),
+                'minutes': round(minutes, 2),
+                'hours': round(hours, 2),
+                'days': round(days, 2)
+            }
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_warehouse_capacity(event):
+    """GET /production/warehouse-capacity - Get warehouse capacity data"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Get capacity from bottles, closures, boxes, and finished goods
+        cursor.execute("""
+            SELECT 
+                'bottles' as type,
+                SUM(max_warehouse_inventory) as total_capacity,
+                SUM(warehouse_inventory) as current_usage
+            FROM bottle
+            WHERE max_warehouse_inventory IS NOT NULL
+            UNION ALL
+            SELECT 
+                'finished_goods' as type,
+                NULL as total_capacity,
+                NULL as current_usage
+            FROM finished_goods
+            LIMIT 1
+        """)
+        
+        # For now, return a simple structure
+        # This can be expanded based on actual requirements
+        return cors_response(200, {
+            'success': True,
+            'data': {
+                'bottles': {
+                    'capacity': 0,  # Will be calculated from bottle.max_warehouse_inventory
+                    'used': 0       # Will be calculated from bottle_inventory
+                },
+                'finished_goods': {
+                    'capacity': 0,
+                    'used': 0
+                }
+            }
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_products_inventory(event):
+    """GET /production/products/inventory - Get inventory levels for all products with supply chain dependencies"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Get all catalog products with complete supply chain inventory
+        cursor.execute("""
+            SELECT 
+                c.id,
+                c.child_asin,
+                c.child_sku_final,
+                c.product_name,
+                c.brand_name,
+                c.size,
+                sm.units_sold_30_days,
+                c.units_per_case,
+                
+                -- Formula details
+                c.formula_name,
+                COALESCE(sd.gallons_per_unit, 0.25) as gallons_per_unit,
+                fi.gallons_available as formula_gallons_available,
+                fi.gallons_in_production as formula_gallons_in_production,
+                
+                -- Bottle details
+                c.packaging_name as bottle_name,
+                b.size_oz as bottle_size_oz,
+                bi.warehouse_quantity as bottle_inventory,
+                b.max_warehouse_inventory as bottle_max_inventory,
+                
+                -- Packaging calculation fields (for pallets, weight, time)
+                b.box_weight_lbs,
+                b.boxes_per_pallet,
+                b.single_box_pallet_share,
+                b.bottles_per_minute,
+                b.finished_units_per_case,
+                
+                -- Closure details
+                c.closure_name,
+                ci.warehouse_quantity as closure_inventory,
+                
+                -- Label details
+                c.label_location,
+                c.label_size,
+                li.warehouse_inventory as label_inventory,
+                
+                -- Sales velocity (units per day)
+                CASE 
+                    WHEN sm.units_sold_30_days > 0 THEN sm.units_sold_30_days / 30.0
+                    ELSE 0
+                END as daily_sales_velocity,
+                
+                -- DOI calculation (Days of Inventory)
+                CASE 
+                    WHEN sm.units_sold_30_days > 0 THEN 
+                        (bi.warehouse_quantity / (sm.units_sold_30_days / 30.0))
+                    ELSE 9999
+                END as days_of_inventory,
+                
+                -- Supply chain bottlenecks (max units producible with current inventory)
+                LEAST(
+                    COALESCE(bi.warehouse_quantity, 0),
+                    COALESCE(ci.warehouse_quantity, 0),
+                    COALESCE(li.warehouse_inventory, 0),
+                    FLOOR(COALESCE(fi.gallons_available, 0) / COALESCE(sd.gallons_per_unit, 0.25))
+                ) as max_units_producible
+                
+            FROM catalog c
+            LEFT JOIN size_dim sd ON c.size = sd.size
+            LEFT JOIN sales_metrics sm ON c.id = sm.catalog_id
+            LEFT JOIN formula f ON c.formula_name = f.formula
+            LEFT JOIN formula_inventory fi ON c.formula_name = fi.formula_name
+            LEFT JOIN bottle b ON c.packaging_name = b.bottle_name
+            LEFT JOIN bottle_inventory bi ON c.packaging_name = bi.bottle_name
+            LEFT JOIN closure_inventory ci ON c.closure_name = ci.closure_name
+            LEFT JOIN label_inventory li ON c.label_location = li.label_location
+            WHERE c.child_asin IS NOT NULL
+            ORDER BY 
+                CASE WHEN COALESCE(sm.units_sold_30_days, 0) > 0 THEN 0 ELSE 1 END ASC,
+                COALESCE(sm.units_sold_30_days, 0) DESC,
+                COALESCE(bi.warehouse_quantity, 0) ASC,
+                c.brand_name, c.product_name, c.size
+        """)
+        
+        products = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': products
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,284 @@
+"""
+Supply chain - reorder points and order quantities for bottles, closures, boxes and labels
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response, get_forecast_data, get_inbound_quantities, get_reference_index
+
+COMPONENT_TYPES = ('bottle', 'closure', 'box', 'label')
+# Used when a component has no lead_time_weeks on file (flagged as lead_time_assumed)
+DEFAULT_LEAD_TIME_WEEKS = 4
+# Receipts needed before the observed p90 lead time (supplier_performance) replaces the spec
+ACTUAL_LEAD_TIME_MIN_RECEIPTS = 3
+
+def actual_lead_time(performance, component_type, component_name, supplier=None):
+    """p90 lead time (days) and supplier from supplier_performance, or (None, None)
+
+    The spec supplier's row is used when it has enough receipts, otherwise the
+    supplier with the most receipts for the component.
+    """
+    rows = [row for row in performance.get(component_name, [])
+            if row['component_type'] == component_type and row['p90_lead_time_days'] is not None
+            and row['receipts'] >= ACTUAL_LEAD_TIME_MIN_RECEIPTS]
+    if not rows:
+        return None, None
+    row = next((r for r in rows if supplier and r['supplier'] == supplier), None) or max(rows, key=lambda r: r['receipts'])
+    return row['p90_lead_time_days'], row['supplier']
+
+def plan_reorders(components, doi_goal, safety_days, safety_buffer):
+    """Reorder point and order quantity for every component, most urgent first
+
+    Each component dict carries daily_demand, on_hand, inbound, moq, lead_time_weeks,
+    actual_lead_time_days and max_warehouse_inventory. Lead time is the observed p90
+    when there is one, else the spec lead_time_weeks, else DEFAULT_LEAD_TIME_WEEKS.
+    Per component:
+      lead_time_demand   = daily_demand * lead time (days)
+      reorder_point      = lead_time_demand + daily_demand * safety_days
+      inventory_position = on_hand + inbound
+      order_up_to        = lead_time_demand + daily_demand * doi_goal
+      raw_order_qty      = max(0, order_up_to - inventory_position)
+      moq_order_qty      = max(raw_order_qty, moq) when anything is needed
+      capacity_available = max_warehouse_inventory * safety_buffer - inventory_position
+      recommended        = min(moq_order_qty, capacity_available)
+    Urgency is days until the reorder point is reached (negative = already below it).
+    """
+    results = []
+    for component in components:
+        demand = component['daily_demand']
+        lead_time_weeks = component.get('lead_time_weeks')
+        if component.get('actual_lead_time_days') is not None:
+            lead_time_source = 'actual_p90'
+            lead_time_days = float(component['actual_lead_time_days'])
+        elif lead_time_weeks is not None:
+            lead_time_source = 'spec'
+            lead_time_days = float(lead_time_weeks) * 7
+        else:
+            lead_time_source = 'assumed'
+            lead_time_days = float(DEFAULT_LEAD_TIME_WEEKS) * 7
+        moq = int(component.get('moq') or 0)
+        max_inventory = component.get('max_warehouse_inventory')
+
+        lead_time_demand = demand * lead_time_days
+        safety_stock = demand * safety_days
+        reorder_point = lead_time_demand + safety_stock
+        position = component['on_hand'] + component['inbound']
+        order_up_to = lead_time_demand + demand * doi_goal
+
+        raw_qty = max(0, math.ceil(order_up_to - position))
+        moq_qty = max(raw_qty, moq) if raw_qty > 0 else 0
+        if max_inventory:
+            capacity = max(0, math.floor(float(max_inventory) * safety_buffer - position))
+            recommended = min(moq_qty, capacity)
+        else:
+            capacity = None
+            recommended = moq_qty
+
+        if demand > 0:
+            days_of_cover = position / demand
+            days_until_reorder = (position - reorder_point) / demand
+        else:
+            days_of_cover = days_until_reorder = None
+
+        results.append({
+            **component['key_fields'],
+            'component_type': component['component_type'],
+            'daily_demand': round(demand, 2),
+            'lead_time_days': lead_time_days,
+            'lead_time_assumed': lead_time_source == 'assumed',
+            'lead_time_source': lead_time_source,
+            'lead_time_supplier': component.get('lead_time_supplier'),
+            'lead_time_demand': round(lead_time_demand),
+            'safety_stock': round(safety_stock),
+            'reorder_point': round(reorder_point),
+            'on_hand': component['on_hand'],
+            'inbound': component['inbound'],
+            'inventory_position': position,
+            'days_of_cover': round(days_of_cover, 1) if days_of_cover is not None else None,
+            'days_until_reorder': round(days_until_reorder, 1) if days_until_reorder is not None else None,
+            'needs_reorder': demand > 0 and position <= reorder_point,
+            'order_up_to': round(order_up_to),
+            'raw_order_qty': raw_qty,
+            'moq': moq or None,
+            'moq_order_qty': moq_qty,
+            'max_warehouse_inventory': max_inventory,
+            'capacity_available': capacity,
+            'capacity_limited': recommended < moq_qty,
+            'below_moq': 0 < recommended < moq,
+            'recommended_order_qty': recommended
+        })
+
+    # Most urgent first; components without demand go last
+    results.sort(key=lambda r: (r['days_until_reorder'] is None,
+                                r['days_until_reorder'] if r['days_until_reorder'] is not None else 0,
+                                -r['recommended_order_qty']))
+    return results
+
+def build_components(types, catalog, inventory, inbound, forecasts, cursor):
+    """Per-component demand / stock / spec rows for plan_reorders"""
+    bottles = get_reference_index('bottle', 'bottle_name', cursor)
+    closures = get_reference_index('closure', 'closure_name', cursor)
+    boxes = get_reference_index('box', 'box_size', cursor)
+    performance = get_reference_index('supplier_performance', 'component_name', cursor)
+
+    def spec(index, name):
+        return (index.get(name) or [{}])[0]
+
+    def daily(asin):
+        forecast = forecasts.get(asin) or {}
+        return float(forecast.get('daily_forecast_avg', 0) or forecast.get('avg_daily_sales', 0) or 0)
+
+    # Demand per component from each catalog product's daily forecast
+    demand = {component_type: {} for component_type in types}
+    for product in catalog:
+        units = daily(product['child_asin'])
+        if not units:
+            continue
+        bottle = spec(bottles, product['packaging_name'])
+        if 'bottle' in demand and product['packaging_name']:
+            demand['bottle'][product['packaging_name']] = demand['bottle'].get(product['packaging_name'], 0) + units
+        if 'closure' in demand and product['closure_name']:
+            demand['closure'][product['closure_name']] = demand['closure'].get(product['closure_name'], 0) + units
+        if 'box' in demand and bottle.get('box_size'):
+            # Boxes are consumed per case of finished units
+            per_case = float(bottle.get('finished_units_per_case') or bottle.get('units_per_case') or 1)
+            demand['box'][bottle['box_size']] = demand['box'].get(bottle['box_size'], 0) + units / per_case
+        if 'label' in demand:
+            key = (product['product_name'], product['size'])
+            demand['label'][key] = demand['label'].get(key, 0) + units
+
+    components = []
+    for row in inventory:
+        component_type = row['component_type']
+        if component_type not in demand:
+            continue
+        if component_type == 'label':
+            key = (row['brand_name'], row['product_name'], row['bottle_size'])
+            component_name = ' - '.join(str(part) for part in key)
+            component_spec = row
+            daily_demand = demand['label'].get((row['product_name'], row['bottle_size']), 0)
+            key_fields = {'brand_name': row['brand_name'], 'product_name': row['product_name'],
+                          'bottle_size': row['bottle_size'], 'label_location': row['label_location']}
+        else:
+            key = component_name = row['component_name']
+            index = {'bottle': bottles, 'closure': closures, 'box': boxes}[component_type]
+            component_spec = spec(index, key)
+            daily_demand = demand[component_type].get(key, 0)
+            key_fields = {'component_name': key}
+        actual_days, actual_supplier = actual_lead_time(performance, component_type, component_name,
+                                                        component_spec.get('supplier'))
+        components.append({
+            'component_type': component_type,
+            'key_fields': key_fields,
+            'daily_demand': daily_demand,
+            'on_hand': int(row['on_hand'] or 0),
+            'inbound': inbound[component_type].get(key, 0),
+            'moq': component_spec.get('moq'),
+            'lead_time_weeks': component_spec.get('lead_time_weeks'),
+            'actual_lead_time_days': actual_days,
+            'lead_time_supplier': actual_supplier,
+            'max_warehouse_inventory': component_spec.get('max_warehouse_inventory')
+        })
+    return components
+
+# ============================================
+# SUPPLY CHAIN - REORDER ENGINE
+# ============================================
+
+def get_reorder_plan(event):
+    """GET /supply-chain/reorder - Reorder point / order quantity for every component, by urgency
+
+    Query params: component_type (comma separated), doi_goal (days, default 120),
+    safety_days (default 14), safety_buffer (share of max_warehouse_inventory, default 0.85),
+    reorder_only (true = only components at or below their reorder point).
+    Lead times come from supplier_performance (p90 of received orders) once a
+    component has ACTUAL_LEAD_TIME_MIN_RECEIPTS receipts.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        query_params = event.get('queryStringParameters') or {}
+        try:
+            doi_goal = int(query_params.get('doi_goal', 120))
+            safety_days = float(query_params.get('safety_days', 14))
+            safety_buffer = float(query_params.get('safety_buffer', 0.85))  # Default 85% max capacity
+        except (TypeError, ValueError):
+            return cors_response(400, {
+                'success': False,
+                'error': 'doi_goal must be an integer; safety_days and safety_buffer must be numbers'
+            })
+        reorder_only = str(query_params.get('reorder_only', '')).lower() in ('1', 'true', 'yes')
+        types = [t.strip() for t in (query_params.get('component_type') or '').split(',') if t.strip()]
+        if any(t not in COMPONENT_TYPES for t in types):
+            return cors_response(400, {
+                'success': False,
+                'error': f"component_type must be one of: {', '.join(COMPONENT_TYPES)}"
+            })
+        types = types or list(COMPONENT_TYPES)
+
+        cursor.execute("""
+            SELECT child_asin, packaging_name, closure_name, product_name, size
+            FROM catalog
+            WHERE child_asin IS NOT NULL AND child_asin <> ''
+        """)
+        catalog = cursor.fetchall()
+
+        # On-hand stock for every component type in one round trip
+        cursor.execute("""
+            SELECT 'bottle' AS component_type, bottle_name AS component_name, warehouse_quantity AS on_hand,
+                   NULL AS brand_name, NULL AS product_name, NULL AS bottle_size, NULL AS label_location,
+                   NULL::integer AS moq, NULL::numeric AS lead_time_weeks, NULL AS supplier
+            FROM bottle_inventory
+            UNION ALL
+            SELECT 'closure', closure_name, warehouse_quantity, NULL, NULL, NULL, NULL, NULL, NULL, NULL
+            FROM closure_inventory
+            UNION ALL
+            SELECT 'box', box_type, warehouse_quantity, NULL, NULL, NULL, NULL, NULL, NULL, NULL
+            FROM box_inventory
+            UNION ALL
+            SELECT 'label', NULL, warehouse_inventory, brand_name, product_name, bottle_size, label_location,
+                   moq, lead_time_weeks, supplier
+            FROM label_inventory
+        """)
+        inventory = cursor.fetchall()
+        inbound = get_inbound_quantities(cursor, *types)
+
+        # Fetch forecast data CONCURRENTLY for all ASINs
+        forecasts = {}
+        unique_asins = {product['child_asin'] for product in catalog}
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            future_to_asin = {executor.submit(get_forecast_data, asin): asin for asin in unique_asins}
+            for future in as_completed(future_to_asin):
+                asin = future_to_asin[future]
+                try:
+                    forecasts[asin] = future.result()
+                except Exception:
+                    forecasts[asin] = {'daily_forecast_avg': 0, 'weekly_forecast_avg': 0}
+
+        components = build_components(types, catalog, inventory, inbound, forecasts, cursor)
+        results = plan_reorders(components, doi_goal, safety_days, safety_buffer)
+        if reorder_only:
+            results = [r for r in results if r['needs_reorder']]
+
+        return cors_response(200, {
+            'success': True,
+            'data': results,
+            'count': len(results),
+            'doi_goal': doi_goal,
+            'safety_days': safety_days,
+            'safety_buffer': safety_buffer,
+            'safety_buffer_pct': int(safety_buffer * 100)
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,409 @@
+"""
+Product selection endpoints (/products/selection)
+"""
+
+import json
+from datetime import datetime
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response
+
+def parse_search_vol(value):
+    """searchVol from a request body as an int (None when blank); ValueError if not a number"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(value)
+    try:
+        return int(round(float(str(value).replace(',', '').strip())))
+    except OverflowError:
+        raise ValueError(value)
+
+def get_selections(event):
+    """GET /selection - List all products from catalog for selection view, grouped by product name"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        # Optional filters / sort: ?status=...&actionType=...&sortBy=searchVol
+        query_params = event.get('queryStringParameters') or {}
+        where_clauses = []
+        params = []
+        if query_params.get('status'):
+            where_clauses.append("selection_status = %s")
+            params.append(query_params['status'])
+        if query_params.get('actionType'):
+            where_clauses.append("action_type = %s")
+            params.append(query_params['actionType'])
+        where_sql = f"WHERE {' AND '.join(where_clauses)}" if where_clauses else ''
+        
+        if query_params.get('sortBy') == 'searchVol':
+            order_sql = 'search_vol DESC NULLS LAST, product_name, size'
+        else:
+            order_sql = 'product_name, size, created_at DESC'
+        
+        # Fetch all catalog products with selection-relevant fields
+        cursor.execute(f"""
+            SELECT 
+                id,
+                selection_status as status,
+                seller_account as account,
+                brand_name as brand,
+                product_name as product,
+                size,
+                child_asin,
+                parent_asin,
+                search_vol as "searchVol",
+                COALESCE(action_type, 'launch') as "actionType",
+                template_id as "templateId",
+                created_at as "createdAt",
+                updated_at as "updatedAt"
+            FROM catalog
+            {where_sql}
+            ORDER BY {order_sql}
+        """, params)
+        
+        products = cursor.fetchall()
+        
+        # Group products by product name (combine variations)
+        grouped = {}
+        for row in products:
+            product = dict(row)
+            product_name = product.get('product')
+            
+            # Skip if no product name
+            if not product_name:
+                continue
+            
+            if product_name not in grouped:
+                # First entry for this product
+                grouped[product_name] = {
+                    'id': product.get('id'),
+                    'status': product.get('status'),
+                    'account': product.get('account'),
+                    'brand': product.get('brand'),
+                    'product': product_name,
+                    'searchVol': product.get('searchVol') or 0,
+                    'actionType': product.get('actionType'),
+                    'templateId': product.get('templateId'),
+                    'createdAt': product.get('createdAt').isoformat() if product.get('createdAt') else None,
+                    'updatedAt': product.get('updatedAt').isoformat() if product.get('updatedAt') else None,
+                    'variations': [],
+                    'variationCount': 0
+                }
+            
+            # Always add to variations array (even if size is null)
+            grouped[product_name]['variations'].append({
+                'id': product.get('id'),
+                'size': product.get('size') or '',
+                'childAsin': product.get('child_asin'),
+                'parentAsin': product.get('parent_asin')
+            })
+            grouped[product_name]['variationCount'] += 1
+        
+        # Convert to list and add variation count info
+        result = []
+        for product_name, product_data in grouped.items():
+            # Show variation count in product name if > 1
+            if product_data['variationCount'] > 1:
+                product_data['displayName'] = f"{product_name} ({product_data['variationCount']} variations)"
+            else:
+                product_data['displayName'] = product_name
+            result.append(product_data)
+        
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': result,
+            'count': len(result)
+        })
+        
+    except Exception as e:
+        cursor.close()
+        conn.close()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+def create_selection(event):
+    """POST /selection - Create new product in catalog"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        body = json.loads(event.get('body', '{}'))
+        
+        # Validate required fields
+        if not body.get('product'):
+            return cors_response(400, {
+                'success': False,
+                'error': 'Product name is required'
+            })
+        
+        if not body.get('status'):
+            return cors_response(400, {
+                'success': False,
+                'error': 'Status is required'
+            })
+        
+        try:
+            search_vol = parse_search_vol(body.get('searchVol', 0))
+        except ValueError:
+            return cors_response(400, {
+                'success': False,
+                'error': 'searchVol must be a number'
+            })
+        
+        # Build notes JSON for status, searchVol, actionType, templateId
+        notes_data = {
+            'status': body.get('status'),
+            'searchVol': search_vol,
+            'actionType': body.get('actionType', 'launch'),
+            'templateId': body.get('templateId')
+        }
+        
+        # Insert product into catalog (selection columns mirror notes)
+        cursor.execute("""
+            INSERT INTO catalog (
+                product_name, seller_account, brand_name, marketplace,
+                notes, selection_status, search_vol, action_type, template_id,
+                created_at, updated_at
+            ) VALUES (%s, %s, %s, %s, %s::jsonb, %s, %s, %s, %s, %s, %s)
+            RETURNING id, product_name, seller_account, brand_name,
+                      notes, created_at, updated_at
+        """, (
+            body.get('product'),
+            body.get('account', ''),
+            body.get('brand', ''),
+            'Amazon',
+            json.dumps(notes_data),
+            notes_data['status'],
+            notes_data['searchVol'],
+            notes_data['actionType'],
+            notes_data['templateId'],
+            datetime.now(),
+            datetime.now()
+        ))
+        
+        result = cursor.fetchone()
+        conn.commit()
+        
+        # Format response
+        product = {
+            'id': result['id'],
+            'product': result['product_name'],
+            'account': result['seller_account'],
+            'brand': result['brand_name'],
+            'status': notes_data['status'],
+            'searchVol': notes_data['searchVol'],
+            'actionType': notes_data['actionType'],
+            'templateId': notes_data['templateId'],
+            'createdAt': result['created_at'].isoformat() if result.get('created_at') else None,
+            'updatedAt': result['updated_at'].isoformat() if result.get('updated_at') else None
+        }
+        
+        cursor.close()
+        conn.close()
+        
+        return cors_response(201, {
+            'success': True,
+            'data': product
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        return cors_response(500, {
+            'success': False,
+            'error': str(e)
+        })
+
+def update_selection(event):
+    """PUT /selection/{id} - Update product in catalog"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        product_id = event['pathParameters']['id']
+        body = json.loads(event.get('body', '{}'))
+        
+        try:
+            search_vol = parse_search_vol(body.get('searchVol', 0))
+        except ValueError:
+            cursor.close()
+            conn.close()
+            return cors_response(400, {
+                'success': False,
+                'error': 'searchVol must be a number'
+            })
+        
+        # Build notes JSON
+        notes_data = {
+            'status': body.get('status'),
+            'searchVol': search_vol,
+            'actionType': body.get('actionType', 'launch'),
+            'templateId': body.get('templateId')
+        }
+        
+        # Update product in catalog (selection columns mirror notes)
+        cursor.execute("""
+            UPDATE catalog
+            SET product_name = %s,
+                seller_account = %s,
+                brand_name = %s,
+                notes = %s::jsonb,
+                selection_status = %s,
+                search_vol = %s,
+                action_type = %s,
+                template_id = %s,
+                updated_at = %s
+            WHERE id = %s
+            RETURNING id, product_name, seller_account, brand_name,
+                      notes, created_at, updated_at
+        """, (
+            body.get('product'),
+            body.get('account', ''),
+            body.get('brand', ''),
+            json.dumps(notes_data),
+            notes_data['status'],
+            notes_data['searchVol'],
+            notes_data['actionType'],
+            notes_data['templateId'],
+            datetime.now(),
+            product_id
+        ))
+        
+        result = cursor.fetchone()
+        
+        if not result:
+            conn.rollback()
+            cursor.close()
+            conn.close()
+            return cors_response(404, {
+                'success': False,
+                'error': 'Product not found'
+            })
+        
+        conn.commit()
+        
+        # Format response
+        product = {
+            'id': result['id'],
+            'product': result['product_name'],
+            'account': result['seller_account'],
+            'brand': result['brand_name'],
+            'status': notes_data['status'],
+            'searchVol': notes_data['searchVol'],
+            'actionType': notes_data['actionType'],
+            'templateId': notes_data['templateId'],
+            'createdAt': result['created_at'].isoformat() if result.get('created_at') else None,
+            'updatedAt': result['updated_at'].isoformat() if result.get('updated_at') else None
+        }
+        
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': product
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        return cors_response(500, {
+            'success': False,
+            'error': str(e)
+        })
+
+def delete_selection(event):
+    """DELETE /selection/{id} - Delete product from catalog"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        product_id = event['pathParameters']['id']
+        
+        # Delete product from catalog
+        cursor.execute("DELETE FROM catalog WHERE id = %s", (product_id,))
+        
+        if cursor.rowcount == 0:
+            conn.rollback()
+            cursor.close()
+            conn.close()
+            return cors_response(404, {
+                'success': False,
+                'error': 'Product not found'
+            })
+        
+        conn.commit()
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'message': 'Product deleted successfully'
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        return cors_response(500, {
+            'success': False,
+            'error': str(e)
+        })
+
+def launch_product(event):
+    """PATCH /selection/{id}/launch - Mark product as launched (ready for full details)"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    
+    try:
+        product_id = event['pathParameters']['id']
+        
+        # Flip action_type and merge it into notes in one statement
+        cursor.execute("""
+            UPDATE catalog
+            SET action_type = 'launched',
+                notes = COALESCE(notes::jsonb, '{}'::jsonb) || '{"actionType": "launched"}'::jsonb,
+                updated_at = %s
+            WHERE id = %s
+            RETURNING id
+        """, (datetime.now(), product_id))
+        
+        if not cursor.fetchone():
+            conn.rollback()
+            cursor.close()
+            conn.close()
+            return cors_response(404, {
+                'success': False,
+                'error': 'Product not found'
+            })
+        
+        conn.commit()
+        cursor.close()
+        conn.close()
+        
+        return cors_response(200, {
+            'success': True,
+            'message': 'Product marked as launched',
+            'productId': product_id
+        })
+        
+    except Exception as e:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        return cors_response(500, {
+            'success': False,
+            'error': str(e)
+        })
@@ -0,0 +1,1229 @@
+"""
+Production shipments, formula / label checks and label availability
+"""
+
+import json
+import logging
+
+from psycopg2.extras import RealDictCursor
+
+from lambda_function import get_db_connection, cors_response, logger
+
+# ============================================
+# SHIPMENT ENDPOINTS
+# ============================================
+
+def get_shipments(event):
+    """GET /production/shipments - Get all shipments"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        query_params = event.get('queryStringParameters') or {}
+        status = query_params.get('status')
+        
+        query = """
+            SELECT 
+                id,
+                shipment_number,
+                shipment_date,
+                shipment_type,
+                marketplace,
+                account,
+                location,
+                status,
+                add_products_completed,
+                formula_check_completed,
+                formula_check_comment,
+                label_check_completed,
+                label_check_comment,
+                sort_products_completed,
+                sort_formulas_completed,
+                book_shipment_completed,
+                carrier,
+                total_units,
+                total_boxes,
+                total_palettes,
+                estimated_hours,
+                created_by,
+                created_at,
+                updated_at
+            FROM shipments
+        """
+        
+        if status:
+            query += " WHERE status = %s"
+            cursor.execute(query + " ORDER BY created_at DESC, id DESC", (status,))
+        else:
+            cursor.execute(query + " ORDER BY created_at DESC, id DESC")
+        
+        shipments = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': shipments
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_shipment_by_id(event):
+    """GET /production/shipments/{id} - Get shipment details"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        shipment_id = event['pathParameters']['id']
+        
+        # Get shipment
+        cursor.execute("""
+            SELECT * FROM shipments WHERE id = %s
+        """, (shipment_id,))
+        shipment = cursor.fetchone()
+        
+        if not shipment:
+            return cors_response(404, {
+                'success': False,
+                'error': 'Shipment not found'
+            })
+        
+        # Get products
+        cursor.execute("""
+            SELECT * FROM shipment_products WHERE shipment_id = %s
+        """, (shipment_id,))
+        products = cursor.fetchall()
+        
+        shipment['products'] = products
+        
+        return cors_response(200, {
+            'success': True,
+            'data': shipment
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_shipment(event):
+    """POST /production/shipments - Create new shipment"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        body = json.loads(event.get('body', '{}'))
+        
+        cursor.execute("""
+            INSERT INTO shipments (
+                shipment_number,
+                shipment_date,
+                shipment_type,
+                marketplace,
+                account,
+                location,
+                created_by
+            ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+            RETURNING *
+        """, (
+            body.get('shipment_number'),
+            body.get('shipment_date'),
+            body.get('shipment_type', 'AWD'),
+            body.get('marketplace', 'Amazon'),
+            body.get('account'),
+            body.get('location'),
+            body.get('created_by', 'system')
+        ))
+        
+        shipment = cursor.fetchone()
+        conn.commit()
+        
+        return cors_response(201, {
+            'success': True,
+            'data': shipment
+        })
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_shipment(event):
+    """PUT /production/shipments/{id} - Update shipment"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        shipment_id = event['pathParameters']['id']
+        body = json.loads(event.get('body', '{}'))
+        
+        # Check if we're booking the shipment (4th tab completion)
+        # This is when we should deduct inventory
+        booking_shipment = body.get('book_shipment_completed') == True
+        
+        if booking_shipment:
+            # First check if shipment is already booked to prevent double deduction
+            cursor.execute("""
+                SELECT book_shipment_completed FROM shipments WHERE id = %s
+            """, (shipment_id,))
+            current_shipment = cursor.fetchone()
+            
+            if current_shipment and current_shipment['book_shipment_completed']:
+                # Already booked, don't deduct again
+                booking_shipment = False
+        
+        # Build dynamic UPDATE query
+        update_fields = []
+        values = []
+        
+        # Get existing columns in shipments table to handle migrations gracefully
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns 
+            WHERE table_name = 'shipments'
+        """)
+        existing_columns = {row['column_name'] for row in cursor.fetchall()}
+        
+        allowed_fields = [
+            'shipment_number', 'shipment_date', 'shipment_type', 
+            'marketplace', 'account', 'location', 'status',
+            'add_products_completed', 'formula_check_completed',
+            'formula_check_comment', 'label_check_completed',
+            'label_check_comment', 'sort_products_completed',
+            'sort_formulas_completed', 'book_shipment_completed', 
+            'notes', 'carrier'
+        ]
+        
+        # Only allow fields that exist in the database
+        allowed_fields = [f for f in allowed_fields if f in existing_columns]
+        
+        for field in allowed_fields:
+            if field in body:
+                update_fields.append(f"{field} = %s")
+                values.append(body[field])
+        
+        if not update_fields:
+            return cors_response(400, {
+                'success': False,
+                'error': 'No valid fields to update'
+            })
+        
+        values.append(shipment_id)
+        
+        query = f"""
+            UPDATE shipments 
+            SET {', '.join(update_fields)}
+            WHERE id = %s
+            RETURNING *
+        """
+        
+        cursor.execute(query, values)
+        shipment = cursor.fetchone()
+        
+        # If booking shipment, deduct inventory for all products
+        if booking_shipment:
+            # Get all products in this shipment
+            cursor.execute("""
+                SELECT 
+                    sp.quantity,
+                    sp.label_location,
+                    sp.brand_name,
+                    sp.product_name,
+                    sp.size,
+                    sp.bottle_name,
+                    sp.closure_name,
+                    sp.formula_name,
+                    sp.formula_gallons_needed,
+                    sp.boxes_needed,
+                    sp.box_type
+                FROM shipment_products sp
+                WHERE sp.shipment_id = %s
+            """, (shipment_id,))
+            
+            products = cursor.fetchall()
+            
+            for product in products:
+                quantity = product['quantity'] or 0
+                
+                # Deduct labels from label_inventory
+                # Match by unique key (brand_name, product_name, bottle_size) for accuracy
+                if product['brand_name'] and product['product_name'] and product['size']:
+                    cursor.execute("""
+                        UPDATE label_inventory 
+                        SET warehouse_inventory = GREATEST(0, warehouse_inventory - %s)
+                        WHERE brand_name = %s 
+                        AND product_name = %s 
+                        AND bottle_size = %s
+                    """, (quantity, product['brand_name'], product['product_name'], product['size']))
+                # Fallback to label_location if brand/product/size not available
+                elif product['label_location']:
+                    cursor.execute("""
+                        UPDATE label_inventory 
+                        SET warehouse_inventory = GREATEST(0, warehouse_inventory - %s)
+                        WHERE label_location = %s
+                    """, (quantity, product['label_location']))
+                
+                # Deduct bottles from bottle_inventory
+                if product['bottle_name']:
+                    cursor.execute("""
+                        UPDATE bottle_inventory 
+                        SET warehouse_quantity = GREATEST(0, warehouse_quantity - %s)
+                        WHERE bottle_name = %s
+                    """, (quantity, product['bottle_name']))
+                
+                # Deduct closures from closure_inventory
+                if product['closure_name']:
+                    cursor.execute("""
+                        UPDATE closure_inventory 
+                        SET warehouse_quantity = GREATEST(0, warehouse_quantity - %s)
+                        WHERE closure_name = %s
+                    """, (quantity, product['closure_name']))
+                
+                # Deduct formula from formula_inventory
+                if product['formula_name'] and product['formula_gallons_needed']:
+                    cursor.execute("""
+                        UPDATE formula_inventory 
+                        SET gallons_available = GREATEST(0, gallons_available - %s)
+                        WHERE formula_name = %s
+                    """, (product['formula_gallons_needed'], product['formula_name']))
+                
+                # Deduct boxes from box_inventory
+                if product['box_type'] and product['boxes_needed']:
+                    cursor.execute("""
+                        UPDATE box_inventory 
+                        SET warehouse_quantity = GREATEST(0, warehouse_quantity - %s)
+                        WHERE box_type = %s
+                    """, (product['boxes_needed'], product['box_type']))
+        
+        conn.commit()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': shipment,
+            'inventory_deducted': booking_shipment
+        })
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def delete_shipment(event):
+    """DELETE /production/shipments/{id} - Delete a shipment and restore inventory if booked"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Extract shipment ID from pathParameters or from path directly
+        path_params = event.get('pathParameters') or {}
+        if 'id' in path_params:
+            shipment_id = path_params['id']
+        else:
+            # Extract from path: /production/shipments/{id}
+            path = event.get('path') or event.get('rawPath', '')
+            path_parts = path.split('/')
+            # Find 'shipments' and get the next part
+            for i, part in enumerate(path_parts):
+                if part == 'shipments' and i + 1 < len(path_parts):
+                    shipment_id = path_parts[i + 1]
+                    break
+            else:
+                return cors_response(400, {'success': False, 'error': 'Could not extract shipment ID from path'})
+        
+        # Check if shipment exists and if it was booked
+        cursor.execute("""
+            SELECT id, book_shipment_completed 
+            FROM shipments 
+            WHERE id = %s
+        """, (shipment_id,))
+        shipment = cursor.fetchone()
+        
+        if not shipment:
+            return cors_response(404, {
+                'success': False,
+                'error': 'Shipment not found'
+            })
+        
+        # If shipment was booked, restore inventory before deleting
+        if shipment.get('book_shipment_completed'):
+            # Get all products in this shipment to restore inventory
+            cursor.execute("""
+                SELECT 
+                    sp.quantity,
+                    sp.label_location,
+                    sp.brand_name,
+                    sp.product_name,
+                    sp.size,
+                    sp.bottle_name,
+                    sp.closure_name,
+                    sp.formula_name,
+                    sp.formula_gallons_needed,
+                    sp.boxes_needed,
+                    sp.box_type
+                FROM shipment_products sp
+                WHERE sp.shipment_id = %s
+            """, (shipment_id,))
+            
+            products = cursor.fetchall()
+            
+            for product in products:
+                quantity = product['quantity'] or 0
+                
+                # Restore labels to label_inventory
+                # Match by unique key (brand_name, product_name, bottle_size) for accuracy
+                if product['brand_name'] and product['product_name'] and product['size']:
+                    cursor.execute("""
+                        UPDATE label_inventory 
+                        SET warehouse_inventory = warehouse_inventory + %s
+                        WHERE brand_name = %s 
+                        AND product_name = %s 
+                        AND bottle_size = %s
+                    """, (quantity, product['brand_name'], product['product_name'], product['size']))
+                # Fallback to label_location if brand/product/size not available
+                elif product['label_location']:
+                    cursor.execute("""
+                        UPDATE label_inventory 
+                        SET warehouse_inventory = warehouse_inventory + %s
+                        WHERE label_location = %s
+                    """, (quantity, product['label_location']))
+                
+                # Restore bottles to bottle_inventory
+                if product['bottle_name']:
+                    cursor.execute("""
+                        UPDATE bottle_inventory 
+                        SET warehouse_quantity = warehouse_quantity + %s
+                        WHERE bottle_name = %s
+                    """, (quantity, product['bottle_name']))
+                
+                # Restore closures to closure_inventory
+                if product['closure_name']:
+                    cursor.execute("""
+                        UPDATE closure_inventory 
+                        SET warehouse_quantity = warehouse_quantity + %s
+                        WHERE closure_name = %s
+                    """, (quantity, product['closure_name']))
+                
+                # Restore formula to formula_inventory
+                if product['formula_name'] and product['formula_gallons_needed']:
+                    cursor.execute("""
+                        UPDATE formula_inventory 
+                        SET gallons_available = gallons_available + %s
+                        WHERE formula_name = %s
+                    """, (product['formula_gallons_needed'], product['formula_name']))
+                
+                # Restore boxes to box_inventory
+                if product['box_type'] and product['boxes_needed']:
+                    cursor.execute("""
+                        UPDATE box_inventory 
+                        SET warehouse_quantity = warehouse_quantity + %s
+                        WHERE box_type = %s
+                    """, (product['boxes_needed'], product['box_type']))
+        
+        # Delete shipment (CASCADE will handle related records in shipment_products and shipment_formulas)
+        cursor.execute("DELETE FROM shipments WHERE id = %s", (shipment_id,))
+        conn.commit()
+        
+        return cors_response(200, {
+            'success': True,
+            'message': 'Shipment deleted successfully',
+            'inventory_restored': shipment.get('book_shipment_completed', False)
+        })
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def add_shipment_products(event):
+    """POST /production/shipments/{id}/products - Add/Update products in shipment
+    
+    This function now supports updating products:
+    - Saves existing checked status for formulas
+    - Saves existing label check status for products
+    - Clears and re-inserts products
+    - Restores checked status for formulas/products that still exist
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        shipment_id = event['pathParameters']['id']
+        body = json.loads(event.get('body', '{}'))
+        products = body.get('products', [])
+        
+        # ============================================
+        # STEP 1: Save existing checked status before deleting
+        # ============================================
+        
+        # Save formula check status (by formula_name)
+        cursor.execute("""
+            SELECT formula_name, is_checked, notes, checked_at, checked_by
+            FROM shipment_formulas
+            WHERE shipment_id = %s
+        """, (shipment_id,))
+        existing_formula_status = {row['formula_name']: row for row in cursor.fetchall()}
+        
+        # Save label check status (by label_location)
+        cursor.execute("""
+            SELECT label_location, label_check_status, label_check_count
+            FROM shipment_products
+            WHERE shipment_id = %s AND label_check_status IS NOT NULL
+        """, (shipment_id,))
+        existing_label_status = {row['label_location']: row for row in cursor.fetchall()}
+        
+        # ============================================
+        # STEP 2: Delete existing products and formulas
+        # ============================================
+        cursor.execute("DELETE FROM shipment_formulas WHERE shipment_id = %s", (shipment_id,))
+        cursor.execute("DELETE FROM shipment_products WHERE shipment_id = %s", (shipment_id,))
+        
+        added_products = []
+        supply_warnings = []
+        
+        # ============================================
+        # STEP 3: Insert new products
+        # ============================================
+        for product in products:
+            catalog_id = product['catalog_id']
+            quantity = product['quantity']
+            
+            # Determine if catalog_id is an integer ID or an ASIN string
+            # ASINs start with 'B0' and are alphanumeric, IDs are integers
+            is_asin = isinstance(catalog_id, str) and (catalog_id.startswith('B0') or not catalog_id.isdigit())
+            
+            # Get catalog data with inventory levels
+            if is_asin:
+                # Look up by child_asin
+                cursor.execute("""
+                    SELECT 
+                        c.id,
+                        c.product_name,
+                        c.brand_name,
+                        c.size,
+                        c.child_asin,
+                        c.child_sku_final,
+                        c.units_per_case,
+                        c.packaging_name as bottle_name,
+                        c.formula_name,
+                        c.closure_name,
+                        c.label_location,
+                        c.case_size as box_type,
+                        b.size_oz,
+                        b.bottles_per_minute,
+                        -- Inventory levels
+                        COALESCE(bi.warehouse_quantity, 0) as bottle_inventory,
+                        COALESCE(ci.warehouse_quantity, 0) as closure_inventory,
+                        COALESCE(li.warehouse_inventory, 0) as label_inventory,
+                        COALESCE(fi.gallons_available, 0) as formula_gallons_available,
+                        -- Calculate max producible
+                        LEAST(
+                            COALESCE(bi.warehouse_quantity, 0),
+                            COALESCE(ci.warehouse_quantity, 0),
+                            COALESCE(li.warehouse_inventory, 0),
+                            FLOOR(COALESCE(fi.gallons_available, 0) / COALESCE(sd.gallons_per_unit, 0.25))
+                        ) as max_units_producible
+                    FROM catalog c
+                    LEFT JOIN size_dim sd ON c.size = sd.size
+                    LEFT JOIN bottle b ON c.packaging_name = b.bottle_name
+                    LEFT JOIN bottle_inventory bi ON c.packaging_name = bi.bottle_name
+                    LEFT JOIN closure_inventory ci ON c.closure_name = ci.closure_name
+                    LEFT JOIN label_inventory li ON c.label_location = li.label_location
+                    LEFT JOIN formula_inventory fi ON c.formula_name = fi.formula_name
+                    WHERE c.child_asin = %s
+                """, (catalog_id,))
+            else:
+                # Look up by integer ID
+                cursor.execute("""
+                    SELECT 
+                        c.id,
+                        c.product_name,
+                        c.brand_name,
+                        c.size,
+                        c.child_asin,
+                        c.child_sku_final,
+                        c.units_per_case,
+                        c.packaging_name as bottle_name,
+                        c.formula_name,
+                        c.closure_name,
+                        c.label_location,
+                        c.case_size as box_type,
+                        b.size_oz,
+                        b.bottles_per_minute,
+                        -- Inventory levels
+                        COALESCE(bi.warehouse_quantity, 0) as bottle_inventory,
+                        COALESCE(ci.warehouse_quantity, 0) as closure_inventory,
+                        COALESCE(li.warehouse_inventory, 0) as label_inventory,
+                        COALESCE(fi.gallons_available, 0) as formula_gallons_available,
+                        -- Calculate max producible
+                        LEAST(
+                            COALESCE(bi.warehouse_quantity, 0),
+                            COALESCE(ci.warehouse_quantity, 0),
+                            COALESCE(li.warehouse_inventory, 0),
+                            FLOOR(COALESCE(fi.gallons_available, 0) / COALESCE(sd.gallons_per_unit, 0.25))
+                        ) as max_units_producible
+                    FROM catalog c
+                    LEFT JOIN size_dim sd ON c.size = sd.size
+                    LEFT JOIN bottle b ON c.packaging_name = b.bottle_name
+                    LEFT JOIN bottle_inventory bi ON c.packaging_name = bi.bottle_name
+                    LEFT JOIN closure_inventory ci ON c.closure_name = ci.closure_name
+                    LEFT JOIN label_inventory li ON c.label_location = li.label_location
+                    LEFT JOIN formula_inventory fi ON c.formula_name = fi.formula_name
+                    WHERE c.id = %s
+                """, (int(catalog_id),))
+            
+            catalog_data = cursor.fetchone()
+            
+            if not catalog_data:
+                continue
+            
+            # Check supply chain availability
+            max_producible = catalog_data['max_units_producible']
+            if quantity > max_producible:
+                supply_warnings.append({
+                    'product': catalog_data['product_name'],
+                    'size': catalog_data['size'],
+                    'requested': quantity,
+                    'max_available': max_producible,
+                    'bottles': catalog_data['bottle_inventory'],
+                    'closures': catalog_data['closure_inventory'],
+                    'labels': catalog_data['label_inventory'],
+                    'formula_gallons': float(catalog_data['formula_gallons_available'])
+                })
+            
+            # Calculate needs
+            units_per_case = float(catalog_data['units_per_case'] or 1)
+            boxes_needed = int(quantity / units_per_case) + (1 if quantity % units_per_case > 0 else 0)
+            
+            # Calculate formula gallons (size_oz / 128 = gallons)
+            size_oz = float(catalog_data['size_oz'] or 0)
+            formula_gallons = (quantity * size_oz) / 128.0
+            
+            # Calculate production time
+            bpm = float(catalog_data['bottles_per_minute'] or 30)
+            production_minutes = quantity / bpm if bpm > 0 else 0
+            
+            # Insert product - use the actual database ID from catalog_data, not the passed-in ID/ASIN
+            actual_catalog_id = catalog_data['id']
+            
+            cursor.execute("""
+                INSERT INTO shipment_products (
+                    shipment_id,
+                    catalog_id,
+                    product_name,
+                    brand_name,
+                    size,
+                    child_asin,
+                    child_sku,
+                    quantity,
+                    units_per_case,
+                    boxes_needed,
+                    bottle_name,
+                    formula_name,
+                    closure_name,
+                    label_location,
+                    box_type,
+                    formula_gallons_needed,
+                    bottles_needed,
+                    closures_needed,
+                    labels_needed,
+                    bottles_per_minute,
+                    production_time_minutes
+                ) VALUES (
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+                )
+                RETURNING *
+            """, (
+                shipment_id,
+                actual_catalog_id,
+                catalog_data['product_name'],
+                catalog_data['brand_name'],
+                catalog_data['size'],
+                catalog_data['child_asin'],
+                catalog_data['child_sku_final'],
+                quantity,
+                units_per_case,
+                boxes_needed,
+                catalog_data['bottle_name'],
+                catalog_data['formula_name'],
+                catalog_data['closure_name'],
+                catalog_data['label_location'],
+                catalog_data['box_type'],
+                formula_gallons,
+                quantity,
+                quantity,
+                quantity,
+                bpm,
+                production_minutes
+            ))
+            
+            added_products.append(cursor.fetchone())
+        
+        # ============================================
+        # STEP 4: Aggregate formulas
+        # ============================================
+        cursor.execute("SELECT aggregate_shipment_formulas(%s)", (shipment_id,))
+        
+        # ============================================
+        # STEP 5: Restore checked status for formulas that still exist
+        # ============================================
+        if existing_formula_status:
+            for formula_name, saved_data in existing_formula_status.items():
+                if saved_data.get('is_checked'):
+                    cursor.execute("""
+                        UPDATE shipment_formulas
+                        SET is_checked = TRUE,
+                            notes = %s,
+                            checked_at = %s,
+                            checked_by = %s
+                        WHERE shipment_id = %s AND formula_name = %s
+                    """, (
+                        saved_data.get('notes', ''),
+                        saved_data.get('checked_at'),
+                        saved_data.get('checked_by'),
+                        shipment_id,
+                        formula_name
+                    ))
+                elif saved_data.get('notes'):
+                    # Restore notes even if not checked
+                    cursor.execute("""
+                        UPDATE shipment_formulas
+                        SET notes = %s
+                        WHERE shipment_id = %s AND formula_name = %s
+                    """, (saved_data.get('notes', ''), shipment_id, formula_name))
+        
+        # ============================================
+        # STEP 6: Restore label check status for products that still exist
+        # ============================================
+        if existing_label_status:
+            for label_location, saved_data in existing_label_status.items():
+                cursor.execute("""
+                    UPDATE shipment_products
+                    SET label_check_status = %s,
+                        label_check_count = %s
+                    WHERE shipment_id = %s AND label_location = %s
+                """, (
+                    saved_data.get('label_check_status'),
+                    saved_data.get('label_check_count'),
+                    shipment_id,
+                    label_location
+                ))
+        
+        conn.commit()
+        
+        # Count how many checks were preserved
+        formulas_preserved = sum(1 for f in existing_formula_status.values() if f.get('is_checked'))
+        labels_preserved = len(existing_label_status)
+        
+        response_data = {
+            'success': True,
+            'data': added_products,
+            'supply_warnings': supply_warnings if supply_warnings else None,
+            'preserved_checks': {
+                'formulas': formulas_preserved,
+                'labels': labels_preserved
+            }
+        }
+        
+        # If there are supply warnings, add a warning message
+        if supply_warnings:
+            response_data['message'] = f'⚠️ Warning: {len(supply_warnings)} product(s) exceed available inventory'
+        elif formulas_preserved > 0 or labels_preserved > 0:
+            response_data['message'] = f'Products updated. Preserved {formulas_preserved} formula checks and {labels_preserved} label checks.'
+        
+        return cors_response(201, response_data)
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_shipment_formula_check(event):
+    """GET /production/shipments/{id}/formula-check - Get formula aggregation"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        shipment_id = event['pathParameters']['id']
+        
+        cursor.execute("""
+            SELECT 
+                sf.id,
+                sf.shipment_id,
+                sf.formula_name,
+                sf.total_gallons_needed,
+                sf.total_products,
+                sf.vessel_type,
+                sf.vessel_quantity,
+                sf.vessel_size_gallons,
+                sf.formula_available,
+                sf.gallons_allocated,
+                COALESCE(sf.is_checked, FALSE) as is_checked,
+                COALESCE(sf.notes, '') as notes,
+                sf.checked_at,
+                sf.checked_by,
+                sf.created_at,
+                sf.updated_at,
+                fi.gallons_available,
+                fi.gallons_allocated as fi_gallons_allocated,
+                (fi.gallons_available - COALESCE(fi.gallons_allocated, 0)) as gallons_free
+            FROM shipment_formulas sf
+            LEFT JOIN formula_inventory fi ON sf.formula_name = fi.formula_name
+            WHERE sf.shipment_id = %s
+            ORDER BY sf.formula_name
+        """, (shipment_id,))
+        
+        formulas = cursor.fetchall()
+        
+        # Check for shortages and ensure proper defaults
+        for formula in formulas:
+            gallons_free = formula.get('gallons_free') or 0
+            gallons_needed = formula.get('total_gallons_needed') or 0
+            formula['has_shortage'] = gallons_needed > gallons_free
+            formula['shortage_amount'] = max(0, gallons_needed - gallons_free)
+            # Ensure is_checked is boolean, not None
+            formula['is_checked'] = bool(formula.get('is_checked', False))
+            # Ensure notes is string, not None
+            formula['notes'] = formula.get('notes') or ''
+        
+        return cors_response(200, {
+            'success': True,
+            'data': formulas
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_shipment_formula_check(event):
+    """PUT /production/shipments/{id}/formula-check - Update formula check status
+    
+    Updates checked status and notes for formulas in a shipment.
+    Body: {
+        checked_formula_ids: [1, 2, 3],  // IDs of formulas that are checked
+        formula_notes: { "1": "note1", "2": "note2" },  // Notes keyed by formula ID
+        uncheck_formula_ids: [4, 5]  // Optional: IDs to explicitly uncheck
+    }
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Extract shipment ID from pathParameters or from path directly
+        path_params = event.get('pathParameters') or {}
+        if 'id' in path_params:
+            shipment_id = path_params['id']
+        else:
+            # Extract from path: /production/shipments/{id}/formula-check
+            path = event.get('path') or event.get('rawPath', '')
+            path_parts = path.split('/')
+            # Find 'shipments' and get the next part
+            for i, part in enumerate(path_parts):
+                if part == 'shipments' and i + 1 < len(path_parts):
+                    shipment_id = path_parts[i + 1]
+                    break
+            else:
+                return cors_response(400, {'success': False, 'error': 'Could not extract shipment ID from path'})
+        
+        body = json.loads(event.get('body', '{}'))
+        
+        checked_formula_ids = body.get('checked_formula_ids', [])
+        uncheck_formula_ids = body.get('uncheck_formula_ids', [])
+        formula_notes = body.get('formula_notes', {})
+        checked_by = body.get('checked_by')
+        
+        # Check if new columns exist (migration may not have run yet)
+        cursor.execute("""
+            SELECT column_name FROM information_schema.columns 
+            WHERE table_name = 'shipment_formulas'
+        """)
+        existing_columns = {row['column_name'] for row in cursor.fetchall()}
+        has_is_checked = 'is_checked' in existing_columns
+        has_notes = 'notes' in existing_columns
+        
+        # Update checked formulas (only if columns exist)
+        if checked_formula_ids and has_is_checked:
+            cursor.execute("""
+                UPDATE shipment_formulas
+                SET is_checked = TRUE,
+                    checked_at = CURRENT_TIMESTAMP,
+                    checked_by = %s
+                WHERE shipment_id = %s AND id = ANY(%s)
+            """, (checked_by, shipment_id, checked_formula_ids))
+        
+        # Update unchecked formulas (only if columns exist)
+        if uncheck_formula_ids and has_is_checked:
+            cursor.execute("""
+                UPDATE shipment_formulas
+                SET is_checked = FALSE,
+                    checked_at = NULL,
+                    checked_by = NULL
+                WHERE shipment_id = %s AND id = ANY(%s)
+            """, (shipment_id, uncheck_formula_ids))
+        
+        # Update notes for each formula (only if column exists)
+        if has_notes:
+            for formula_id, note in formula_notes.items():
+                cursor.execute("""
+                    UPDATE shipment_formulas
+                    SET notes = %s
+                    WHERE shipment_id = %s AND id = %s
+                """, (note, shipment_id, formula_id))
+        
+        conn.commit()
+        
+        # Return updated formula check data
+        cursor.execute("""
+            SELECT 
+                sf.id,
+                sf.shipment_id,
+                sf.formula_name,
+                sf.total_gallons_needed,
+                sf.total_products,
+                sf.vessel_type,
+                sf.vessel_quantity,
+                sf.vessel_size_gallons,
+                sf.formula_available,
+                sf.gallons_allocated,
+                COALESCE(sf.is_checked, FALSE) as is_checked,
+                COALESCE(sf.notes, '') as notes,
+                sf.checked_at,
+                sf.checked_by,
+                sf.created_at,
+                sf.updated_at,
+                fi.gallons_available,
+                fi.gallons_allocated as fi_gallons_allocated,
+                (fi.gallons_available - COALESCE(fi.gallons_allocated, 0)) as gallons_free
+            FROM shipment_formulas sf
+            LEFT JOIN formula_inventory fi ON sf.formula_name = fi.formula_name
+            WHERE sf.shipment_id = %s
+            ORDER BY sf.formula_name
+        """, (shipment_id,))
+        
+        formulas = cursor.fetchall()
+        
+        # Check for shortages and ensure proper defaults
+        for formula in formulas:
+            gallons_free = formula.get('gallons_free') or 0
+            gallons_needed = formula.get('total_gallons_needed') or 0
+            formula['has_shortage'] = gallons_needed > gallons_free
+            formula['shortage_amount'] = max(0, gallons_needed - gallons_free)
+            # Ensure is_checked is boolean, not None
+            formula['is_checked'] = bool(formula.get('is_checked', False))
+            # Ensure notes is string, not None
+            formula['notes'] = formula.get('notes') or ''
+        
+        return cors_response(200, {
+            'success': True,
+            'data': formulas,
+            'message': 'Formula check status updated'
+        })
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_labels_availability(event):
+    """GET /production/labels/availability - Get available labels for all label_locations
+    
+    Calculates: Total Labels - Labels Committed in Active Shipments
+    Active shipments = status NOT IN ('shipped', 'received', 'archived')
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        # Get optional exclude_shipment_id to exclude current shipment from calculation
+        query_params = event.get('queryStringParameters') or {}
+        exclude_shipment_id = query_params.get('exclude_shipment_id')
+        
+        # Debug: Log what's committed in active shipments (extra query, DEBUG only)
+        if logger.isEnabledFor(logging.DEBUG):
+            cursor.execute("""
+                SELECT 
+                    sp.label_location,
+                    sp.labels_needed,
+                    sp.quantity,
+                    sp.product_name,
+                    s.id as shipment_id,
+                    s.status as shipment_status
+                FROM shipment_products sp
+                JOIN shipments s ON sp.shipment_id = s.id
+                WHERE s.status NOT IN ('shipped', 'received', 'archived')
+                AND sp.label_location IS NOT NULL
+                ORDER BY sp.label_location
+                LIMIT 10
+            """)
+            debug_committed = cursor.fetchall()
+            logger.debug("Committed labels in active shipments (first %s):", len(debug_committed))
+            for row in debug_committed:
+                logger.debug("  %s: %s labels for %s (shipment %s, status: %s)", row['label_location'],
+                             row['labels_needed'], row['product_name'], row['shipment_id'], row['shipment_status'])
+        
+        # Get all label_locations with their total inventory and committed labels
+        cursor.execute("""
+            WITH committed_labels AS (
+                SELECT 
+                    sp.label_location,
+                    SUM(COALESCE(sp.labels_needed, sp.quantity)) as total_committed
+                FROM shipment_products sp
+                JOIN shipments s ON sp.shipment_id = s.id
+                WHERE s.status NOT IN ('shipped', 'received', 'archived')
+                AND sp.label_location IS NOT NULL
+                """ + (f"AND s.id != %s" if exclude_shipment_id else "") + """
+                GROUP BY sp.label_location
+            )
+            SELECT 
+                li.id,
+                li.label_location,
+                li.brand_name,
+                li.product_name,
+                li.bottle_size,
+                li.warehouse_inventory as total_inventory,
+                COALESCE(cl.total_committed, 0) as labels_committed,
+                li.warehouse_inventory - COALESCE(cl.total_committed, 0) as labels_available
+            FROM label_inventory li
+            LEFT JOIN committed_labels cl ON li.label_location = cl.label_location
+            WHERE li.label_location IS NOT NULL
+            ORDER BY li.brand_name, li.product_name, li.bottle_size
+        """, (exclude_shipment_id,) if exclude_shipment_id else ())
+        
+        labels = cursor.fetchall()
+        
+        # Debug logging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Labels availability: %s label_locations found", len(labels))
+            for lbl in labels[:5]:
+                logger.debug("  %s: total=%s, committed=%s, available=%s", lbl['label_location'],
+                             lbl['total_inventory'], lbl['labels_committed'], lbl['labels_available'])
+        
+        # Create a lookup map by label_location
+        availability_map = {}
+        for label in labels:
+            loc = label['label_location']
+            if loc:
+                if loc not in availability_map:
+                    availability_map[loc] = {
+                        'label_location': loc,
+                        'total_inventory': label['total_inventory'] or 0,
+                        'labels_committed': label['labels_committed'] or 0,
+                        'labels_available': label['labels_available'] or 0,
+                        'products_using': []
+                    }
+                availability_map[loc]['products_using'].append({
+                    'brand_name': label['brand_name'],
+                    'product_name': label['product_name'],
+                    'bottle_size': label['bottle_size']
+                })
+        
+        return cors_response(200, {
+            'success': True,
+            'data': list(availability_map.values()),
+            'by_location': availability_map
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_shipment_products(event):
+    """GET /production/shipments/{id}/products - Get shipment products"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        shipment_id = event['pathParameters']['id']
+        
+        # Get products with available inventory (accounting for other shipments)
+        cursor.execute("""
+            WITH committed_labels AS (
+                SELECT 
+                    sp.label_location,
+                    SUM(COALESCE(sp.labels_needed, sp.quantity)) as total_committed
+                FROM shipment_products sp
+                JOIN shipments s ON sp.shipment_id = s.id
+                WHERE s.status NOT IN ('shipped', 'received', 'archived')
+                AND s.id != %s
+                AND sp.label_location IS NOT NULL
+                GROUP BY sp.label_location
+            )
+            SELECT 
+                sp.*,
+                bi.warehouse_quantity as bottles_available,
+                ci.warehouse_quantity as closures_available,
+                li.warehouse_inventory as labels_total,
+                COALESCE(cl.total_committed, 0) as labels_committed_other_shipments,
+                li.warehouse_inventory - COALESCE(cl.total_committed, 0) as labels_available
+            FROM shipment_products sp
+            LEFT JOIN bottle_inventory bi ON sp.bottle_name = bi.bottle_name
+            LEFT JOIN closure_inventory ci ON sp.closure_name = ci.closure_name
+            LEFT JOIN label_inventory li ON sp.label_location = li.label_location
+            LEFT JOIN committed_labels cl ON sp.label_location = cl.label_location
+            WHERE sp.shipment_id = %s
+            ORDER BY sp.brand_name, sp.product_name, sp.size
+        """, (shipment_id, shipment_id))
+        
+        products = cursor.fetchall()
+        
+        return cors_response(200, {
+            'success': True,
+            'data': products
+        })
+    except Exception as e:
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
+
+def update_shipment_product_label_check(event):
+    """PUT /production/shipments/{id}/products/{product_id}/label-check - Update label check status for a product"""
+    conn = get_db_connection()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        shipment_id = event['pathParameters']['id']
+        product_id = event['pathParameters'].get('product_id')
+        body = json.loads(event.get('body', '{}'))
+        
+        status = body.get('status')  # 'confirmed', 'counted', or None (to reset)
+        count = body.get('count')  # Only for 'counted' status
+        
+        # Allow null status to reset the label check
+        if status is None:
+            # Reset label check status
+            cursor.execute("""
+                UPDATE shipment_products 
+                SET label_check_status = NULL,
+                    label_check_count = NULL,
+                    label_check_at = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND shipment_id = %s
+                RETURNING *
+            """, (product_id, shipment_id))
+            
+            product = cursor.fetchone()
+            conn.commit()
+            
+            if not product:
+                return cors_response(404, {
+                    'success': False,
+                    'error': f'Product {product_id} not found in shipment {shipment_id}'
+                })
+            
+            return cors_response(200, {
+                'success': True,
+                'data': dict(product)
+            })
+        
+        if not status:
+            return cors_response(400, {
+                'success': False,
+                'error': 'status is required (confirmed or counted), or null to reset'
+            })
+        
+        if status == 'counted':
+            # Update with count value and update label_inventory
+            cursor.execute("""
+                UPDATE shipment_products 
+                SET label_check_status = %s,
+                    label_check_count = %s,
+                    label_check_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND shipment_id = %s
+                RETURNING *
+            """, (status, count, product_id, shipment_id))
+            
+            product = cursor.fetchone()
+            
+            # Also update label_inventory if count provided and label_location exists
+            if count is not None and product and product.get('label_location'):
+                cursor.execute("""
+                    UPDATE label_inventory 
+                    SET warehouse_inventory = %s,
+                        last_count_date = CURRENT_DATE,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE label_location = %s
+                """, (count, product['label_location']))
+        else:
+            # Just mark as confirmed (no count update)
+            cursor.execute("""
+                UPDATE shipment_products 
+                SET label_check_status = %s,
+                    label_check_at = CURRENT_TIMESTAMP,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND shipment_id = %s
+                RETURNING *
+            """, (status, product_id, shipment_id))
+            
+            product = cursor.fetchone()
+        
+        conn.commit()
+        
+        if not product:
+            return cors_response(404, {
+                'success': False,
+                'error': f'Product {product_id} not found in shipment {shipment_id}'
+            })
+        
+        return cors_response(200, {
+            'success': True,
+            'data': dict(product)
+        })
+    except Exception as e:
+        conn.rollback()
+        import traceback
+        return cors_response(500, {
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+    finally:
+        cursor.close()
+        conn.close()
@@ -17,6 +17,10 @@ CREATE TABLE IF NOT EXISTS formula_inventory (
     FOREIGN KEY (formula_name) REFERENCES formula(formula) ON DELETE CASCADE
 );
 
+-- Gallons reserved by shipments (read by v_catalog_full in 005 and the shipment handlers;
+-- present on databases created before this migration)
+ALTER TABLE formula_inventory ADD COLUMN IF NOT EXISTS gallons_allocated DECIMAL(10,2) DEFAULT 0;
+
 -- Create index for quick lookup by formula name
 CREATE INDEX IF NOT EXISTS idx_formula_inventory_formula_name ON formula_inventory(formula_name);
 
@@ -0,0 +1,98 @@
+-- ============================================================================
+-- Migration 018: Create Size Dimension Table
+-- Single source of truth for size sort order and gallons per unit
+-- ============================================================================
+
+-- Size dimension (replaces the hard-coded size CASE expressions)
+CREATE TABLE IF NOT EXISTS size_dim (
+    size VARCHAR(100) PRIMARY KEY,
+    sort_key INTEGER NOT NULL,
+    gallons_per_unit DECIMAL(10,4) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_size_dim_sort_key ON size_dim(sort_key);
+
+-- Seed known sizes
+INSERT INTO size_dim (size, sort_key, gallons_per_unit) VALUES
+    ('8oz', 1, 0.0625),
+    ('16oz', 2, 0.125),
+    ('Quart', 3, 0.25),
+    ('32oz', 4, 0.25),
+    ('Gallon', 5, 1.0),
+    ('5 Gallon', 6, 5.0)
+ON CONFLICT (size) DO UPDATE SET
+    sort_key = EXCLUDED.sort_key,
+    gallons_per_unit = EXCLUDED.gallons_per_unit,
+    updated_at = CURRENT_TIMESTAMP;
+
+-- Catalog lookups join on size
+CREATE INDEX IF NOT EXISTS idx_catalog_size ON catalog(size);
+
+COMMENT ON TABLE size_dim IS 'Reference table for product sizes (sort order and gallons per unit)';
+COMMENT ON COLUMN size_dim.sort_key IS 'Display order for variations (unknown sizes sort as 7)';
+COMMENT ON COLUMN size_dim.gallons_per_unit IS 'Formula gallons consumed per finished unit (unknown sizes use 0.25)';
+
+-- Recreate v_sellables using size_dim instead of per-row CASE
+DROP VIEW IF EXISTS v_sellables;
+CREATE VIEW v_sellables AS
+SELECT
+    c.id as catalog_id,
+    c.child_asin,
+    c.child_sku_final,
+    c.product_name,
+    c.brand_name,
+    c.size,
+    c.formula_name,
+    c.packaging_name as bottle_name,
+    c.closure_name,
+    c.label_location,
+    c.label_size,
+
+    -- Inventory levels
+    COALESCE(bi.warehouse_quantity, 0) as bottle_inventory,
+    COALESCE(ci.warehouse_quantity, 0) as closure_inventory,
+    COALESCE(li.warehouse_inventory, 0) as label_inventory,
+    COALESCE(fi.gallons_available, 0) as formula_gallons_available,
+
+    -- Gallons per unit from size dimension
+    COALESCE(sd.gallons_per_unit, 0.25) as gallons_per_unit,
+
+    -- Calculate max sellable units (bottleneck)
+    LEAST(
+        COALESCE(bi.warehouse_quantity, 0),
+        COALESCE(ci.warehouse_quantity, 0),
+        COALESCE(li.warehouse_inventory, 0),
+        FLOOR(COALESCE(fi.gallons_available, 0) / COALESCE(sd.gallons_per_unit, 0.25))
+    ) as max_sellable_units,
+
+    -- Identify which component is the bottleneck
+    CASE
+        WHEN COALESCE(bi.warehouse_quantity, 0) = 0 THEN 'Bottles'
+        WHEN COALESCE(ci.warehouse_quantity, 0) = 0 THEN 'Closures'
+        WHEN COALESCE(li.warehouse_inventory, 0) = 0 THEN 'Labels'
+        WHEN COALESCE(fi.gallons_available, 0) = 0 THEN 'Formula'
+        ELSE 'None'
+    END as bottleneck_component
+
+FROM catalog c
+LEFT JOIN size_dim sd ON c.size = sd.size
+LEFT JOIN formula f ON c.formula_name = f.formula
+LEFT JOIN formula_inventory fi ON c.formula_name = fi.formula_name
+LEFT JOIN bottle b ON c.packaging_name = b.bottle_name
+LEFT JOIN bottle_inventory bi ON c.packaging_name = bi.bottle_name
+LEFT JOIN closure_inventory ci ON c.closure_name = ci.closure_name
+LEFT JOIN label_inventory li ON c.label_location = li.label_location
+WHERE c.child_asin IS NOT NULL
+  AND COALESCE(bi.warehouse_quantity, 0) > 0
+  AND COALESCE(ci.warehouse_quantity, 0) > 0
+  AND COALESCE(li.warehouse_inventory, 0) > 0
+  AND COALESCE(fi.gallons_available, 0) > 0;
+
+COMMENT ON VIEW v_sellables IS
+'Products with all components in stock and ready to manufacture/ship';
+
+-- ============================================================================
+-- Migration complete
+-- ============================================================================
@@ -0,0 +1,152 @@
+-- ============================================================================
+-- Migration 019: Create Catalog Progress Table
+-- Development section statuses maintained by trigger instead of computed
+-- in the Lambda on every request
+-- ============================================================================
+
+-- Helpers: a field counts as filled when it is not NULL / empty / zero
+CREATE OR REPLACE FUNCTION catalog_field_filled(val TEXT)
+RETURNS INTEGER AS $$
+    SELECT CASE WHEN val IS NOT NULL AND val <> '' THEN 1 ELSE 0 END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION catalog_field_filled(val NUMERIC)
+RETURNS INTEGER AS $$
+    SELECT CASE WHEN val IS NOT NULL AND val <> 0 THEN 1 ELSE 0 END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- 'completed' once the threshold is met, 'inProgress' if anything is filled
+CREATE OR REPLACE FUNCTION catalog_section_status(filled INTEGER, threshold INTEGER)
+RETURNS VARCHAR AS $$
+    SELECT CASE
+        WHEN filled >= threshold THEN 'completed'
+        WHEN filled > 0 THEN 'inProgress'
+        ELSE 'pending'
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Section status rules (single definition used by trigger and backfill)
+CREATE OR REPLACE VIEW v_catalog_progress_source AS
+SELECT
+    c.id as catalog_id,
+    catalog_section_status(
+        catalog_field_filled(c.marketplace) + catalog_field_filled(c.country) +
+        catalog_field_filled(c.brand_name) + catalog_field_filled(c.product_name) +
+        catalog_field_filled(c.type), 5) as essential_info_status,
+    catalog_section_status(
+        catalog_field_filled(c.formula_name) + catalog_field_filled(c.guaranteed_analysis) +
+        catalog_field_filled(c.npk) + catalog_field_filled(c.derived_from), 3) as form_status,
+    catalog_section_status(
+        catalog_field_filled(c.product_image_url) + catalog_field_filled(c.label_ai_file) +
+        catalog_field_filled(c.label_print_ready_pdf) + catalog_field_filled(c.stock_image), 3) as design_status,
+    catalog_section_status(
+        catalog_field_filled(c.title) + catalog_field_filled(c.bullets) +
+        catalog_field_filled(c.description) + catalog_field_filled(c.parent_asin) +
+        catalog_field_filled(c.child_asin), 4) as listing_status,
+    catalog_section_status(
+        catalog_field_filled(c.packaging_name) + catalog_field_filled(c.closure_name) +
+        catalog_field_filled(c.case_size) + catalog_field_filled(c.units_per_case), 3) as prod_status,
+    catalog_section_status(
+        catalog_field_filled(c.product_dimensions_length_in) + catalog_field_filled(c.product_dimensions_width_in) +
+        catalog_field_filled(c.product_dimensions_height_in) + catalog_field_filled(c.product_dimensions_weight_lbs), 4) as pack_status,
+    catalog_section_status(
+        catalog_field_filled(c.label_size) + catalog_field_filled(c.label_location) +
+        catalog_field_filled(c.tps_directions), 2) as labels_status,
+    catalog_section_status(
+        catalog_field_filled(c.core_competitor_asins) + catalog_field_filled(c.core_keywords) +
+        catalog_field_filled(c.price), 2) as ads_status
+FROM catalog c;
+
+-- Progress table (one row per catalog row)
+CREATE TABLE IF NOT EXISTS catalog_progress (
+    catalog_id INTEGER PRIMARY KEY REFERENCES catalog(id) ON DELETE CASCADE,
+    essential_info_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    form_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    design_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    listing_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    prod_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    pack_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    labels_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    ads_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Indexes for "all products with <section> <status>" filters
+CREATE INDEX IF NOT EXISTS idx_catalog_progress_essential_info ON catalog_progress(essential_info_status);
+CREATE INDEX IF NOT EXISTS idx_catalog_progress_form ON catalog_progress(form_status);
+CREATE INDEX IF NOT EXISTS idx_catalog_progress_design ON catalog_progress(design_status);
+CREATE INDEX IF NOT EXISTS idx_catalog_progress_listing ON catalog_progress(listing_status);
+CREATE INDEX IF NOT EXISTS idx_catalog_progress_prod ON catalog_progress(prod_status);
+CREATE INDEX IF NOT EXISTS idx_catalog_progress_pack ON catalog_progress(pack_status);
+CREATE INDEX IF NOT EXISTS idx_catalog_progress_labels ON catalog_progress(labels_status);
+CREATE INDEX IF NOT EXISTS idx_catalog_progress_ads ON catalog_progress(ads_status);
+
+-- Trigger: recompute progress whenever a tracked catalog column changes
+CREATE OR REPLACE FUNCTION refresh_catalog_progress()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO catalog_progress (
+        catalog_id, essential_info_status, form_status, design_status, listing_status,
+        prod_status, pack_status, labels_status, ads_status, updated_at
+    )
+    SELECT
+        catalog_id, essential_info_status, form_status, design_status, listing_status,
+        prod_status, pack_status, labels_status, ads_status, CURRENT_TIMESTAMP
+    FROM v_catalog_progress_source
+    WHERE catalog_id = NEW.id
+    ON CONFLICT (catalog_id) DO UPDATE SET
+        essential_info_status = EXCLUDED.essential_info_status,
+        form_status = EXCLUDED.form_status,
+        design_status = EXCLUDED.design_status,
+        listing_status = EXCLUDED.listing_status,
+        prod_status = EXCLUDED.prod_status,
+        pack_status = EXCLUDED.pack_status,
+        labels_status = EXCLUDED.labels_status,
+        ads_status = EXCLUDED.ads_status,
+        updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS catalog_progress_trigger ON catalog;
+CREATE TRIGGER catalog_progress_trigger
+    AFTER INSERT OR UPDATE OF
+        marketplace, country, brand_name, product_name, type,
+        formula_name, guaranteed_analysis, npk, derived_from,
+        product_image_url, label_ai_file, label_print_ready_pdf, stock_image,
+        title, bullets, description, parent_asin, child_asin,
+        packaging_name, closure_name, case_size, units_per_case,
+        product_dimensions_length_in, product_dimensions_width_in,
+        product_dimensions_height_in, product_dimensions_weight_lbs,
+        label_size, label_location, tps_directions,
+        core_competitor_asins, core_keywords, price
+    ON catalog
+    FOR EACH ROW
+    EXECUTE FUNCTION refresh_catalog_progress();
+
+-- Backfill existing catalog rows
+INSERT INTO catalog_progress (
+    catalog_id, essential_info_status, form_status, design_status, listing_status,
+    prod_status, pack_status, labels_status, ads_status
+)
+SELECT
+    catalog_id, essential_info_status, form_status, design_status, listing_status,
+    prod_status, pack_status, labels_status, ads_status
+FROM v_catalog_progress_source
+ON CONFLICT (catalog_id) DO UPDATE SET
+    essential_info_status = EXCLUDED.essential_info_status,
+    form_status = EXCLUDED.form_status,
+    design_status = EXCLUDED.design_status,
+    listing_status = EXCLUDED.listing_status,
+    prod_status = EXCLUDED.prod_status,
+    pack_status = EXCLUDED.pack_status,
+    labels_status = EXCLUDED.labels_status,
+    ads_status = EXCLUDED.ads_status,
+    updated_at = CURRENT_TIMESTAMP;
+
+COMMENT ON TABLE catalog_progress IS 'Trigger-maintained development section statuses per catalog row';
+COMMENT ON VIEW v_catalog_progress_source IS 'Section completeness rules used to populate catalog_progress';
+
+-- ============================================================================
+-- Migration complete
+-- ============================================================================
@@ -0,0 +1,50 @@
+-- ============================================================================
+-- Migration 020: Promote Selection Notes Fields to Columns
+-- status / searchVol / actionType / templateId move out of the catalog.notes JSON document
+-- into real, indexed columns (notes is still written for compatibility)
+-- ============================================================================
+
+ALTER TABLE catalog ADD COLUMN IF NOT EXISTS selection_status VARCHAR(50);
+ALTER TABLE catalog ADD COLUMN IF NOT EXISTS search_vol INTEGER;  -- NULL = unknown
+ALTER TABLE catalog ALTER COLUMN search_vol DROP DEFAULT;
+ALTER TABLE catalog ADD COLUMN IF NOT EXISTS action_type VARCHAR(50) DEFAULT 'launch';
+ALTER TABLE catalog ADD COLUMN IF NOT EXISTS template_id VARCHAR(100);
+
+-- Backfill from existing notes documents. notes is JSONB in production but TEXT in
+-- database_schema_postgres.sql, so it is read as text; rows that are not a JSON
+-- object (free text, malformed) are skipped instead of aborting the migration
+CREATE OR REPLACE FUNCTION pg_temp.try_jsonb(value TEXT) RETURNS JSONB AS $$
+BEGIN
+    RETURN value::jsonb;
+EXCEPTION WHEN others THEN
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+UPDATE catalog c
+SET selection_status = n.doc->>'status',
+    search_vol = CASE WHEN n.doc->>'searchVol' ~ '^\s*-?[0-9]{1,9}\s*$'
+                      THEN (n.doc->>'searchVol')::INTEGER END,
+    action_type = COALESCE(n.doc->>'actionType', 'launch'),
+    template_id = n.doc->>'templateId'
+FROM (
+    SELECT id, pg_temp.try_jsonb(notes::text) AS doc
+    FROM catalog
+    WHERE notes::text ~ '^\s*\{'
+) n
+WHERE c.id = n.id AND jsonb_typeof(n.doc) = 'object';
+
+-- Indexes for selection filtering / sorting
+CREATE INDEX IF NOT EXISTS idx_catalog_selection_status ON catalog(selection_status);
+CREATE INDEX IF NOT EXISTS idx_catalog_search_vol ON catalog(search_vol DESC);
+CREATE INDEX IF NOT EXISTS idx_catalog_action_type ON catalog(action_type);
+
+-- Add comments
+COMMENT ON COLUMN catalog.selection_status IS 'Selection pipeline status (previously notes->>status)';
+COMMENT ON COLUMN catalog.search_vol IS 'Search volume used to rank selections (previously notes->>searchVol)';
+COMMENT ON COLUMN catalog.action_type IS 'launch / launched (previously notes->>actionType)';
+COMMENT ON COLUMN catalog.template_id IS 'Selection template id (previously notes->>templateId)';
+
+-- ============================================================================
+-- Migration complete
+-- ============================================================================
@@ -0,0 +1,109 @@
+-- ============================================================================
+-- Migration 021: Unified Open Orders / Inbound View
+-- Open (not received / archived) rows of bottle_orders, closure_orders,
+-- box_orders and label_order_lines in one view, backed by partial indexes so
+-- lookups never touch historical orders
+-- ============================================================================
+
+-- Partial indexes on open statuses (keyset order: sort_date DESC, id DESC)
+CREATE INDEX IF NOT EXISTS idx_bottle_orders_open
+    ON bottle_orders ((COALESCE(order_date, DATE '1900-01-01')) DESC, id DESC)
+    WHERE status NOT IN ('received', 'archived');
+CREATE INDEX IF NOT EXISTS idx_closure_orders_open
+    ON closure_orders ((COALESCE(order_date, DATE '1900-01-01')) DESC, id DESC)
+    WHERE status NOT IN ('received', 'archived');
+CREATE INDEX IF NOT EXISTS idx_box_orders_open
+    ON box_orders ((COALESCE(order_date, DATE '1900-01-01')) DESC, id DESC)
+    WHERE status NOT IN ('received', 'archived');
+CREATE INDEX IF NOT EXISTS idx_label_orders_open
+    ON label_orders ((COALESCE(order_date, DATE '1900-01-01')) DESC, id DESC)
+    WHERE status NOT IN ('received', 'archived');
+
+-- Partial indexes for inbound-by-component lookups
+CREATE INDEX IF NOT EXISTS idx_bottle_orders_open_item
+    ON bottle_orders (bottle_name) WHERE status NOT IN ('received', 'archived');
+CREATE INDEX IF NOT EXISTS idx_closure_orders_open_item
+    ON closure_orders (closure_name) WHERE status NOT IN ('received', 'archived');
+CREATE INDEX IF NOT EXISTS idx_box_orders_open_item
+    ON box_orders (box_type) WHERE status NOT IN ('received', 'archived');
+
+-- One row per open order line; component_name is the inventory key
+-- (bottle_name / closure_name / box_type, or "brand - product - bottle_size" for labels)
+CREATE OR REPLACE VIEW v_open_orders AS
+SELECT
+    'bottle'::TEXT AS component_type,
+    o.id AS order_id,
+    0 AS line_id,
+    o.order_number,
+    o.bottle_name::TEXT AS component_name,
+    NULL::TEXT AS brand_name,
+    NULL::TEXT AS product_name,
+    NULL::TEXT AS bottle_size,
+    o.supplier,
+    o.order_date,
+    o.expected_delivery_date,
+    o.status,
+    COALESCE(o.quantity_ordered, 0) AS quantity_ordered,
+    COALESCE(o.quantity_received, 0) AS quantity_received,
+    GREATEST(COALESCE(o.quantity_ordered, 0) - COALESCE(o.quantity_received, 0), 0) AS quantity_inbound,
+    COALESCE(o.order_date, DATE '1900-01-01') AS sort_date
+FROM bottle_orders o
+WHERE o.status NOT IN ('received', 'archived')
+UNION ALL
+SELECT
+    'closure', o.id, 0, o.order_number, o.closure_name::TEXT,
+    NULL, NULL, NULL,
+    o.supplier, o.order_date, o.expected_delivery_date, o.status,
+    COALESCE(o.quantity_ordered, 0),
+    COALESCE(o.quantity_received, 0),
+    GREATEST(COALESCE(o.quantity_ordered, 0) - COALESCE(o.quantity_received, 0), 0),
+    COALESCE(o.order_date, DATE '1900-01-01')
+FROM closure_orders o
+WHERE o.status NOT IN ('received', 'archived')
+UNION ALL
+SELECT
+    'box', o.id, 0, o.order_number, o.box_type::TEXT,
+    NULL, NULL, NULL,
+    o.supplier, o.order_date, o.expected_delivery_date, o.status,
+    COALESCE(o.quantity_ordered, 0),
+    COALESCE(o.quantity_received, 0),
+    GREATEST(COALESCE(o.quantity_ordered, 0) - COALESCE(o.quantity_received, 0), 0),
+    COALESCE(o.order_date, DATE '1900-01-01')
+FROM box_orders o
+WHERE o.status NOT IN ('received', 'archived')
+UNION ALL
+SELECT
+    'label', o.id, l.id, o.order_number,
+    l.brand_name || ' - ' || l.product_name || ' - ' || l.bottle_size,
+    l.brand_name::TEXT, l.product_name::TEXT, l.bottle_size::TEXT,
+    o.supplier, o.order_date, o.expected_delivery_date, o.status,
+    COALESCE(l.quantity_ordered, 0),
+    COALESCE(l.quantity_received, 0),
+    GREATEST(COALESCE(l.quantity_ordered, 0) - COALESCE(l.quantity_received, 0), 0),
+    COALESCE(o.order_date, DATE '1900-01-01')
+FROM label_orders o
+JOIN label_order_lines l ON l.order_id = o.id
+WHERE o.status NOT IN ('received', 'archived');
+
+-- Outstanding quantity per component across all open orders
+CREATE OR REPLACE VIEW v_inbound_by_component AS
+SELECT
+    component_type,
+    component_name,
+    brand_name,
+    product_name,
+    bottle_size,
+    SUM(quantity_inbound) AS quantity_inbound,
+    COUNT(DISTINCT order_id) AS open_orders,
+    MIN(expected_delivery_date) AS next_expected_delivery
+FROM v_open_orders
+WHERE quantity_inbound > 0
+GROUP BY component_type, component_name, brand_name, product_name, bottle_size;
+
+-- Add comments
+COMMENT ON VIEW v_open_orders IS 'Open order lines across bottle/closure/box/label orders (status not received/archived)';
+COMMENT ON VIEW v_inbound_by_component IS 'Outstanding (ordered - received) quantity per component from open orders';
+
+-- ============================================================================
+-- Migration complete
+-- ============================================================================
@@ -0,0 +1,104 @@
+-- ============================================================================
+-- Migration 022: Supplier Performance Rollup
+-- Actual lead time (order_date -> actual_delivery_date) and on-time rate per
+-- supplier and component. Updated incrementally by the Lambda when an order is
+-- received (running mean / Welford M2 / day histogram for p90), so readers
+-- never re-aggregate order history. component_name follows v_open_orders.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS supplier_performance (
+    id SERIAL PRIMARY KEY,
+    supplier VARCHAR(255) NOT NULL,
+    component_type VARCHAR(20) NOT NULL,  -- 'bottle', 'closure', 'box', 'label'
+    component_name VARCHAR(255) NOT NULL,
+    receipts INTEGER NOT NULL DEFAULT 0,
+    mean_lead_time_days DOUBLE PRECISION NOT NULL DEFAULT 0,
+    lead_time_m2 DOUBLE PRECISION NOT NULL DEFAULT 0,  -- sum of squared deviations (Welford)
+    lead_time_variance DOUBLE PRECISION NOT NULL DEFAULT 0,
+    p90_lead_time_days INTEGER,
+    lead_time_histogram INTEGER[] NOT NULL DEFAULT '{}',  -- receipts per lead-time day; element 1 = day 0
+    on_time_receipts INTEGER NOT NULL DEFAULT 0,
+    late_receipts INTEGER NOT NULL DEFAULT 0,
+    last_received_date DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(supplier, component_type, component_name)
+);
+
+CREATE INDEX IF NOT EXISTS idx_supplier_performance_component
+    ON supplier_performance(component_type, component_name);
+
+-- Backfill from orders already received (lead times capped at 365 days, as in the Lambda)
+WITH receipts AS (
+    SELECT supplier, 'bottle' AS component_type, bottle_name AS component_name,
+           order_date, expected_delivery_date, actual_delivery_date
+    FROM bottle_orders WHERE status = 'received'
+    UNION ALL
+    SELECT supplier, 'closure', closure_name, order_date, expected_delivery_date, actual_delivery_date
+    FROM closure_orders WHERE status = 'received'
+    UNION ALL
+    SELECT supplier, 'box', box_type, order_date, expected_delivery_date, actual_delivery_date
+    FROM box_orders WHERE status = 'received'
+    UNION ALL
+    SELECT DISTINCT o.supplier, 'label', l.brand_name || ' - ' || l.product_name || ' - ' || l.bottle_size,
+           o.order_date, o.expected_delivery_date, o.actual_delivery_date
+    FROM label_orders o
+    JOIN label_order_lines l ON l.order_id = o.id
+    WHERE o.status = 'received'
+),
+samples AS (
+    SELECT supplier, component_type, component_name, actual_delivery_date,
+           LEAST(actual_delivery_date - order_date, 365) AS lead_days,
+           expected_delivery_date IS NULL OR actual_delivery_date <= expected_delivery_date AS on_time  -- as in the Lambda
+    FROM receipts
+    WHERE supplier IS NOT NULL AND component_name IS NOT NULL
+      AND order_date IS NOT NULL AND actual_delivery_date IS NOT NULL
+      AND actual_delivery_date >= order_date
+),
+days AS (
+    SELECT supplier, component_type, component_name, lead_days, COUNT(*) AS n
+    FROM samples
+    GROUP BY supplier, component_type, component_name, lead_days
+),
+histograms AS (
+    SELECT k.supplier, k.component_type, k.component_name,
+           array_agg(COALESCE(d.n, 0)::INTEGER ORDER BY g.day) AS histogram
+    FROM (
+        SELECT supplier, component_type, component_name, MAX(lead_days) AS max_days
+        FROM days GROUP BY supplier, component_type, component_name
+    ) k
+    CROSS JOIN LATERAL generate_series(0, k.max_days) AS g(day)
+    LEFT JOIN days d
+      ON d.supplier = k.supplier AND d.component_type = k.component_type
+     AND d.component_name = k.component_name AND d.lead_days = g.day
+    GROUP BY k.supplier, k.component_type, k.component_name
+)
+INSERT INTO supplier_performance (
+    supplier, component_type, component_name, receipts,
+    mean_lead_time_days, lead_time_m2, lead_time_variance, p90_lead_time_days,
+    lead_time_histogram, on_time_receipts, late_receipts, last_received_date
+)
+SELECT s.supplier, s.component_type, s.component_name,
+       COUNT(*),
+       AVG(s.lead_days),
+       COALESCE(VAR_POP(s.lead_days) * COUNT(*), 0),
+       COALESCE(VAR_SAMP(s.lead_days), 0),
+       PERCENTILE_DISC(0.9) WITHIN GROUP (ORDER BY s.lead_days),
+       h.histogram,
+       COUNT(*) FILTER (WHERE s.on_time),
+       COUNT(*) FILTER (WHERE NOT s.on_time),
+       MAX(s.actual_delivery_date)
+FROM samples s
+JOIN histograms h
+  ON h.supplier = s.supplier AND h.component_type = s.component_type AND h.component_name = s.component_name
+GROUP BY s.supplier, s.component_type, s.component_name, h.histogram
+ON CONFLICT (supplier, component_type, component_name) DO NOTHING;
+
+-- Add comments
+COMMENT ON TABLE supplier_performance IS 'Incrementally maintained supplier lead-time / on-time rollup per component';
+COMMENT ON COLUMN supplier_performance.lead_time_m2 IS 'Welford running sum of squared deviations; variance = m2 / (receipts - 1)';
+COMMENT ON COLUMN supplier_performance.lead_time_histogram IS 'Receipt count per lead-time day (index 1 = day 0, capped at 365) used for p90';
+
+-- ============================================================================
+-- Migration complete
+-- ============================================================================